@@ -32,17 +32,28 @@ const hostCardEl = document.getElementById("hostCard");
 const backToSetupBtn = document.getElementById("backToSetupBtn");
 const regenerateGameBtn = document.getElementById("regenerateGameBtn");
 const exportGameBtn = document.getElementById("exportGameBtn");
+const printKitBtn = document.getElementById("printKitBtn");
 const copyShareGameBtn = document.getElementById("copyShareGameBtn");
 const surpriseMeBtn = document.getElementById("surpriseMe");
 const setupModeEl = document.getElementById("setupMode");
 const modalOverlay = document.getElementById("modalOverlay");
 const modalClose = document.getElementById("modalClose");
 const modalBody = document.getElementById("modalBody");
+const savedGamesCard = document.getElementById("savedGamesCard");
+const savedGamesEl = document.getElementById("savedGames");
+
+const DB_NAME = "mp1";
+const GAME_STORE = "games";
+const MAX_SAVED_GAMES = 100;
+const LAZY_BATCH = 24;
 
 let categories = [];
 let selectedCategoryId = null;
 let lastRequest = null;
 let currentGame = null;
+let currentView = null;
+let hostToken = null;
+let packetCache = new Map();
 let clueMap = new Map();
 let mode = "setup";
 let activeModal = null;
@@ -73,11 +84,274 @@ function base64UrlEncode(obj) {
   return base64.replace(/\+/g, "-").replace(/\//g, "_").replace(/=+$/, "");
 }
 
-function base64UrlDecode(code) {
-  const padded = code + "===".slice((code.length + 3) % 4);
-  const base64 = padded.replace(/-/g, "+").replace(/_/g, "/");
-  const json = decodeURIComponent(escape(atob(base64)));
-  return JSON.parse(json);
+function toHostView(game) {
+  return {
+    title: game.title,
+    theme_summary: game.theme_summary,
+    storyline_overview: game.storyline_overview,
+    victim: game.victim,
+    timeline: game.timeline,
+    how_to_play: game.how_to_play,
+    props_list: game.props_list,
+    meta: game.meta,
+    characters: game.character_packets.map((packet) => ({
+      character_id: packet.character_id,
+      name: packet.name,
+      role_title: packet.role_title,
+    })),
+  };
+}
+
+let dbPromise = null;
+
+function openDb() {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      if (!window.indexedDB) {
+        reject(new Error("IndexedDB unavailable."));
+        return;
+      }
+      const request = indexedDB.open(DB_NAME, 1);
+      request.onupgradeneeded = () => {
+        const store = request.result.createObjectStore(GAME_STORE, { keyPath: "share_code" });
+        store.createIndex("saved_at", "saved_at");
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  }
+  return dbPromise;
+}
+
+async function withStore(txMode, action) {
+  const db = await openDb();
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(GAME_STORE, txMode);
+    const result = action(tx.objectStore(GAME_STORE));
+    tx.oncomplete = () => resolve(result && "result" in result ? result.result : undefined);
+    tx.onerror = () => reject(tx.error);
+  });
+}
+
+// Newest first, without the game bodies so the list stays cheap.
+async function listSavedGames() {
+  const games = [];
+  await withStore("readonly", (store) => {
+    const cursor = store.index("saved_at").openCursor(null, "prev");
+    cursor.onsuccess = () => {
+      if (!cursor.result) return;
+      const { share_code, title, saved_at, host_token } = cursor.result.value;
+      games.push({ share_code, title, saved_at, is_host: Boolean(host_token) });
+      cursor.result.continue();
+    };
+  });
+  return games;
+}
+
+function loadSavedGame(shareCode) {
+  return withStore("readonly", (store) => store.get(shareCode));
+}
+
+function deleteSavedGame(shareCode) {
+  return withStore("readwrite", (store) => store.delete(shareCode));
+}
+
+async function putSavedGame(record) {
+  await withStore("readwrite", (store) => {
+    store.put(record);
+    const cursor = store.index("saved_at").openKeyCursor(null, "prev");
+    let kept = 0;
+    cursor.onsuccess = () => {
+      if (!cursor.result) return;
+      kept += 1;
+      if (kept > MAX_SAVED_GAMES) {
+        store.delete(cursor.result.primaryKey);
+      }
+      cursor.result.continue();
+    };
+  });
+}
+
+async function saveSession() {
+  if (!currentView) return;
+  try {
+    const shareCode = currentView.meta.share_code;
+    // Joining your own game by share code must not drop the host token.
+    const existing = (await loadSavedGame(shareCode)) || {};
+    const record = {
+      share_code: shareCode,
+      title: currentView.title,
+      saved_at: Date.now(),
+      view: currentView,
+      host_token: hostToken || existing.host_token || null,
+      packets: { ...(existing.packets || {}), ...Object.fromEntries(packetCache) },
+    };
+    if (currentGame) {
+      record.game = currentGame;
+    }
+    await putSavedGame(record);
+    await renderSavedGames();
+  } catch (error) {
+    console.warn("Could not save game locally.", error);
+  }
+}
+
+// Packets fetched from the server are kept with the saved game so it opens offline.
+async function savePacket(characterId, packet) {
+  try {
+    const record = await loadSavedGame(currentView.meta.share_code);
+    if (!record) return;
+    record.packets = { ...(record.packets || {}), [characterId]: packet };
+    await withStore("readwrite", (store) => store.put(record));
+  } catch (error) {
+    console.warn("Could not save character packet locally.", error);
+  }
+}
+
+function openRecord(record) {
+  hostToken = record.host_token || null;
+  if (record.game) {
+    currentGame = record.game;
+    renderGame(record.game);
+    exportBtn.disabled = false;
+  } else {
+    currentGame = null;
+    currentView = record.view;
+    packetCache = new Map(Object.entries(record.packets || {}));
+    renderGameBoard(currentView);
+  }
+  copyShareBtn.disabled = false;
+}
+
+// Earlier versions kept a single game in localStorage.
+async function migrateLocalStorage() {
+  const saved = localStorage.getItem("mp1_last_game");
+  if (!saved) return;
+  try {
+    const session = JSON.parse(saved);
+    const view = session.character_packets ? toHostView(session) : session.view;
+    await putSavedGame({
+      share_code: view.meta.share_code,
+      title: view.title,
+      saved_at: Date.now(),
+      view,
+      host_token: session.host_token || null,
+      packets: {},
+      ...(session.character_packets ? { game: session } : {}),
+    });
+  } catch (error) {
+    console.warn("Could not migrate the last saved game.", error);
+  }
+  localStorage.removeItem("mp1_last_game");
+}
+
+async function renderSavedGames() {
+  if (!savedGamesEl) return;
+  const games = await listSavedGames();
+  savedGamesCard.classList.toggle("hidden", !games.length);
+  renderLazyList(
+    savedGamesEl,
+    games,
+    (game) => `
+      <li class="saved-game" data-share-code="${game.share_code}">
+        <span>
+          <strong>${game.title}</strong>
+          <small>${game.share_code}${game.is_host ? " (host)" : ""} -
+          ${new Date(game.saved_at).toLocaleString()}</small>
+        </span>
+        <span>
+          <button type="button" data-action="open">Open</button>
+          <button type="button" data-action="delete">Delete</button>
+        </span>
+      </li>
+    `
+  );
+}
+
+// Renders the first batch now and the rest as the end of the list scrolls into
+// view, so large games and long histories do not build every node up front.
+function renderLazyList(container, items, renderItem, batch = LAZY_BATCH) {
+  if (container.lazyObserver) {
+    container.lazyObserver.disconnect();
+    container.lazyObserver = null;
+  }
+  if (!("IntersectionObserver" in window) || items.length <= batch) {
+    container.innerHTML = items.map(renderItem).join("");
+    return;
+  }
+  let rendered = batch;
+  container.innerHTML = items.slice(0, rendered).map(renderItem).join("");
+  const isList = container.tagName === "UL" || container.tagName === "OL";
+  const sentinel = document.createElement(isList ? "li" : "div");
+  sentinel.className = "lazy-sentinel";
+  container.appendChild(sentinel);
+  const observer = new IntersectionObserver(
+    (entries) => {
+      if (!entries.some((entry) => entry.isIntersecting)) return;
+      const next = items.slice(rendered, rendered + batch);
+      rendered += next.length;
+      sentinel.insertAdjacentHTML("beforebegin", next.map(renderItem).join(""));
+      if (rendered >= items.length) {
+        observer.disconnect();
+        sentinel.remove();
+        container.lazyObserver = null;
+        return;
+      }
+      // Re-observe so a sentinel that is still in view fires again.
+      observer.unobserve(sentinel);
+      observer.observe(sentinel);
+    },
+    { rootMargin: "400px" }
+  );
+  observer.observe(sentinel);
+  container.lazyObserver = observer;
+}
+
+async function fetchHostView(shareCode) {
+  const response = await fetch(`/api/games/${encodeURIComponent(shareCode)}`);
+  if (!response.ok) {
+    throw new Error("Game not found on server.");
+  }
+  return response.json();
+}
+
+async function fetchCharacter(characterId) {
+  if (currentGame) {
+    const character = currentGame.character_packets.find(
+      (packet) => packet.character_id === characterId
+    );
+    return character ? { character, clues: currentGame.clues } : null;
+  }
+  if (packetCache.has(characterId)) {
+    return packetCache.get(characterId);
+  }
+  const shareCode = encodeURIComponent(currentView.meta.share_code);
+  const response = await fetch(`/api/games/${shareCode}/characters/${characterId}`);
+  if (!response.ok) {
+    throw new Error("Character packet unavailable.");
+  }
+  const packet = await response.json();
+  packetCache.set(characterId, packet);
+  savePacket(characterId, packet);
+  return packet;
+}
+
+async function fetchSolution() {
+  if (currentGame) {
+    return renderSolution(currentGame);
+  }
+  if (!hostToken) {
+    return `<div class="modal-section"><p>Only the host device can reveal the solution.</p></div>`;
+  }
+  const shareCode = encodeURIComponent(currentView.meta.share_code);
+  const response = await fetch(`/api/games/${shareCode}/solution`, {
+    headers: { "X-Host-Token": hostToken },
+  });
+  if (!response.ok) {
+    return `<div class="modal-section"><p>Solution unavailable.</p></div>`;
+  }
+  const data = await response.json();
+  return renderSolutionFields(data.solution, data.murderer_name);
 }
 
 async function fetchCategories() {
@@ -87,23 +361,23 @@ async function fetchCategories() {
 }
 
 function renderCategories() {
-  categoryList.innerHTML = "";
-  categories.forEach((category) => {
-    const card = document.createElement("div");
-    card.className = "category";
-    if (category.id === selectedCategoryId) {
-      card.classList.add("selected");
-    }
-    card.innerHTML = `
-      <h4>${category.name}</h4>
-      <p>${category.description}</p>
-      <small>${category.tone_tags.join(", ")}</small>
-    `;
-    card.addEventListener("click", () => {
-      selectedCategoryId = category.id;
-      renderCategories();
-    });
-    categoryList.appendChild(card);
+  categoryList.innerHTML = categories
+    .map(
+      (category) => `
+        <div class="category" data-category-id="${category.id}">
+          <h4>${category.name}</h4>
+          <p>${category.description}</p>
+          <small>${category.tone_tags.join(", ")}</small>
+        </div>
+      `
+    )
+    .join("");
+  markSelectedCategory();
+}
+
+function markSelectedCategory() {
+  categoryList.querySelectorAll(".category").forEach((card) => {
+    card.classList.toggle("selected", card.dataset.categoryId === selectedCategoryId);
   });
 }
 
@@ -129,7 +403,9 @@ function gatherRequest() {
 }
 
 function renderGame(game) {
-  renderGameBoard(game);
+  currentView = toHostView(game);
+  packetCache = new Map();
+  renderGameBoard(currentView);
 }
 
 function renderSetup() {
@@ -145,18 +421,21 @@ function renderGameBoard(game) {
   gameTitleEl.textContent = game.title;
   themeSummaryEl.textContent = game.theme_summary;
   shareCodeDisplay.textContent = game.meta.share_code;
-  clueMap = new Map(game.clues.map((clue) => [clue.clue_id, clue]));
+  clueMap = new Map(currentGame ? currentGame.clues.map((clue) => [clue.clue_id, clue]) : []);
   regenerateGameBtn.disabled = !lastRequest;
   exportGameBtn.disabled = !currentGame;
-  copyShareGameBtn.disabled = !currentGame;
+  printKitBtn.disabled = !hostToken;
+  copyShareGameBtn.disabled = !currentView;
 
   storylineEl.innerHTML = game.storyline_overview
     .map((p) => `<p>${p}</p>`)
     .join("");
 
-  timelineEl.innerHTML = game.timeline
-    .map((event) => `<li><strong>${event.time}</strong> - ${event.description}</li>`)
-    .join("");
+  renderLazyList(
+    timelineEl,
+    game.timeline,
+    (event) => `<li><strong>${event.time}</strong> - ${event.description}</li>`
+  );
 
   howToPlayEl.innerHTML = game.how_to_play
     .map(
@@ -173,44 +452,48 @@ function renderGameBoard(game) {
     propsListEl.closest(".panel").classList.add("hidden");
   }
 
-  characterCardsEl.innerHTML = game.character_packets
-    .map(
-      (character) => `
-        <div class="clickable-card" data-character-id="${character.character_id}">
-          <h4>${character.name}</h4>
-          <p>Click to Reveal</p>
-        </div>
-      `
-    )
-    .join("");
+  renderLazyList(
+    characterCardsEl,
+    game.characters,
+    (character) => `
+      <div class="clickable-card" data-character-id="${character.character_id}">
+        <h4>${character.name}</h4>
+        <p>Click to Reveal</p>
+      </div>
+    `
+  );
   hostRevealConfirmed = false;
 
-  if (characterSelect && characterPacketEl) {
-    characterSelect.innerHTML = game.character_packets
+  if (characterSelect && characterPacketEl && currentGame) {
+    characterSelect.innerHTML = currentGame.character_packets
       .map((character) => `<option value="${character.character_id}">${character.name}</option>`)
       .join("");
-    characterSelect.onchange = () => renderCharacterPacket(game, characterSelect.value);
+    characterSelect.onchange = () => renderCharacterPacket(currentGame, characterSelect.value);
     renderCharacterPacket(
-      game,
-      characterSelect.value || game.character_packets[0].character_id
+      currentGame,
+      characterSelect.value || currentGame.character_packets[0].character_id
     );
   }
 }
 
-function renderClueList(clueIds, clueLookup) {
+// A placeholder filled by fillClueList once the surrounding markup is in the DOM.
+function renderClueList(clueIds) {
   if (!clueIds || !clueIds.length) {
     return "<p>No clues assigned.</p>";
   }
-  const items = clueIds
-    .map((clueId) => {
-      const clue = clueLookup.get(clueId);
-      if (!clue) {
-        return `<li class="clue-card"><strong>${clueId}</strong>: Missing clue details.</li>`;
-      }
-      return `<li class="clue-card"><strong>${clue.title}</strong>: ${clue.description}</li>`;
-    })
-    .join("");
-  return `<ul class="clue-list">${items}</ul>`;
+  return `<ul class="clue-list" data-clue-list></ul>`;
+}
+
+function fillClueList(root, clueIds, clueLookup) {
+  const list = root.querySelector("[data-clue-list]");
+  if (!list) return;
+  renderLazyList(list, clueIds, (clueId) => {
+    const clue = clueLookup.get(clueId);
+    if (!clue) {
+      return `<li class="clue-card"><strong>${clueId}</strong>: Missing clue details.</li>`;
+    }
+    return `<li class="clue-card"><strong>${clue.title}</strong>: ${clue.description}</li>`;
+  });
 }
 
 function renderIntroList(lines) {
@@ -236,27 +519,33 @@ function renderCharacterPacket(game, characterId) {
     <p><strong>Secrets:</strong> ${packet.secrets.join("; ")}</p>
     <p><strong>Alibi:</strong> ${packet.alibi}</p>
     <p><strong>Connection to victim:</strong> ${packet.connection_to_victim}</p>
-    <div><strong>Clues:</strong> ${renderClueList(packet.clue_ids, clueMap)}</div>
+    <div><strong>Clues:</strong> ${renderClueList(packet.clue_ids)}</div>
     <div><strong>Intro:</strong> ${renderIntroList(packet.intro_monologue)}</div>
   `;
+  fillClueList(characterPacketEl, packet.clue_ids, clueMap);
 }
 
 function renderSolution(game) {
   const murderer = game.character_packets.find(
     (character) => character.character_id === game.solution.murderer_id
   );
+  return renderSolutionFields(game.solution, murderer ? murderer.name : null);
+}
+
+function renderSolutionFields(solution, murdererName) {
   return `
     <div class="modal-section">
-      <p><strong>Murderer:</strong> ${murderer ? murderer.name : game.solution.murderer_id}</p>
-      <p><strong>Motive:</strong> ${game.solution.motive}</p>
-      <p><strong>Method:</strong> ${game.solution.method}</p>
-      <p><strong>Opportunity:</strong> ${game.solution.opportunity}</p>
-      <p>${game.solution.reveal_explanation}</p>
+      <p><strong>Murderer:</strong> ${murdererName || solution.murderer_id}</p>
+      <p><strong>Motive:</strong> ${solution.motive}</p>
+      <p><strong>Method:</strong> ${solution.method}</p>
+      <p><strong>Opportunity:</strong> ${solution.opportunity}</p>
+      <p>${solution.reveal_explanation}</p>
     </div>
   `;
 }
 
-function renderCharacterModal(character) {
+function renderCharacterModal({ character, clues }) {
+  const clueLookup = new Map(clues.map((clue) => [clue.clue_id, clue]));
   modalBody.innerHTML = `
     <h3>${character.name} (${character.role_title})</h3>
     <div class="modal-section"><p>${character.backstory}</p></div>
@@ -266,14 +555,15 @@ function renderCharacterModal(character) {
     <div class="modal-section"><strong>Secrets:</strong> ${character.secrets.join("; ")}</div>
     <div class="modal-section"><strong>Alibi:</strong> ${character.alibi}</div>
     <div class="modal-section"><strong>Connection to victim:</strong> ${character.connection_to_victim}</div>
-    <div class="modal-section"><strong>Clues:</strong> ${renderClueList(character.clue_ids, clueMap)}</div>
+    <div class="modal-section"><strong>Clues:</strong> ${renderClueList(character.clue_ids)}</div>
     <div class="modal-section"><strong>Intro:</strong> ${renderIntroList(character.intro_monologue)}</div>
   `;
+  fillClueList(modalBody, character.clue_ids, clueLookup);
 }
 
-function renderHostModal(game) {
+async function renderHostModal() {
   const revealSection = hostRevealConfirmed
-    ? renderSolution(game)
+    ? await fetchSolution()
     : `
       <div class="modal-section">
         <p>This content is for the host only.</p>
@@ -300,7 +590,7 @@ function renderHostModal(game) {
     });
     hostRevealBtn.addEventListener("click", () => {
       hostRevealConfirmed = true;
-      renderHostModal(game);
+      renderHostModal();
     });
   }
 }
@@ -312,7 +602,7 @@ function openModal(type, payload) {
     renderCharacterModal(payload);
   }
   if (type === "host") {
-    renderHostModal(payload);
+    renderHostModal();
   }
 }
 
@@ -327,7 +617,7 @@ async function generateGame(payload) {
   try {
     const response = await fetch("/api/generate", {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
+      headers: { "Content-Type": "application/json", "X-Request-Class": "interactive" },
       body: JSON.stringify(payload),
     });
     if (!response.ok) {
@@ -336,12 +626,13 @@ async function generateGame(payload) {
     }
     const game = await response.json();
     currentGame = game;
+    hostToken = response.headers.get("X-Host-Token");
     lastRequest = payload;
-    localStorage.setItem("mp1_last_game", JSON.stringify(game));
     exportBtn.disabled = false;
     copyShareBtn.disabled = false;
     regenerateBtn.disabled = false;
     renderGame(game);
+    saveSession();
     setStatus("Game generated successfully.", false);
   } catch (error) {
     setStatus(error.message, true);
@@ -379,27 +670,43 @@ on(exportBtn, "click", () => {
 });
 
 on(copyShareBtn, "click", async () => {
-  if (!currentGame) return;
-  await navigator.clipboard.writeText(currentGame.meta.share_code);
+  if (!currentView) return;
+  await navigator.clipboard.writeText(currentView.meta.share_code);
   setStatus("Share code copied to clipboard.", false);
 });
 
 on(copyShareInline, "click", async () => {
-  if (!currentGame) return;
-  await navigator.clipboard.writeText(currentGame.meta.share_code);
+  if (!currentView) return;
+  await navigator.clipboard.writeText(currentView.meta.share_code);
   setStatus("Share code copied to clipboard.", false);
 });
 
-on(loadShareCodeBtn, "click", () => {
-  if (!shareCodeInput.value.trim()) return;
+on(loadShareCodeBtn, "click", async () => {
+  const shareCode = shareCodeInput.value.trim();
+  if (!shareCode) return;
   try {
-    const data = base64UrlDecode(shareCodeInput.value.trim());
+    const view = await fetchHostView(shareCode);
+    currentGame = null;
+    hostToken = null;
+    currentView = view;
+    packetCache = new Map();
+    renderGameBoard(view);
+    saveSession();
+    setStatus("Joined game from share code.", false);
+    return;
+  } catch (error) {
+    // Not stored on the server; fall back to recreating it from the code.
+  }
+  try {
+    const response = await fetch(`/api/share-codes/${encodeURIComponent(shareCode)}`);
+    if (!response.ok) throw new Error("Invalid share code.");
+    const data = await response.json();
     seedInput.value = data.seed;
     playerCountInput.value = data.player_count;
     toneSelect.value = data.tone;
     durationSelect.value = data.duration;
     selectedCategoryId = data.category_id;
-    renderCategories();
+    markSelectedCategory();
     setStatus("Share code loaded. Click Generate to recreate.", false);
   } catch (error) {
     setStatus("Invalid share code.", true);
@@ -418,37 +725,73 @@ on(hostToggle, "click", () => {
   }
 });
 
-on(revealSolutionBtn, "click", () => {
+on(revealSolutionBtn, "click", async () => {
   const confirmed = window.confirm("Reveal the solution to all players?");
   if (!confirmed) return;
   solutionContent.classList.remove("hidden");
-  renderSolution(currentGame);
+  solutionContent.innerHTML = await fetchSolution();
 });
 
 on(surpriseMeBtn, "click", () => {
   selectedCategoryId = "random";
-  categoryList.querySelectorAll(".category").forEach((card) => card.classList.remove("selected"));
+  markSelectedCategory();
   setStatus("Surprise Me selected.", false);
 });
 
-function hydrateFromStorage() {
-  const saved = localStorage.getItem("mp1_last_game");
-  if (!saved) return;
+async function hydrateFromStorage() {
   try {
-    const game = JSON.parse(saved);
-    currentGame = game;
-    renderGame(game);
-    exportBtn.disabled = false;
-    copyShareBtn.disabled = false;
+    await migrateLocalStorage();
+    const games = await listSavedGames();
+    await renderSavedGames();
+    if (!games.length) return;
+    const record = await loadSavedGame(games[0].share_code);
+    if (!record) return;
+    openRecord(record);
     setStatus("Loaded last generated game from storage.", false);
   } catch (error) {
-    localStorage.removeItem("mp1_last_game");
+    console.warn("Saved games unavailable.", error);
   }
 }
 
-fetchCategories()
-  .then(() => hydrateFromStorage())
-  .catch(() => setStatus("Failed to load categories.", true));
+// Saved games do not wait on the network, so they open offline too.
+hydrateFromStorage();
+fetchCategories().catch(() => setStatus("Failed to load categories.", true));
+
+if ("serviceWorker" in navigator) {
+  window.addEventListener("load", () => {
+    navigator.serviceWorker.register("/sw.js").catch((error) => {
+      console.warn("Service worker registration failed.", error);
+    });
+  });
+}
+
+on(categoryList, "click", (event) => {
+  const card = event.target.closest("[data-category-id]");
+  if (!card) return;
+  selectedCategoryId = card.dataset.categoryId;
+  markSelectedCategory();
+});
+
+on(savedGamesEl, "click", async (event) => {
+  const button = event.target.closest("button[data-action]");
+  const item = event.target.closest("[data-share-code]");
+  if (!button || !item) return;
+  const shareCode = item.dataset.shareCode;
+  try {
+    if (button.dataset.action === "delete") {
+      await deleteSavedGame(shareCode);
+      await renderSavedGames();
+      return;
+    }
+    const record = await loadSavedGame(shareCode);
+    if (!record) return;
+    lastRequest = null;
+    openRecord(record);
+    setStatus("Opened saved game.", false);
+  } catch (error) {
+    setStatus("Saved game unavailable.", true);
+  }
+});
 
 on(backToSetupBtn, "click", () => {
   renderSetup();
@@ -464,24 +807,46 @@ on(exportGameBtn, "click", () => {
   exportBtn.click();
 });
 
+on(printKitBtn, "click", async () => {
+  if (!currentView || !hostToken) return;
+  setStatus("Preparing print kit...", false);
+  const shareCode = encodeURIComponent(currentView.meta.share_code);
+  const response = await fetch(`/api/games/${shareCode}/export`, {
+    headers: { "X-Host-Token": hostToken },
+  });
+  if (!response.ok) {
+    setStatus("Print kit unavailable.", true);
+    return;
+  }
+  const url = URL.createObjectURL(await response.blob());
+  const link = document.createElement("a");
+  link.href = url;
+  link.download = "murder_mystery_kit.zip";
+  link.click();
+  URL.revokeObjectURL(url);
+  setStatus("Print kit downloaded.", false);
+});
+
 on(copyShareGameBtn, "click", () => {
   copyShareBtn.click();
 });
 
-on(characterCardsEl, "click", (event) => {
+on(characterCardsEl, "click", async (event) => {
   const card = event.target.closest("[data-character-id]");
-  if (!card || !currentGame) return;
-  const character = currentGame.character_packets.find(
-    (packet) => packet.character_id === card.dataset.characterId
-  );
-  if (character) {
-    openModal("character", character);
+  if (!card || !currentView) return;
+  try {
+    const packet = await fetchCharacter(card.dataset.characterId);
+    if (packet) {
+      openModal("character", packet);
+    }
+  } catch (error) {
+    setStatus(error.message, true);
   }
 });
 
 on(hostCardEl, "click", () => {
-  if (!currentGame) return;
-  openModal("host", currentGame);
+  if (!currentView) return;
+  openModal("host", currentView);
 });
 
 on(modalClose, "click", closeModal);
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PREFETCH = "prefetch"
+DEFAULT_WEIGHTS = {INTERACTIVE: 8.0, BATCH: 2.0, PREFETCH: 1.0}
+DEFAULT_MAX_ACTIVE = 8
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_RATE_PER_MINUTE = 30
+DEFAULT_BURST = 10
+DEFAULT_SERVICE_SECONDS = 5.0
+MAX_TRACKED_CLIENTS = 10000
+WAIT_SAMPLES = 1024
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+# Lives on the event loop, so no locking. Slots are handed from a finishing
+# request straight to the next waiter; classes share slots in proportion to
+# their weights, and within a class clients take turns.
+class AdmissionController:
+    def __init__(
+        self,
+        max_active: int = DEFAULT_MAX_ACTIVE,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        rate_per_second: float = 0.0,
+        burst: float = 10.0,
+        weights: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.rate = rate_per_second
+        self.burst = burst
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.clock = clock
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = {"rate": 0, "queue": 0}
+        self.service_seconds = DEFAULT_SERVICE_SECONDS
+        self._virtual = 0.0
+        self._passes = {name: 0.0 for name in self.weights}
+        self._queues: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            name: OrderedDict() for name in self.weights
+        }
+        self._waits: Dict[str, Deque[float]] = {
+            name: deque(maxlen=WAIT_SAMPLES) for name in self.weights
+        }
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _check_rate(self, client: str, now: float) -> None:
+        if self.rate <= 0:
+            return
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+            if len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(client)
+        wait = bucket.take(now)
+        if wait:
+            self.rejected["rate"] += 1
+            raise AdmissionRejected("Too many requests from this client.", wait)
+
+    def _enqueue(self, request_class: str, client: str) -> asyncio.Future:
+        if self.queued >= self.max_queue:
+            self.rejected["queue"] += 1
+            eta = self.service_seconds * (self.queued + 1) / max(1, self.max_active)
+            raise AdmissionRejected("Server is busy.", eta)
+        queue = self._queues[request_class]
+        if not queue:
+            # An idle class rejoins at the current virtual time instead of
+            # cashing in the turns it skipped.
+            self._passes[request_class] = max(self._passes[request_class], self._virtual)
+        future = asyncio.get_running_loop().create_future()
+        queue.setdefault(client, deque()).append(future)
+        self.queued += 1
+        return future
+
+    def _pop(self) -> Optional[asyncio.Future]:
+        ready = [name for name, queue in self._queues.items() if queue]
+        if not ready:
+            return None
+        # Smallest virtual finish time first, as in weighted fair queueing.
+        name = min(ready, key=lambda n: self._passes[n] + 1.0 / self.weights[n])
+        self._virtual = self._passes[name]
+        self._passes[name] += 1.0 / self.weights[name]
+        queue = self._queues[name]
+        client, waiters = next(iter(queue.items()))
+        future = waiters.popleft()
+        if waiters:
+            queue.move_to_end(client)
+        else:
+            del queue[client]
+        self.queued -= 1
+        return future
+
+    def _discard(self, request_class: str, client: str, future: asyncio.Future) -> None:
+        waiters = self._queues[request_class].get(client)
+        if waiters is not None and future in waiters:
+            waiters.remove(future)
+            self.queued -= 1
+            if not waiters:
+                del self._queues[request_class][client]
+
+    def _release(self) -> None:
+        future = self._pop()
+        while future is not None and future.done():
+            future = self._pop()
+        if future is None:
+            self.active -= 1
+        else:
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def admit(self, client: str, request_class: str = BATCH) -> AsyncIterator[None]:
+        if request_class not in self.weights:
+            raise ValueError(f"Unknown request class: {request_class}")
+        arrived = self.clock()
+        self._check_rate(client, arrived)
+        if self.active < self.max_active and not self.queued:
+            self.active += 1
+        else:
+            future = self._enqueue(request_class, client)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()
+                else:
+                    self._discard(request_class, client, future)
+                raise
+        self.admitted += 1
+        started = self.clock()
+        self._waits[request_class].append(started - arrived)
+        try:
+            yield
+        finally:
+            self.service_seconds = 0.9 * self.service_seconds + 0.1 * (self.clock() - started)
+            self._release()
+
+    def snapshot(self) -> Dict[str, object]:
+        waits = {}
+        for name, samples in self._waits.items():
+            ordered = sorted(samples)
+            if ordered:
+                waits[name] = {
+                    f"p{round(q * 100)}_ms": ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+                    * 1000.0
+                    for q in (0.5, 0.99)
+                }
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "queue_depth": {
+                name: sum(len(w) for w in queue.values()) for name, queue in self._queues.items()
+            },
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "wait": waits,
+            "service_seconds": round(self.service_seconds, 3),
+        }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            max_active=int(os.getenv("GENERATE_CONCURRENCY", str(DEFAULT_MAX_ACTIVE))),
+            max_queue=int(os.getenv("GENERATE_QUEUE", str(DEFAULT_MAX_QUEUE))),
+            rate_per_second=float(
+                os.getenv("CLIENT_RATE_PER_MINUTE", str(DEFAULT_RATE_PER_MINUTE))
+            )
+            / 60.0,
+            burst=float(os.getenv("CLIENT_BURST", str(DEFAULT_BURST))),
+        )
+    return _controller
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+STATIC_PREFIX = "/static/"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+COMPRESSIBLE = {".html", ".js", ".css", ".json", ".svg", ".txt", ".map"}
+MIN_COMPRESS_BYTES = 256
+HASH_LENGTH = 10
+SERVICE_WORKER = "sw.js"
+
+
+@dataclass
+class Asset:
+    media_type: str
+    etag: str
+    encodings: Dict[str, bytes] = field(default_factory=dict)
+
+    # Each encoding is its own representation, so it gets its own validator.
+    def etag_for(self, encoding: Optional[str]) -> str:
+        return self.etag if encoding is None else self.etag[:-1] + "-" + encoding + '"'
+
+    def pick(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        accepted = _accepted_encodings(accept_encoding)
+        best: Optional[str] = None
+        best_q = 0.0
+        for encoding in ("br", "gzip"):
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if encoding in self.encodings and q > best_q:
+                best, best_q = encoding, q
+        return best, self.encodings[best or "identity"]
+
+
+# Maps each coding to its q value; `q=0` means "not acceptable" and a bad q counts as 0.
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = [piece.strip() for piece in part.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+@dataclass
+class AssetBundle:
+    index: Asset
+    assets: Dict[str, Asset]
+    hashed_names: Dict[str, str]
+    immutable: frozenset
+    service_worker: Optional[Asset] = None
+
+    def get(self, name: str) -> Optional[Asset]:
+        return self.assets.get(name)
+
+
+def _hashed_name(name: str, body: bytes) -> str:
+    digest = hashlib.blake2b(body, digest_size=8).hexdigest()[:HASH_LENGTH]
+    stem, dot, suffix = name.rpartition(".")
+    return f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+
+
+def _build_asset(name: str, body: bytes) -> Asset:
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type.endswith("javascript"):
+        media_type += "; charset=utf-8"
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    asset = Asset(media_type, etag, {"identity": body})
+    if Path(name).suffix in COMPRESSIBLE and len(body) >= MIN_COMPRESS_BYTES:
+        gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(gzipped) < len(body):
+            asset.encodings["gzip"] = gzipped
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                asset.encodings["br"] = compressed
+    return asset
+
+
+# Assets are fingerprinted and compressed once per process; index.html points
+# at the fingerprinted names so those can be cached forever, while index.html
+# itself and the plain names are revalidated by ETag.
+def build_asset_bundle(client_dir: Path) -> AssetBundle:
+    assets: Dict[str, Asset] = {}
+    hashed_names: Dict[str, str] = {}
+    for path in sorted(client_dir.rglob("*")):
+        name = path.relative_to(client_dir).as_posix()
+        if not path.is_file() or name in ("index.html", SERVICE_WORKER):
+            continue
+        body = path.read_bytes()
+        asset = _build_asset(name, body)
+        hashed = _hashed_name(name, body)
+        assets[name] = assets[hashed] = asset
+        hashed_names[name] = hashed
+
+    html = (client_dir / "index.html").read_text(encoding="utf-8")
+    pattern = re.compile(r"(?<=[\"'])" + re.escape(STATIC_PREFIX) + r"([^\"'?#]+)")
+    html = pattern.sub(
+        lambda m: STATIC_PREFIX + hashed_names.get(m.group(1), m.group(1)), html
+    )
+    index = _build_asset("index.html", html.encode("utf-8"))
+    service_worker = _build_service_worker(client_dir, html, hashed_names)
+    return AssetBundle(
+        index, assets, hashed_names, frozenset(hashed_names.values()), service_worker
+    )
+
+
+# The worker must live at the root to control `/`, so it keeps a plain name and
+# is revalidated; its precache list and version are filled in here instead.
+def _build_service_worker(
+    client_dir: Path, html: str, hashed_names: Dict[str, str]
+) -> Optional[Asset]:
+    path = client_dir / SERVICE_WORKER
+    if not path.is_file():
+        return None
+    shell = ["/"] + [STATIC_PREFIX + hashed_names[name] for name in sorted(hashed_names)]
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(html.encode("utf-8"))
+    digest.update(" ".join(shell).encode("utf-8"))
+    script = path.read_text(encoding="utf-8")
+    script = script.replace("__VERSION__", json.dumps(digest.hexdigest()[:HASH_LENGTH]))
+    script = script.replace("__SHELL__", json.dumps(shell))
+    return _build_asset(SERVICE_WORKER, script.encode("utf-8"))
+
+
+_bundle: Optional[AssetBundle] = None
+
+
+def get_asset_bundle(client_dir: Path) -> AssetBundle:
+    global _bundle
+    if _bundle is None:
+        _bundle = build_asset_bundle(client_dir)
+    return _bundle
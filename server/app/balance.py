@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Dict, List, Sequence
+
+
+MURDERER_HARD_SHARE = 0.5
+HARD_CONCENTRATION = 0.5
+MIN_TRUE_HARD = 2
+MISLEADING_OVERLAP = 0.5
+
+
+def graph_diameter(adjacency: Sequence[Sequence[int]]) -> int:
+    diameter = 0
+    for start in range(len(adjacency)):
+        depth = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for nxt in adjacency[node]:
+                if nxt not in depth:
+                    depth[nxt] = depth[node] + 1
+                    queue.append(nxt)
+        if len(depth) < len(adjacency):
+            return -1
+        diameter = max(diameter, max(depth.values()))
+    return diameter
+
+
+# Balance figures for the seeded skeleton of a game (clue types, clue owners,
+# murderer and relationship graph); text fields are ignored.
+def structure_metrics(structure: Dict[str, Any]) -> Dict[str, float]:
+    packets = structure["character_packets"]
+    ids = [p["character_id"] for p in packets]
+    position = {cid: pos for pos, cid in enumerate(ids)}
+    murderer = structure["solution"]["murderer_id"]
+    hard = {c["clue_id"] for c in structure["clues"] if c["type"] == "hard"}
+    misleading = {c["clue_id"] for c in structure["clues"] if c["is_misleading"]}
+    hard_held = [len(hard.intersection(p["clue_ids"])) for p in packets]
+    hard_count = len(hard) or 1
+
+    neighbours: List[set] = [set() for _ in packets]
+    for pos, packet in enumerate(packets):
+        for rel in packet["relationships"]:
+            other = position.get(rel["character_id"])
+            if other is not None and other != pos:
+                neighbours[pos].add(other)
+                neighbours[other].add(pos)
+    degrees = [len(n) for n in neighbours]
+    return {
+        "murderer_hard_share": hard_held[position[murderer]] / hard_count,
+        "hard_max_share": max(hard_held) / hard_count,
+        "true_hard": len(hard - misleading),
+        "misleading_overlap": len(hard & misleading) / hard_count,
+        "degree_min": min(degrees),
+        "degree_max": max(degrees),
+        "murderer_degree": degrees[position[murderer]],
+        "diameter": graph_diameter([sorted(n) for n in neighbours]),
+    }
+
+
+def degenerate_flags(metrics: Dict[str, float]) -> List[str]:
+    flags = []
+    if metrics["murderer_hard_share"] >= MURDERER_HARD_SHARE:
+        flags.append("murderer_holds_evidence")
+    if metrics["hard_max_share"] > HARD_CONCENTRATION:
+        flags.append("hard_concentrated")
+    if metrics["true_hard"] < MIN_TRUE_HARD:
+        flags.append("weak_evidence")
+    if metrics["misleading_overlap"] >= MISLEADING_OVERLAP:
+        flags.append("misleading_overlap")
+    if metrics["diameter"] < 0:
+        flags.append("disconnected")
+    return flags
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .together_client import TogetherClient, TogetherClientError
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CASSETTE_PATH = BASE_DIR / "cassettes" / "llm.sqlite3"
+CASSETTE_MODES = {"off", "record", "replay"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    prompt_hash TEXT NOT NULL,
+    system_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    response TEXT NOT NULL,
+    latency_ms REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_prompt ON responses (prompt_hash);
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    recorded_at REAL NOT NULL
+);
+"""
+
+
+def _hash(text: Optional[str]) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def cassette_key(
+    prompt: str, system_prompt: Optional[str], params: Dict[str, Any]
+) -> Tuple[str, str, str, str]:
+    prompt_hash = _hash(prompt)
+    system_hash = _hash(system_prompt)
+    params_json = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    key = _hash(f"{prompt_hash}:{system_hash}:{params_json}")
+    return key, prompt_hash, system_hash, params_json
+
+
+def cassette_mode() -> str:
+    mode = os.getenv("LLM_CASSETTE", "off").lower()
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"LLM_CASSETTE must be one of {sorted(CASSETTE_MODES)}.")
+    return mode
+
+
+class CassetteStore:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency_ms FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(
+        self,
+        key: str,
+        prompt_hash: str,
+        system_hash: str,
+        params_json: str,
+        response: str,
+        latency_ms: float,
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, prompt_hash, system_hash, params_json, response, latency_ms, time.time()),
+            )
+
+    def add_request(self, payload: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO requests (payload, recorded_at) VALUES (?, ?)",
+                (json.dumps(payload, sort_keys=True), time.time()),
+            )
+
+    def iter_requests(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM requests ORDER BY id").fetchall()
+        for (payload,) in rows:
+            yield json.loads(payload)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class CassetteClient:
+    def __init__(
+        self,
+        store: CassetteStore,
+        mode: str,
+        inner: Optional[TogetherClient] = None,
+        model: Optional[str] = None,
+        latency_scale: float = 0.0,
+    ) -> None:
+        if mode == "record" and inner is None:
+            raise ValueError("Recording needs a live client.")
+        self.store = store
+        self.mode = mode
+        self.inner = inner
+        self.model = model or getattr(inner, "model", None) or os.getenv(
+            "TOGETHER_MODEL", "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"
+        )
+        self.latency_scale = latency_scale
+        self.last_latency_ms: Optional[float] = None
+
+    def generate_text(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.2,
+        top_p: float = 0.8,
+        max_tokens: int = 3500,
+        timeout: Optional[float] = None,
+        requested_tokens: Optional[int] = None,
+    ) -> str:
+        # Keyed on the cap before the deadline shrank it, so a call recorded late
+        # in a slow request still replays when there is time to spare.
+        params = {
+            "model": self.model,
+            "temperature": temperature,
+            "top_p": top_p,
+            "max_tokens": requested_tokens or max_tokens,
+        }
+        key, prompt_hash, system_hash, params_json = cassette_key(prompt, system_prompt, params)
+        if self.mode == "replay":
+            hit = self.store.get(key)
+            if hit is None:
+                raise TogetherClientError(f"No cassette entry for prompt {prompt_hash[:12]}.")
+            response, latency_ms = hit
+            self.last_latency_ms = latency_ms
+            if self.latency_scale > 0:
+                time.sleep(latency_ms * self.latency_scale / 1000.0)
+            return response
+
+        started = time.perf_counter()
+        response = self.inner.generate_text(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            timeout=timeout,
+        )
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        self.last_latency_ms = latency_ms
+        self.store.put(key, prompt_hash, system_hash, params_json, response, latency_ms)
+        return response
+
+
+_stores: Dict[str, CassetteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_cassette_store(path: Optional[str] = None) -> CassetteStore:
+    resolved = Path(path or os.getenv("LLM_CASSETTE_PATH", str(DEFAULT_CASSETTE_PATH)))
+    with _stores_lock:
+        store = _stores.get(str(resolved))
+        if store is None:
+            store = _stores[str(resolved)] = CassetteStore(resolved)
+    return store
+
+
+def wrap_client(mode: str, inner: Optional[TogetherClient]) -> CassetteClient:
+    return CassetteClient(
+        get_cassette_store(),
+        mode,
+        inner=inner,
+        latency_scale=float(os.getenv("LLM_CASSETTE_LATENCY", "0")),
+    )
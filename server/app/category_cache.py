@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from .models import Category
+
+
+# Sections that depend only on category and tone, shared by every seed.
+SHARED_FIELDS = ("theme_summary", "props_list", "how_to_play")
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+Key = Tuple[str, str]
+Producer = Callable[[Category, str], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class SharedBlock:
+    content: Dict[str, Any]
+    version: str
+    created_at: float
+
+
+class CategoryContentCache:
+    def __init__(
+        self,
+        producer: Producer,
+        version: Callable[[], str],
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        executor: Optional[Executor] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.producer = producer
+        self.version = version
+        self.ttl_seconds = ttl_seconds
+        self.executor = executor
+        self.clock = clock
+        self._blocks: Dict[Key, SharedBlock] = {}
+        self._pending: Set[Key] = set()
+        self._lock = threading.Lock()
+
+    # Misses and version changes return None and refresh in the background;
+    # expired blocks are still served while their replacement is generated.
+    def get(self, category: Category, tone: str) -> Optional[Dict[str, Any]]:
+        key = (category.id, tone)
+        with self._lock:
+            block = self._blocks.get(key)
+        if block is None or block.version != self.version():
+            self._schedule(category, tone)
+            return None
+        if self.clock() - block.created_at > self.ttl_seconds:
+            self._schedule(category, tone)
+        return block.content
+
+    def put(self, category_id: str, tone: str, content: Dict[str, Any]) -> None:
+        with self._lock:
+            self._blocks[(category_id, tone)] = SharedBlock(content, self.version(), self.clock())
+
+    def refresh(self, category: Category, tone: str) -> None:
+        key = (category.id, tone)
+        try:
+            self.put(category.id, tone, self.producer(category, tone))
+        except Exception as exc:  # noqa: BLE001
+            logging.getLogger("mp1.llm").warning("Shared content refresh failed for %s: %s", key, exc)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _schedule(self, category: Category, tone: str) -> None:
+        key = (category.id, tone)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        if self.executor is None:
+            self.refresh(category, tone)
+        else:
+            self.executor.submit(self.refresh, category, tone)
+
+
+_cache: Optional[CategoryContentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_category_cache(producer: Producer, version: Callable[[], str]) -> CategoryContentCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CategoryContentCache(
+                producer,
+                version,
+                ttl_seconds=float(os.getenv("CATEGORY_CACHE_TTL", str(DEFAULT_TTL_SECONDS))),
+                executor=ThreadPoolExecutor(max_workers=1, thread_name_prefix="category-cache"),
+            )
+    return _cache
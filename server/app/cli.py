@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .deadline import Deadline
+from .experiments import compare_variants
+from .generator import generate_game
+from .models import GenerateRequest
+from .seed import DURATIONS, MAX_PLAYERS, MIN_PLAYERS, TONES
+from .storage import get_categories
+
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SHARD_SIZE = 200
+DEFAULT_CONCURRENCY = 4
+MAX_ERRORS_PER_SHARD = 20
+# Nobody is waiting on a batch game, so it gets far longer than an HTTP request.
+DEFAULT_BATCH_DEADLINE_MS = 300000
+
+Job = Tuple[int, str, int, Optional[str], Optional[int]]
+
+
+def parse_seeds(value: Any) -> List[int]:
+    if isinstance(value, list):
+        return [int(seed) for seed in value]
+    start, _, stop = str(value).partition(":")
+    if not stop:
+        return [int(start)]
+    return list(range(int(start), int(stop)))
+
+
+def _split(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+def build_spec(args: argparse.Namespace) -> Dict[str, Any]:
+    spec: Dict[str, Any] = {}
+    if args.spec:
+        with open(args.spec, "r", encoding="utf-8") as handle:
+            spec = json.load(handle)
+    for key in ("seeds", "categories", "players", "tones", "durations"):
+        value = getattr(args, key)
+        if value is not None:
+            spec[key] = value
+    if "seeds" not in spec:
+        raise SystemExit("A seed range (--seeds start:stop) or a spec file with seeds is required.")
+
+    known = [category.id for category in get_categories()]
+    categories = _split(spec.get("categories", "random"))
+    if categories == ["all"]:
+        categories = known
+    unknown = [c for c in categories if c != "random" and c not in known]
+    if unknown:
+        raise SystemExit(f"Unknown categories: {', '.join(unknown)}")
+    players = [int(p) for p in _split(spec.get("players", "6"))]
+    if any(not MIN_PLAYERS <= p <= MAX_PLAYERS for p in players):
+        raise SystemExit(f"Player counts must be between {MIN_PLAYERS} and {MAX_PLAYERS}.")
+    tones = _split(spec.get("tones", "default"))
+    if any(t != "default" and t not in TONES for t in tones):
+        raise SystemExit(f"Tones must be default or one of {', '.join(TONES)}.")
+    durations = _split(spec.get("durations", "default"))
+    if any(d != "default" and int(d) not in DURATIONS for d in durations):
+        raise SystemExit(f"Durations must be default or one of {DURATIONS}.")
+    return {
+        "seeds": parse_seeds(spec["seeds"]),
+        "categories": categories,
+        "players": players,
+        "tones": tones,
+        "durations": durations,
+    }
+
+
+def plan_jobs(spec: Dict[str, Any]) -> List[Job]:
+    return [
+        (
+            seed,
+            category,
+            players,
+            None if tone == "default" else tone,
+            None if duration == "default" else int(duration),
+        )
+        for seed, category, players, tone, duration in itertools.product(
+            spec["seeds"], spec["categories"], spec["players"], spec["tones"], spec["durations"]
+        )
+    ]
+
+
+def spec_fingerprint(spec: Dict[str, Any], shard_size: int) -> str:
+    raw = json.dumps({"spec": spec, "shard_size": shard_size}, sort_keys=True)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def shard_name(index: int) -> str:
+    return f"shard-{index:05d}.jsonl.gz"
+
+
+def load_manifest(out_dir: str, fingerprint: str, total_shards: int) -> Dict[str, Any]:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"fingerprint": fingerprint, "total_shards": total_shards, "shards": {}}
+    with open(path, "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("fingerprint") != fingerprint:
+        raise SystemExit(f"{path} belongs to a different spec; use a new --out directory.")
+    # A shard only counts as written if its file survived too, and its failed
+    # jobs can only be retried if they were recorded.
+    manifest["shards"] = {
+        name: entry
+        for name, entry in manifest["shards"].items()
+        if os.path.exists(os.path.join(out_dir, name))
+        and (not entry["error_count"] or "failed_jobs" in entry)
+    }
+    return manifest
+
+
+def write_manifest(out_dir: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+# No procedural fallback: a game the LLM could not write is a failed job, so a
+# resume retries it instead of the corpus filling up with template games.
+def _generate_line(job: Job, deadline_ms: int = DEFAULT_BATCH_DEADLINE_MS) -> bytes:
+    seed, category, players, tone, duration = job
+    request = GenerateRequest(
+        player_count=players, category_id=category, tone=tone, duration=duration, seed=seed
+    )
+    game = generate_game(request, Deadline(deadline_ms / 1000.0), fallback=False)
+    return game.model_dump_json().encode("utf-8") + b"\n"
+
+
+# LLM calls block on HTTP, so each worker process overlaps `concurrency`
+# generations on threads and the pool spreads shards across cores.
+async def _run_jobs(jobs: Sequence[Job], concurrency: int, deadline_ms: int) -> List[Any]:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(job: Job) -> Any:
+        async with gate:
+            try:
+                return await asyncio.to_thread(_generate_line, job, deadline_ms)
+            except Exception as exc:  # noqa: BLE001
+                return exc
+
+    return await asyncio.gather(*(one(job) for job in jobs))
+
+
+# With `append`, only the shard's failed jobs are rerun and their games are
+# added to the existing file as a second gzip member.
+def run_shard(
+    out_dir: str,
+    index: int,
+    jobs: Sequence[Job],
+    concurrency: int,
+    append: bool = False,
+    deadline_ms: int = DEFAULT_BATCH_DEADLINE_MS,
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    results = asyncio.run(_run_jobs(jobs, concurrency, deadline_ms))
+    name = shard_name(index)
+    path = os.path.join(out_dir, name)
+    errors = []
+    with open(path + ".tmp", "wb") as raw:
+        if append:
+            with open(path, "rb") as existing:
+                shutil.copyfileobj(existing, raw)
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as handle:
+            for job, result in zip(jobs, results):
+                if isinstance(result, Exception):
+                    errors.append({"job": list(job), "error": str(result)})
+                else:
+                    handle.write(result)
+    os.replace(path + ".tmp", path)
+    return {
+        "name": name,
+        "games": len(jobs) - len(errors),
+        "errors": errors[:MAX_ERRORS_PER_SHARD],
+        "error_count": len(errors),
+        "failed_jobs": [error["job"] for error in errors],
+        "bytes": os.path.getsize(path),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _report(done: int, total: int, games: int, errors: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    rate = games / elapsed if elapsed else 0.0
+    print(
+        f"shards {done}/{total} games={games} errors={errors} "
+        f"{rate:.1f} games/s elapsed={elapsed:.1f}s",
+        flush=True,
+    )
+
+
+def generate_corpus(args: argparse.Namespace) -> Dict[str, Any]:
+    spec = build_spec(args)
+    jobs = plan_jobs(spec)
+    shards = [jobs[i : i + args.shard_size] for i in range(0, len(jobs), args.shard_size)]
+    os.makedirs(args.out, exist_ok=True)
+    manifest = load_manifest(args.out, spec_fingerprint(spec, args.shard_size), len(shards))
+    manifest["spec"] = spec
+    # Shards that were never written run in full; written shards with failed
+    # jobs rerun only those.
+    tasks: List[Tuple[int, Sequence[Job], Optional[Dict[str, Any]]]] = []
+    for index, shard in enumerate(shards):
+        previous = manifest["shards"].get(shard_name(index))
+        if previous is None:
+            tasks.append((index, shard, None))
+        elif previous["error_count"]:
+            tasks.append((index, [tuple(job) for job in previous["failed_jobs"]], previous))
+    print(
+        f"{len(jobs)} games in {len(shards)} shards; "
+        f"{len(shards) - len(tasks)} already done, {len(tasks)} to run",
+        flush=True,
+    )
+
+    started = time.perf_counter()
+    done = len(shards) - len(tasks)
+    games = errors = 0
+
+    def record(entry: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> None:
+        nonlocal done, games, errors
+        games += entry["games"]
+        errors += entry["error_count"]
+        if previous is not None:
+            entry["games"] += previous["games"]
+        manifest["shards"][entry["name"]] = entry
+        write_manifest(args.out, manifest)
+        done += 0 if entry["error_count"] else 1
+        _report(done, len(shards), games, errors, started)
+
+    if args.workers <= 1:
+        for index, shard_jobs, previous in tasks:
+            entry = run_shard(
+                args.out,
+                index,
+                shard_jobs,
+                args.concurrency,
+                append=previous is not None,
+                deadline_ms=args.deadline_ms,
+            )
+            record(entry, previous)
+        return manifest
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        running: Dict[Future, Optional[Dict[str, Any]]] = {}
+        queue = iter(tasks)
+
+        def submit(count: int) -> None:
+            for index, shard_jobs, previous in itertools.islice(queue, count):
+                future = pool.submit(
+                    run_shard,
+                    args.out,
+                    index,
+                    shard_jobs,
+                    args.concurrency,
+                    previous is not None,
+                    args.deadline_ms,
+                )
+                running[future] = previous
+
+        submit(args.workers * 2)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record(future.result(), running.pop(future))
+            submit(len(finished))
+    return manifest
+
+
+def iter_metas(paths: Sequence[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        names = sorted(os.listdir(path)) if os.path.isdir(path) else [path]
+        for name in names:
+            full = os.path.join(path, name) if os.path.isdir(path) else name
+            if not full.endswith(".jsonl.gz"):
+                continue
+            with gzip.open(full, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    yield json.loads(line)["meta"]
+
+
+def print_report(report: Dict[str, Dict[str, Any]]) -> None:
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.0f}"
+
+    markers = ["retry", "repair:json", "repair:llm", "repair:template", "procedural:fallback"]
+    print(f"{'variant':<40} {'games':>6} {'p50 ms':>8} {'p95 ms':>8} {'tokens':>7} {'issues':>6} "
+          + " ".join(f"{m:>15}" for m in markers))
+    for key, row in report.items():
+        rates = " ".join(f"{row['rates'][m]:>15.1%}" for m in markers)
+        print(
+            f"{key:<40} {row['games']:>6} {ms(row['latency_p50_ms']):>8} "
+            f"{ms(row['latency_p95_ms']):>8} {row['completion_tokens_mean']:>7.0f} "
+            f"{row['validation_issues_mean']:>6.2f} {rates}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gen = commands.add_parser(
+        "generate", help="Generate a corpus of games into gzip JSONL shards (resumable)."
+    )
+    gen.add_argument("--spec", help="JSON file with seeds, categories, players, tones, durations.")
+    gen.add_argument("--seeds", help="Seed range start:stop (stop excluded) or a single seed.")
+    gen.add_argument("--categories", help="Comma-separated category ids, 'random' or 'all'.")
+    gen.add_argument("--players", help="Comma-separated player counts (default 6).")
+    gen.add_argument("--tones", help="Comma-separated tones, or 'default'.")
+    gen.add_argument("--durations", help="Comma-separated durations, or 'default'.")
+    gen.add_argument("--out", required=True, help="Output directory for shards and manifest.")
+    gen.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    gen.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                     help="Concurrent generations per worker process.")
+    gen.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    gen.add_argument("--deadline-ms", type=int, default=DEFAULT_BATCH_DEADLINE_MS,
+                     help="Time budget per game; LLM failures are retried on the next run.")
+    report = commands.add_parser(
+        "report", help="Compare prompt variants over the games in corpus shards."
+    )
+    report.add_argument("paths", nargs="+", help="Corpus directories or .jsonl.gz shards.")
+    report.add_argument("--json", action="store_true", help="Print the comparison as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        comparison = compare_variants(iter_metas(args.paths))
+        if args.json:
+            print(json.dumps(comparison, indent=2))
+        else:
+            print_report(comparison)
+    elif args.command == "generate":
+        manifest = generate_corpus(args)
+        failed = sum(entry["error_count"] for entry in manifest["shards"].values())
+        if failed:
+            print(f"{failed} games failed; rerun the same command to retry them "
+                  f"(see {os.path.join(args.out, MANIFEST_NAME)})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, FrozenSet, List
+
+from .schema import KEYED, NESTED, PACKAGE_PLAN, TEMPLATE_FIELDS, TEXT, ModelPlan
+
+
+# The generation and repair prompts describe each repeated entity once and
+# list only the template-owned facts; the LLM answers with keyed sections
+# ({"char_01": {...}}) that expand_keyed turns back into the template lists.
+
+
+def _single_text_field(plan: ModelPlan) -> str:
+    if len(plan.steps) == 1 and plan.steps[0][1] == TEXT:
+        return plan.steps[0][0]
+    return ""
+
+
+def _placeholder(plan: ModelPlan, name: str, kind: int, op: Any) -> Any:
+    if kind == TEXT:
+        return ""
+    if kind == NESTED:
+        return {n: _placeholder(op, n, k, o) for n, k, o in op.steps}
+    if kind == KEYED:
+        shape = "" if _single_text_field(op) else _placeholder(op, "", NESTED, op)
+        return {f"<{op.id_field}>": shape}
+    if op is not None:
+        return []
+    return 0 if plan.model.model_fields[name].annotation is int else ""
+
+
+def _skeleton(plan: ModelPlan, data: Dict[str, Any], omit: FrozenSet[str]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, kind, op in plan.steps:
+        if name in omit or (kind == NESTED and not op.steps):
+            continue
+        value = data.get(name)
+        if kind == NESTED and isinstance(value, dict):
+            out[name] = {n: value.get(n) or _placeholder(op, n, k, o) for n, k, o in op.steps}
+        elif kind != KEYED and value:
+            out[name] = value
+        else:
+            out[name] = _placeholder(plan, name, kind, op)
+    return out
+
+
+def _fact(value: Any) -> str:
+    if isinstance(value, list):
+        return ",".join(str(item) for item in value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return json.dumps(value) if isinstance(value, str) and " " in value else str(value)
+
+
+def _template_fields(plan: ModelPlan) -> List[str]:
+    owned = TEMPLATE_FIELDS.get(plan.model, frozenset())
+    return [name for name in plan.model.model_fields if name in owned]
+
+
+def _fixed_facts(plan: ModelPlan, data: Dict[str, Any], omit: FrozenSet[str]) -> List[str]:
+    lines: List[str] = []
+    for name, kind, op in plan.steps:
+        value = data.get(name)
+        if name in omit or not value:
+            continue
+        if kind == NESTED and op.model in TEMPLATE_FIELDS and op.steps:
+            fixed = _template_fields(op)
+            lines.append(" ".join(f"{name}.{field}={_fact(value.get(field))}" for field in fixed))
+        elif kind == KEYED:
+            fixed = _template_fields(op)
+            nested = [(n, o) for n, k, o in op.steps if k == KEYED]
+            if not fixed and not nested:
+                lines.append(f"{name}: " + " ".join(item[op.id_field] for item in value))
+                continue
+            lines.append(f"{name}:")
+            for item in value:
+                parts = [item[op.id_field]]
+                parts.extend(f"{field}={_fact(item.get(field))}" for field in fixed)
+                parts.extend(
+                    f"{n}={_fact([sub[o.id_field] for sub in item.get(n, [])])}" for n, o in nested
+                )
+                lines.append(" ".join(parts))
+    return lines
+
+
+def compact_schema(
+    structure: Dict[str, Any], omit: FrozenSet[str] = frozenset(), plan: ModelPlan = PACKAGE_PLAN
+) -> str:
+    skeleton = json.dumps(_skeleton(plan, structure, omit), separators=(",", ":"))
+    facts = "\n".join(_fixed_facts(plan, structure, omit))
+    return f"Output shape:\n{skeleton}\n\nFixed facts (ids, names, assignments):\n{facts}"
+
+
+def to_keyed(data: Dict[str, Any], plan: ModelPlan = PACKAGE_PLAN) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, kind, op in plan.steps:
+        if name not in data:
+            continue
+        value = data[name]
+        if kind == NESTED:
+            if op.steps and isinstance(value, dict):
+                out[name] = to_keyed(value, op)
+        elif kind == KEYED and isinstance(value, list):
+            single = _single_text_field(op)
+            out[name] = {
+                item[op.id_field]: item.get(single) if single else to_keyed(item, op)
+                for item in value
+                if isinstance(item, dict) and op.id_field in item
+            }
+        else:
+            out[name] = value
+    return out
+
+
+def _expand_item(plan: ModelPlan, key: str, item: Any) -> Dict[str, Any]:
+    if isinstance(item, dict):
+        return {**item, plan.id_field: key}
+    single = _single_text_field(plan)
+    return {plan.id_field: key, single: item} if single else {plan.id_field: key}
+
+
+def expand_keyed(data: Dict[str, Any], plan: ModelPlan = PACKAGE_PLAN) -> Dict[str, Any]:
+    for name, kind, op in plan.steps:
+        value = data.get(name)
+        if kind == NESTED and type(value) is dict:
+            expand_keyed(value, op)
+        elif kind == KEYED:
+            if type(value) is dict:
+                value = data[name] = [_expand_item(op, key, item) for key, item in value.items()]
+            if type(value) is list and any(k == KEYED for _n, k, _o in op.steps):
+                for item in value:
+                    if type(item) is dict:
+                        expand_keyed(item, op)
+    return data
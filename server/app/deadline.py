@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Optional
+
+
+DEFAULT_DEADLINE_MS = 55000
+# Fixed per-call cost (connect, queueing, prompt processing) on top of decoding.
+CALL_OVERHEAD_SECONDS = 1.5
+DEFAULT_TOKENS_PER_SECOND = 120.0
+# A call shrunk below this share of its max_tokens would likely truncate; skip it instead.
+MIN_TOKEN_FRACTION = 0.7
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self.expires_at = clock() + seconds
+        self.tokens_per_second = float(
+            os.getenv("LLM_TOKENS_PER_SECOND", str(DEFAULT_TOKENS_PER_SECOND))
+        )
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    def token_budget(self, max_tokens: int) -> int:
+        affordable = int((self.remaining() - CALL_OVERHEAD_SECONDS) * self.tokens_per_second)
+        if affordable < max_tokens * MIN_TOKEN_FRACTION:
+            return 0
+        return min(max_tokens, affordable)
+
+    def require_call(self, max_tokens: int, stage: str) -> int:
+        budget = self.token_budget(max_tokens)
+        if not budget:
+            raise DeadlineExceeded(f"No time left for {stage} ({self.remaining():.1f}s remaining).")
+        return budget
+
+
+def server_deadline_ms() -> int:
+    return int(os.getenv("GENERATE_DEADLINE_MS", str(DEFAULT_DEADLINE_MS)))
+
+
+def deadline_from_header(value: Optional[int]) -> Deadline:
+    budget_ms = server_deadline_ms()
+    if value is not None and value > 0:
+        budget_ms = min(budget_ms, value)
+    return Deadline(budget_ms / 1000.0)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .storage import BASE_VARIANT
+
+
+CHARS_PER_TOKEN = 4
+# Generation path markers compared between variants, reported as rates.
+PATH_MARKERS = (
+    "retry",
+    "repair:local",
+    "repair:json",
+    "repair:llm",
+    "repair:template",
+    "solvability:failed",
+    "procedural:deadline",
+    "procedural:fallback",
+)
+MAX_LATENCY_SAMPLES = 4096
+
+
+# Counts calls, LLM latency and answer sizes for one request. The provider's
+# token usage is preferred when the client reports it, and a cassette's recorded
+# latency wins over the wall clock so that replays reproduce the same meta.
+class MeteredClient:
+    def __init__(self, inner: Any) -> None:
+        self.inner = inner
+        self.calls = 0
+        self.completion_chars = 0
+        self.latency_ms = 0.0
+
+    def generate_text(self, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        text = self.inner.generate_text(**kwargs)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        self.latency_ms += getattr(self.inner, "last_latency_ms", None) or elapsed
+        self.calls += 1
+        self.completion_chars += len(text)
+        return text
+
+    def stats(self, validation_issues: int) -> Dict[str, float]:
+        usage = getattr(self.inner, "usage", None) or {}
+        completion = usage.get("completion_tokens") or 0
+        stats = {
+            "latency_ms": round(self.latency_ms, 1),
+            "llm_calls": self.calls,
+            "completion_tokens": completion or self.completion_chars // CHARS_PER_TOKEN,
+            "tokens_estimated": 0 if completion else 1,
+            "validation_issues": validation_issues,
+        }
+        if usage.get("prompt_tokens"):
+            stats["prompt_tokens"] = usage["prompt_tokens"]
+        return stats
+
+
+def variant_key(prompt_variants: Optional[Dict[str, str]]) -> str:
+    if not prompt_variants:
+        return BASE_VARIANT
+    return ",".join(f"{name}={variant}" for name, variant in sorted(prompt_variants.items()))
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Aggregates game metas by prompt variant; fed live by generate_game and
+# offline by `python -m app.cli report` over corpus shards.
+class VariantStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._variants: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, meta: Dict[str, Any]) -> None:
+        key = variant_key(meta.get("prompt_variants"))
+        stats = meta.get("stats") or {}
+        path = meta.get("generation_path") or []
+        with self._lock:
+            entry = self._variants.setdefault(
+                key,
+                {
+                    "games": 0,
+                    "measured": 0,
+                    "latency_ms": [],
+                    "completion_tokens": 0,
+                    "validation_issues": 0,
+                    "markers": {marker: 0 for marker in PATH_MARKERS},
+                },
+            )
+            entry["games"] += 1
+            for marker in PATH_MARKERS:
+                if marker in path:
+                    entry["markers"][marker] += 1
+            if stats:
+                entry["measured"] += 1
+                if len(entry["latency_ms"]) < MAX_LATENCY_SAMPLES:
+                    entry["latency_ms"].append(stats.get("latency_ms", 0.0))
+                entry["completion_tokens"] += stats.get("completion_tokens", 0)
+                entry["validation_issues"] += stats.get("validation_issues", 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: _summarize(entry) for key, entry in sorted(self._variants.items())}
+
+
+def _summarize(entry: Dict[str, Any]) -> Dict[str, Any]:
+    games = entry["games"]
+    measured = entry["measured"] or 1
+    return {
+        "games": games,
+        "latency_p50_ms": _percentile(entry["latency_ms"], 0.5),
+        "latency_p95_ms": _percentile(entry["latency_ms"], 0.95),
+        "completion_tokens_mean": entry["completion_tokens"] / measured,
+        "validation_issues_mean": entry["validation_issues"] / measured,
+        "rates": {marker: count / games for marker, count in entry["markers"].items()},
+    }
+
+
+def compare_variants(metas: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    stats = VariantStats()
+    for meta in metas:
+        stats.record(meta)
+    return stats.snapshot()
+
+
+_stats = VariantStats()
+
+
+def get_variant_stats() -> VariantStats:
+    return _stats
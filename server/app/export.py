@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import io
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from html import escape
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+TEMPLATE_VERSION = "1"
+DEFAULT_CACHE_SIZE = 32
+STREAM_CHUNK_SIZE = 64 * 1024
+
+PRINT_CSS = """
+body { font-family: Georgia, serif; margin: 2rem; color: #1d1d1d; }
+h1, h2, h3 { font-family: "Helvetica Neue", Arial, sans-serif; }
+.meta { color: #555; font-size: 0.9rem; }
+.clue { border: 1px solid #999; padding: 0.5rem 0.75rem; margin: 0.5rem 0; }
+.checklist li { list-style: none; margin: 0.4rem 0; }
+.checklist li::before { content: "\\2610  "; }
+section { page-break-inside: avoid; }
+@media print { body { margin: 0.5in; } .page-break { page-break-before: always; } }
+"""
+
+Page = Tuple[str, str, Dict[str, Any]]
+
+
+def _page(title: str, body: str) -> str:
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"UTF-8\" />"
+        f"<title>{escape(title)}</title><style>{PRINT_CSS}</style></head>"
+        f"<body>{body}</body></html>"
+    )
+
+
+def _items(values: List[Any]) -> str:
+    return "".join(f"<li>{escape(str(value))}</li>" for value in values)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_") or "character"
+
+
+def render_character_page(payload: Dict[str, Any]) -> str:
+    packet = payload["character"]
+    clues = payload["clues"]
+    names = payload["names"]
+    relationships = "".join(
+        f"<li><strong>{escape(names.get(rel['character_id'], rel['character_id']))}</strong>: "
+        f"{escape(rel.get('relationship', ''))}</li>"
+        for rel in packet.get("relationships", [])
+    )
+    clue_cards = "".join(
+        f"<div class=\"clue\"><strong>{escape(clue['title'])}</strong>"
+        f"<p>{escape(clue['description'])}</p></div>"
+        for clue in clues
+    )
+    body = (
+        f"<h1>{escape(packet['name'])}</h1>"
+        f"<p class=\"meta\">{escape(packet.get('role_title', ''))} &middot; "
+        f"{escape(payload['title'])}</p>"
+        f"<section><h2>Backstory</h2><p>{escape(packet.get('backstory', ''))}</p></section>"
+        f"<section><h2>Connection to the victim</h2>"
+        f"<p>{escape(packet.get('connection_to_victim', ''))}</p></section>"
+        f"<section><h2>Relationships</h2><ul>{relationships}</ul></section>"
+        f"<section><h2>Traits</h2><p>{escape(', '.join(packet.get('traits', [])))}</p></section>"
+        f"<section><h2>Goals</h2><p><strong>Public:</strong> {escape(packet.get('public_goal', ''))}</p>"
+        f"<p><strong>Secret:</strong> {escape(packet.get('secret_goal', ''))}</p></section>"
+        f"<section><h2>Secrets</h2><ul>{_items(packet.get('secrets', []))}</ul></section>"
+        f"<section><h2>Alibi</h2><p>{escape(packet.get('alibi', ''))}</p></section>"
+        f"<section><h2>Intro monologue</h2><ul>{_items(packet.get('intro_monologue', []))}</ul></section>"
+        f"<section class=\"page-break\"><h2>Your clues</h2>{clue_cards}</section>"
+    )
+    return _page(f"{packet['name']} - Character Packet", body)
+
+
+def render_host_booklet(payload: Dict[str, Any]) -> str:
+    game = payload["game"]
+    names = payload["names"]
+    solution = game["solution"]
+    timeline = "".join(
+        f"<li><strong>{escape(event['time'])}</strong> &ndash; {escape(event['description'])}</li>"
+        for event in game["timeline"]
+    )
+    rounds = "".join(
+        f"<li><strong>{escape(rnd['title'])}</strong> ({rnd['minutes']} min): "
+        f"{escape(rnd['description'])}</li>"
+        for rnd in game["how_to_play"]
+    )
+    roster = "".join(
+        f"<li>{escape(packet['name'])} &ndash; {escape(packet.get('role_title', ''))}</li>"
+        for packet in game["character_packets"]
+    )
+    murderer = names.get(solution["murderer_id"], solution["murderer_id"])
+    body = (
+        f"<h1>{escape(game['title'])}</h1>"
+        f"<p class=\"meta\">Host booklet &middot; share code {escape(game['meta']['share_code'])}</p>"
+        f"<section><h2>Setting</h2><p>{escape(game['theme_summary'])}</p>"
+        f"<ul>{_items(game['storyline_overview'])}</ul></section>"
+        f"<section><h2>The victim</h2><p><strong>{escape(game['victim']['name'])}</strong>, "
+        f"{escape(game['victim']['role'])}. {escape(game['victim']['why_they_mattered'])}</p></section>"
+        f"<section><h2>Cast</h2><ul>{roster}</ul></section>"
+        f"<section><h2>How to play</h2><ol>{rounds}</ol></section>"
+        f"<section><h2>Timeline</h2><ul>{timeline}</ul></section>"
+        f"<section class=\"page-break\"><h2>Solution (host only)</h2>"
+        f"<p><strong>Murderer:</strong> {escape(murderer)}</p>"
+        f"<p><strong>Motive:</strong> {escape(solution['motive'])}</p>"
+        f"<p><strong>Method:</strong> {escape(solution['method'])}</p>"
+        f"<p><strong>Opportunity:</strong> {escape(solution['opportunity'])}</p>"
+        f"<p>{escape(solution['reveal_explanation'])}</p></section>"
+    )
+    return _page(f"{game['title']} - Host Booklet", body)
+
+
+def render_props_checklist(payload: Dict[str, Any]) -> str:
+    game = payload["game"]
+    props = list(game.get("props_list", []))
+    props.extend(
+        f"{packet['name']}: {packet['prop_suggestion']}"
+        for packet in game["character_packets"]
+        if packet.get("prop_suggestion")
+    )
+    body = (
+        f"<h1>Props checklist</h1><p class=\"meta\">{escape(game['title'])}</p>"
+        f"<ul class=\"checklist\">{_items(props)}</ul>"
+    )
+    return _page(f"{game['title']} - Props Checklist", body)
+
+
+RENDERERS = {
+    "character": render_character_page,
+    "host": render_host_booklet,
+    "props": render_props_checklist,
+}
+
+
+def _render(page: Page) -> Tuple[str, bytes]:
+    filename, kind, payload = page
+    return filename, RENDERERS[kind](payload).encode("utf-8")
+
+
+def plan_pages(game: Dict[str, Any]) -> List[Page]:
+    names = {p["character_id"]: p["name"] for p in game["character_packets"]}
+    clue_map = {c["clue_id"]: c for c in game["clues"]}
+    pages: List[Page] = [
+        ("host_booklet.html", "host", {"game": game, "names": names}),
+        ("props_checklist.html", "props", {"game": game}),
+    ]
+    for idx, packet in enumerate(game["character_packets"], start=1):
+        payload = {
+            "title": game["title"],
+            "character": packet,
+            "clues": [clue_map[cid] for cid in packet.get("clue_ids", []) if cid in clue_map],
+            "names": names,
+        }
+        filename = f"characters/{idx:02d}_{_slug(packet['name'])}.html"
+        pages.append((filename, "character", payload))
+    return pages
+
+
+def render_kit(game: Dict[str, Any], executor: Optional[Executor] = None) -> bytes:
+    pages = plan_pages(game)
+    if executor is None:
+        rendered = map(_render, pages)
+    else:
+        rendered = executor.map(_render, pages, chunksize=max(1, len(pages) // 8))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in rendered:
+            archive.writestr(filename, content)
+    return buffer.getvalue()
+
+
+def iter_chunks(data: bytes, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start : start + chunk_size])
+
+
+class KitCache:
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._kits: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        with self._lock:
+            kit = self._kits.get(key)
+            if kit is not None:
+                self._kits.move_to_end(key)
+            return kit
+
+    def put(self, key: Tuple[str, str, str], kit: bytes) -> None:
+        with self._lock:
+            self._kits[key] = kit
+            self._kits.move_to_end(key)
+            while len(self._kits) > self.max_size:
+                self._kits.popitem(last=False)
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_kit_cache = KitCache()
+
+
+def get_executor() -> Optional[Executor]:
+    global _executor
+    workers = int(os.getenv("EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    if workers <= 1:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def get_kit(share_code: str, etag: str, load_game: Callable[[], Dict[str, Any]]) -> bytes:
+    key = (share_code, TEMPLATE_VERSION, etag)
+    kit = _kit_cache.get(key)
+    if kit is None:
+        kit = render_kit(load_game(), get_executor())
+        _kit_cache.put(key, kit)
+    return kit
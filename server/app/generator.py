@@ -4,28 +4,72 @@ import json
 import logging
 import os
 import re
-from typing import Any, Dict, List
-
-from .models import Category, GamePackage, GenerateRequest
-from .safety import filter_or_raise
-from .seed import MAX_PLAYERS, MIN_PLAYERS, ShareCodeData, encode_share_code, env_bool, normalize_seed, seeded_random
-from .storage import get_categories, load_prompt
+from typing import Any, Dict, List, Optional, Tuple
+
+from .category_cache import SHARED_FIELDS, get_category_cache
+from .cassette import cassette_mode, get_cassette_store, wrap_client
+from .compact import compact_schema, expand_keyed, to_keyed
+from .deadline import Deadline, DeadlineExceeded, deadline_from_header
+from .experiments import MeteredClient, get_variant_stats
+from .json_repair import get_repair_stats, repair_json
+from .memprofile import checkpoint, profiled_request
+from .models import Category, GameMeta, GamePackage, GenerateRequest
+from .procedural import PROCEDURAL_MODEL, fill_gaps, fill_procedural
+from .reskin import NameIndex, reskin
+from .safety import filter_package_or_raise
+from .schema import (
+    KEYED,
+    NESTED,
+    PACKAGE_PLAN,
+    SCALAR,
+    TEXT,
+    ModelPlan,
+    StructureMerger,
+    coerce_str,
+    merge_structure,
+    normalize_package,
+    normalize_props_list,
+)
+from .solvability import check_solvability, is_blocking, text_fixable
+from .seed import (
+    MAX_PLAYERS,
+    MIN_PLAYERS,
+    ShareCodeData,
+    encode_share_code,
+    env_bool,
+    generation_fingerprint,
+    names_hash,
+    normalize_seed,
+    seeded_random,
+)
+from .storage import get_categories, load_prompt, pick_variant, prompt_variants, prompt_version
 from .together_client import TogetherClient, TogetherClientError
+from .validation import (
+    ValidationIssue,
+    format_issues_for_prompt,
+    issue_messages,
+    validate_package,
+    validate_payload,
+)
 
 
 DEFAULT_TONE = "suspense"
 DEFAULT_DURATION = 60
+ROUND_COUNT = 4
 
 
+# Longer than the largest table so the victim can always get unused names too.
 FIRST_NAMES = [
     "Avery", "Blake", "Cameron", "Dakota", "Elliot", "Finley", "Harper",
     "Jordan", "Kai", "Logan", "Morgan", "Parker", "Quinn", "Reese", "Rowan",
-    "Sawyer", "Skyler", "Taylor", "Zion", "Emerson",
+    "Sawyer", "Skyler", "Taylor", "Zion", "Emerson", "Greer", "Marlowe",
+    "Tatum", "Vesper",
 ]
 LAST_NAMES = [
     "Hale", "Rowe", "Sterling", "Brooks", "Winslow", "Voss", "Kincaid",
     "Langford", "Maddox", "Sinclair", "Nolan", "Everett", "Pryce", "Monroe",
-    "Blair", "Bennett", "Calloway", "Sutter", "Quincy", "Alden",
+    "Blair", "Bennett", "Calloway", "Sutter", "Quincy", "Alden", "Ashby",
+    "Thorne", "Whitlock", "Yardley",
 ]
 
 
@@ -38,15 +82,24 @@ def _select_category(categories: List[Category], category_id: str, rng) -> Categ
     return categories[0]
 
 
+# Every first and last name is used once, so prose that only says "Quinn" still
+# points at one character (the reskin index and the solvability check rely on it).
 def _generate_names(player_count: int, rng) -> List[str]:
-    names: List[str] = []
-    attempts = 0
-    while len(names) < player_count and attempts < 200:
-        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
-        if name not in names:
-            names.append(name)
-        attempts += 1
-    return names
+    firsts = rng.sample(FIRST_NAMES, player_count)
+    lasts = rng.sample(LAST_NAMES, player_count)
+    return [f"{first} {last}" for first, last in zip(firsts, lasts)]
+
+
+# Clues can only point at a character whose name the victim does not share.
+def _distinct_victim_name(victim_name: str, names: List[str]) -> str:
+    used = {part for name in names for part in name.split()}
+    first, _, last = victim_name.partition(" ")
+    if first not in used and last not in used:
+        return victim_name
+    firsts = [n for n in FIRST_NAMES if n not in used] or [first]
+    lasts = [n for n in LAST_NAMES if n not in used] or [last]
+    offset = FIRST_NAMES.index(first) if first in FIRST_NAMES else 0
+    return f"{firsts[offset % len(firsts)]} {lasts[offset % len(lasts)]}"
 
 
 def _strip_json(text: str) -> str:
@@ -99,78 +152,31 @@ def _is_balanced_json(text: str) -> bool:
     return brace == 0 and bracket == 0 and not in_string
 
 
-def _remove_trailing_commas(text: str) -> str:
-    return re.sub(r",\s*([}\]])", r"\1", text)
-
-
-def parse_json_strict(text: str) -> Dict[str, Any]:
+def parse_json_with_fixes(text: str) -> Tuple[Dict[str, Any], List[str]]:
     cleaned = _strip_json(text)
     if not _is_balanced_json(cleaned):
         raise json.JSONDecodeError("Unbalanced JSON", cleaned, 0)
     extracted = extract_json(cleaned)
     try:
-        return json.loads(extracted)
+        return json.loads(extracted), []
+    except json.JSONDecodeError:
+        pass
+    stats = get_repair_stats()
+    try:
+        data, fixes = repair_json(extracted)
     except json.JSONDecodeError:
-        repaired = _remove_trailing_commas(extracted)
-        return json.loads(repaired)
+        stats.record([], ok=False)
+        raise
+    stats.record(fixes, ok=True)
+    return data, fixes
 
 
-def _split_text_list(value: Any) -> List[str]:
-    if value is None:
-        return []
-    if isinstance(value, list):
-        return [str(item).strip() for item in value if str(item).strip()]
-    if isinstance(value, str):
-        parts = re.split(r"(?:\r?\n|;|•)", value)
-        cleaned = [part.strip(" \t-•") for part in parts if part.strip(" \t-•")]
-        return cleaned or [value.strip()]
-    return [str(value).strip()]
-
-
-def _normalize_props_list(props: Any) -> List[str]:
-    if props is None:
-        return []
-    if isinstance(props, dict):
-        props = [props]
-    if not isinstance(props, list):
-        return [str(props)]
-    normalized: List[str] = []
-    for item in props:
-        if isinstance(item, dict):
-            name = str(item.get("name", "")).strip()
-            description = str(item.get("description", "")).strip()
-            if name and description:
-                normalized.append(f"{name}: {description}")
-            elif name:
-                normalized.append(name)
-            elif description:
-                normalized.append(description)
-            else:
-                normalized.append(", ".join(f"{k}: {v}" for k, v in item.items()))
-        else:
-            normalized.append(str(item))
-    return [entry for entry in normalized if entry.strip()]
+def parse_json_strict(text: str) -> Dict[str, Any]:
+    return parse_json_with_fixes(text)[0]
 
 
 def _normalize_game_package(data: Dict[str, Any]) -> Dict[str, Any]:
-    packets = data.get("character_packets", [])
-    for packet in packets:
-        intro = packet.get("intro_monologue")
-        if isinstance(intro, str):
-            lines = intro.splitlines() if "\n" in intro else [intro]
-            packet["intro_monologue"] = [line.strip() for line in lines if line.strip()]
-        else:
-            packet["intro_monologue"] = _split_text_list(intro)
-
-        for field in ("traits", "secrets"):
-            value = packet.get(field)
-            if isinstance(value, str):
-                packet[field] = _split_text_list(value)
-            else:
-                packet[field] = _split_text_list(value)
-
-    data["props_list"] = _normalize_props_list(data.get("props_list"))
-    return data
+    return normalize_package(data)
 
 
 def _log_llm_debug(response: str) -> None:
@@ -193,8 +199,12 @@ def repair_invalid_json(
     err_msg: str,
     structure_template: str,
     max_tokens: int,
+    timeout: Optional[float] = None,
+    validation_prompt: Optional[str] = None,
+    requested_tokens: Optional[int] = None,
 ) -> Dict[str, Any]:
-    validation_prompt = load_prompt("validation_prompt.md")
+    get_repair_stats().record_llm_repair()
+    validation_prompt = validation_prompt or load_prompt("validation_prompt.md")
     repair_prompt = validation_prompt.format(
         issues=f"- JSON parse error: {err_msg}",
         structure=structure_template,
@@ -206,6 +216,8 @@ def repair_invalid_json(
         temperature=0.2,
         top_p=0.8,
         max_tokens=max_tokens,
+        timeout=timeout,
+        requested_tokens=requested_tokens,
     )
     _log_llm_debug(response)
     return parse_json_strict(response)
@@ -222,7 +234,7 @@ def _build_structure(
     clue_count = max(12, player_count * 2)
     clue_ids = [f"clue_{i+1:02d}" for i in range(clue_count)]
     timeline_ids = [f"event_{i+1:02d}" for i in range(8)]
-    round_ids = [f"round_{i+1:02d}" for i in range(4)]
+    round_ids = [f"round_{i+1:02d}" for i in range(ROUND_COUNT)]
 
     hard_count = max(3, int(clue_count * 0.25))
     hard_indices = set(rng.sample(range(clue_count), hard_count))
@@ -263,10 +275,12 @@ def _build_structure(
         relationships[cid] = [{"character_id": oid, "relationship": ""} for oid in others]
 
     murderer_id = rng.choice(character_ids)
+    _secure_evidence(clues, clue_assignments, murderer_id)
     victim_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
 
     character_packets = []
     names = request.player_names or _generate_names(player_count, rng)
+    victim_name = _distinct_victim_name(victim_name, names)
     for idx, cid in enumerate(character_ids):
         character_packets.append(
             {
@@ -318,267 +332,244 @@ def _build_structure(
             "tone": request.tone or DEFAULT_TONE,
             "duration": request.duration or DEFAULT_DURATION,
             "model": "",
+            "generation_path": [],
         },
     }
     return structure
 
 
-def _validate_structure(data: Dict[str, Any], expected: Dict[str, Any]) -> List[str]:
-    issues: List[str] = []
-    player_count = expected["player_count"]
-    character_ids = expected["character_ids"]
-    clue_ids = expected["clue_ids"]
-
-    packets = data.get("character_packets", [])
-    if len(packets) != player_count:
-        issues.append("player_count does not match character_packets length.")
-
-    murderer_id = data.get("solution", {}).get("murderer_id")
-    if murderer_id not in character_ids:
-        issues.append("murderer_id is not one of the characters.")
-
-    timeline = data.get("timeline", [])
-    if len(timeline) < 8:
-        issues.append("timeline has fewer than 8 events.")
-
-    clues = data.get("clues", [])
-    if len(clues) < 12:
-        issues.append("clues has fewer than 12 items.")
-    clue_id_set = {c.get("clue_id") for c in clues}
-    if not set(clue_ids).issubset(clue_id_set):
-        issues.append("clue ids missing from clues list.")
-    hard_evidence = [c for c in clues if c.get("type") == "hard"]
-    if len(hard_evidence) < 3:
-        issues.append("hard evidence clues fewer than 3.")
-
-    graph = {cid: set() for cid in character_ids}
-    for packet in packets:
-        rels = packet.get("relationships", [])
-        if len(rels) < 2:
-            issues.append(f"character {packet.get('character_id')} has too few relationships.")
-        if not packet.get("connection_to_victim"):
-            issues.append(f"character {packet.get('character_id')} missing connection_to_victim.")
-        for rel in rels:
-            target = rel.get("character_id")
-            if target in graph:
-                graph[packet.get("character_id")].add(target)
-    if not _is_connected(graph):
-        issues.append("relationship graph is not connected.")
-
-    for packet in packets:
-        if not packet.get("clue_ids"):
-            issues.append(f"character {packet.get('character_id')} missing clue_ids.")
-        else:
-            for clue_id in packet.get("clue_ids", []):
-                if clue_id not in clue_ids:
-                    issues.append("character packet references unknown clue_id.")
-                    break
-    return issues
-
-
-def _is_connected(graph: Dict[str, set]) -> bool:
-    if not graph:
-        return False
-    start = next(iter(graph))
-    visited = set()
-    stack = [start]
-    while stack:
-        node = stack.pop()
-        if node in visited:
-            continue
-        visited.add(node)
-        stack.extend(graph[node] - visited)
-    return len(visited) == len(graph)
+# The deduction needs a hard, non-misleading clue in an innocent's hands (see
+# solvability.py). Clue types and ownership are fixed before any text exists
+# and no rewrite can move them, so the structure has to guarantee it.
+def _secure_evidence(
+    clues: List[Dict[str, Any]], assignments: Dict[str, List[str]], murderer_id: str
+) -> None:
+    hard = [clue for clue in clues if clue["type"] == "hard"]
+    evidence = [clue for clue in hard if not clue["is_misleading"]]
+    if not evidence:
+        hard[0]["is_misleading"] = False
+        evidence = hard[:1]
+    evidence_ids = {clue["clue_id"] for clue in evidence}
+    innocents = [cid for cid in assignments if cid != murderer_id]
+    if any(evidence_ids.intersection(assignments[cid]) for cid in innocents):
+        return
+    clue_id = evidence[0]["clue_id"]
+    held = assignments[innocents[0]]
+    displaced = held[0]
+    held[0] = clue_id
+    own = assignments[murderer_id]
+    if clue_id in own:
+        own.remove(clue_id)
+        if displaced not in own:
+            own.append(displaced)
 
 
-def _fill_mock(structure: Dict[str, Any], category: Category) -> Dict[str, Any]:
-    structure["title"] = f"{category.name}: A Night of Secrets"
-    structure["theme_summary"] = (
-        f"A {category.tone_tags[0]} mystery set in {category.description.lower()}"
-    )
-    structure["storyline_overview"] = [
-        "Guests arrive to a gathering that promises celebration.",
-        "A sudden discovery shifts the mood and exposes hidden conflicts.",
-        "As tension rises, alliances form and secrets surface.",
-    ]
-    structure["victim"]["role"] = "Beloved organizer"
-    structure["victim"]["why_they_mattered"] = "They controlled access to a key legacy."
-    structure["solution"]["motive"] = "A long-simmering betrayal over inheritance."
-    structure["solution"]["method"] = "Poisoned toast at a private moment."
-    structure["solution"]["opportunity"] = "The murderer had access to the victim's drink."
-    structure["solution"]["reveal_explanation"] = "Clue patterns and alibis converge on the culprit."
-    for event in structure["timeline"]:
-        event["time"] = "20:00"
-        event["description"] = "A notable event shifts the night."
-    for clue in structure["clues"]:
-        clue["title"] = "Suspicious detail"
-        clue["description"] = "A detail that hints at motive or method."
-    for packet in structure["character_packets"]:
-        packet["role_title"] = "Guest with secrets"
-        packet["backstory"] = "A brief history tied to the gathering."
-        for rel in packet["relationships"]:
-            rel["relationship"] = "old friend"
-        packet["connection_to_victim"] = "Owed the victim a favor."
-        packet["traits"] = ["calm", "observant"]
-        packet["public_goal"] = "Keep the event running smoothly."
-        packet["secret_goal"] = "Recover a missing document."
-        packet["secrets"] = ["Once threatened the victim.", "Hiding a financial loss."]
-        packet["alibi"] = "Was speaking with staff during the incident."
-        packet["intro_monologue"] = [
-            "I didn't expect this night to turn dark.",
-            "We all have reasons to be here.",
-        ]
-        packet["prop_suggestion"] = "A distinctive accessory"
-    for round_info in structure["how_to_play"]:
-        round_info["title"] = "Investigation Round"
-        round_info["description"] = "Players share clues and challenge alibis."
-        round_info["minutes"] = 15
-    structure["props_list"] = [
-        "Name cards",
-        "Evidence cards",
-        "Clue envelopes",
-        "Timeline board",
-    ]
-    return structure
+def _validate_structure(data: Dict[str, Any], expected: Dict[str, Any]) -> List[ValidationIssue]:
+    issues = validate_package(data, expected)
+    return issues or check_solvability(data)
 
 
-def _merge_relationships(
-    base: List[Dict[str, Any]], update: List[Dict[str, Any]]
-) -> List[Dict[str, Any]]:
-    update_map = {rel.get("character_id"): rel for rel in update}
-    merged = []
-    for rel in base:
-        updated = update_map.get(rel.get("character_id"), {})
-        merged.append(
-            {
-                "character_id": rel.get("character_id"),
-                "relationship": updated.get("relationship", rel.get("relationship", "")),
-            }
-        )
-    return merged
+def _fill_mock(structure: Dict[str, Any], category: Category) -> Dict[str, Any]:
+    return fill_procedural(structure, category)
 
 
 def _merge_structure(structure: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
-    merged = structure
+    return merge_structure(structure, candidate)
 
-    for key, value in candidate.items():
-        if key not in merged:
-            continue
 
-        if key == "character_packets" and isinstance(value, list):
-            base_packets = {p["character_id"]: p for p in merged["character_packets"]}
-            for packet in value:
-                cid = packet.get("character_id")
-                if cid not in base_packets:
-                    continue
-                base = base_packets[cid]
-                base["role_title"] = packet.get("role_title", base["role_title"])
-                base["backstory"] = packet.get("backstory", base["backstory"])
-                base["relationships"] = _merge_relationships(
-                    base.get("relationships", []), packet.get("relationships", [])
-                )
-                base["connection_to_victim"] = packet.get(
-                    "connection_to_victim", base.get("connection_to_victim", "")
-                )
-                base["traits"] = packet.get("traits", base.get("traits", []))
-                base["public_goal"] = packet.get("public_goal", base.get("public_goal", ""))
-                base["secret_goal"] = packet.get("secret_goal", base.get("secret_goal", ""))
-                base["secrets"] = packet.get("secrets", base.get("secrets", []))
-                base["alibi"] = packet.get("alibi", base.get("alibi", ""))
-                base["intro_monologue"] = packet.get(
-                    "intro_monologue", base.get("intro_monologue", [])
-                )
-                base["prop_suggestion"] = packet.get(
-                    "prop_suggestion", base.get("prop_suggestion", "")
-                )
-            merged["character_packets"] = list(base_packets.values())
-            continue
+def _make_client(request: Optional[GenerateRequest] = None, seed: Optional[int] = None):
+    mode = cassette_mode()
+    if mode == "replay":
+        return wrap_client(mode, None)
+    client = TogetherClient()
+    if mode == "record":
+        if request is not None:
+            get_cassette_store().add_request({**request.model_dump(), "seed": seed})
+        return wrap_client(mode, client)
+    return client
+
+
+def _shared_block(data: Dict[str, Any]) -> Dict[str, Any]:
+    rounds = [
+        {
+            "title": coerce_str(item.get("title")) or "",
+            "description": coerce_str(item.get("description")) or "",
+            "minutes": int(item.get("minutes") or 0),
+        }
+        for item in data.get("how_to_play") or []
+        if isinstance(item, dict)
+    ]
+    block = {
+        "theme_summary": coerce_str(data.get("theme_summary")) or "",
+        "props_list": normalize_props_list(data.get("props_list")),
+        "how_to_play": rounds,
+    }
+    if not block["theme_summary"] or not block["props_list"] or len(rounds) < ROUND_COUNT:
+        raise ValueError("Shared content block is incomplete.")
+    if not all(r["title"] and r["description"] and r["minutes"] > 0 for r in rounds):
+        raise ValueError("Shared content block has empty rounds.")
+    return block
 
-        if key == "clues" and isinstance(value, list):
-            base_clues = {c["clue_id"]: c for c in merged["clues"]}
-            for clue in value:
-                cid = clue.get("clue_id")
-                if cid not in base_clues:
-                    continue
-                base = base_clues[cid]
-                base["title"] = clue.get("title", base["title"])
-                base["description"] = clue.get("description", base["description"])
-            merged["clues"] = list(base_clues.values())
-            continue
 
-        if key == "timeline" and isinstance(value, list):
-            base_events = {e["event_id"]: e for e in merged["timeline"]}
-            for event in value:
-                eid = event.get("event_id")
-                if eid not in base_events:
-                    continue
-                base = base_events[eid]
-                base["time"] = event.get("time", base["time"])
-                base["description"] = event.get("description", base["description"])
-            merged["timeline"] = list(base_events.values())
-            continue
+def _generate_shared_block(category: Category, tone: str) -> Dict[str, Any]:
+    prompt = load_prompt("category_content_prompt.md").format(
+        category_name=category.name,
+        category_description=category.description,
+        tone=tone,
+        tone_tags=", ".join(category.tone_tags),
+        suggested_props=", ".join(category.suggested_props),
+        round_count=ROUND_COUNT,
+        duration=DEFAULT_DURATION,
+    )
+    response = _make_client().generate_text(
+        prompt=prompt,
+        system_prompt=load_prompt("system_prompt.md"),
+        temperature=0.4,
+        top_p=0.9,
+        max_tokens=900,
+    )
+    return _shared_block(parse_json_strict(response))
 
-        if key == "how_to_play" and isinstance(value, list):
-            base_rounds = {r["round_id"]: r for r in merged["how_to_play"]}
-            for rnd in value:
-                rid = rnd.get("round_id")
-                if rid not in base_rounds:
-                    continue
-                base = base_rounds[rid]
-                base["title"] = rnd.get("title", base["title"])
-                base["description"] = rnd.get("description", base["description"])
-                base["minutes"] = rnd.get("minutes", base["minutes"])
-            merged["how_to_play"] = list(base_rounds.values())
-            continue
 
-        if isinstance(merged[key], dict) and isinstance(value, dict):
-            merged[key].update(value)
-        else:
-            merged[key] = value
+def _shared_version() -> str:
+    return f"{prompt_version()}:{os.getenv('TOGETHER_MODEL', '')}"
 
-    return merged
 
+def _apply_shared(structure: Dict[str, Any], shared: Dict[str, Any]) -> None:
+    rounds = structure["how_to_play"]
+    source = shared["how_to_play"][: len(rounds)]
+    total = sum(item["minutes"] for item in source)
+    duration = structure["meta"]["duration"]
+    structure["theme_summary"] = shared["theme_summary"]
+    structure["props_list"] = list(shared["props_list"])
+    for round_info, item in zip(rounds, source):
+        round_info["title"] = item["title"]
+        round_info["description"] = item["description"]
+        round_info["minutes"] = max(1, round(item["minutes"] * duration / total))
 
-def generate_game(request: GenerateRequest) -> Dict[str, Any]:
-    if request.player_count < MIN_PLAYERS or request.player_count > MAX_PLAYERS:
-        raise ValueError("player_count out of range.")
 
-    categories = get_categories()
-    seed = normalize_seed(request.seed)
-    rng = seeded_random(seed)
-    category = _select_category(categories, request.category_id, rng)
+def _to_package(data: Dict[str, Any]) -> GamePackage:
+    # meta comes straight from the seeded template; everything else is LLM-filled.
+    meta = GameMeta.model_construct(**data["meta"])
+    return GamePackage.model_validate({**data, "meta": meta})
 
-    structure = _build_structure(request, category, seed, rng)
+
+def _stamp_meta(
+    meta: Dict[str, Any],
+    model: str,
+    player_names: Optional[List[str]],
+    categories: List[Category],
+) -> None:
     share_data = ShareCodeData(
-        seed=seed,
-        player_count=request.player_count,
-        category_id=category.id,
-        tone=request.tone or DEFAULT_TONE,
-        duration=request.duration or DEFAULT_DURATION,
-    )
-    share_code = encode_share_code(share_data)
-    structure["meta"]["share_code"] = share_code
-    structure["meta"]["model"] = os.getenv(
-        "TOGETHER_MODEL", "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"
+        seed=meta["seed"],
+        player_count=meta["player_count"],
+        category_id=meta["category_id"],
+        tone=meta["tone"],
+        duration=meta["duration"],
+        names_hash=names_hash(player_names),
+        fingerprint=generation_fingerprint(model, prompt_version()),
     )
+    meta["share_code"] = encode_share_code(share_data, [c.id for c in categories])
+    meta["model"] = model
 
-    expected = {
+
+def _default_model() -> str:
+    if env_bool("USE_MOCK_LLM", False):
+        return PROCEDURAL_MODEL
+    return os.getenv("TOGETHER_MODEL", "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo")
+
+
+def canonical_request(request: GenerateRequest) -> GenerateRequest:
+    return request.model_copy(update={"player_names": None, "seed": normalize_seed(request.seed)})
+
+
+# The share code generate_game will stamp, computed without generating; only
+# meaningful for requests with a fixed seed (see canonical_request).
+def planned_share_code(request: GenerateRequest) -> str:
+    categories = get_categories()
+    seed = normalize_seed(request.seed)
+    category = _select_category(categories, request.category_id, seeded_random(seed))
+    meta = {
+        "seed": seed,
         "player_count": request.player_count,
-        "character_ids": [p["character_id"] for p in structure["character_packets"]],
-        "clue_ids": [c["clue_id"] for c in structure["clues"]],
+        "category_id": category.id,
+        "tone": request.tone or DEFAULT_TONE,
+        "duration": request.duration or DEFAULT_DURATION,
     }
+    _stamp_meta(meta, _default_model(), request.player_names, categories)
+    return meta["share_code"]
+
+
+def reskin_game(
+    game: GamePackage, index: NameIndex, names: List[str], cached: bool = False
+) -> GamePackage:
+    data = reskin(game.model_dump(), index, names)
+    meta = data["meta"]
+    _stamp_meta(meta, meta["model"], names, get_categories())
+    path = list(meta["generation_path"])
+    if cached:
+        path.append("cache:game")
+    meta["generation_path"] = [*path, "reskin"]
+    return _to_package(data)
+
+
+# Solvability problems are reported, not fatal: the game is still playable
+# text, and the host can reroll the sections named in the log.
+def _note_unsolvable(path: List[str], issues: List[ValidationIssue]) -> None:
+    if issues:
+        path.append("solvability:failed")
+        logging.getLogger("mp1.llm").warning("Unsolvable game: %s", issue_messages(issues))
 
-    if env_bool("USE_MOCK_LLM", False):
-        candidate = _fill_mock(structure, category)
-        issues = _validate_structure(candidate, expected)
-        if issues:
-            raise ValueError(f"Mock generation failed validation: {issues}")
-        GamePackage.model_validate(candidate)
-        return candidate
-
-    system_prompt = load_prompt("system_prompt.md")
-    generation_template = load_prompt("game_generation_prompt.md")
-    compact_structure = json.dumps(structure, separators=(",", ":"))
+
+def _procedural_package(
+    structure: Dict[str, Any], category: Category, expected: Dict[str, Any]
+) -> GamePackage:
+    candidate = fill_procedural(structure, category)
+    checkpoint("procedural")
+    issues = _validate_structure(candidate, expected)
+    if is_blocking(issues):
+        raise ValueError(f"Procedural generation failed validation: {issue_messages(issues)}")
+    _note_unsolvable(candidate["meta"]["generation_path"], issues)
+    checkpoint("validate")
+    return _to_package(candidate)
+
+
+def _load_variant(name: str, seed: int, chosen: Dict[str, str]) -> str:
+    variant = pick_variant(name, seed)
+    if name in prompt_variants():
+        chosen[name] = variant
+    return load_prompt(name, variant)
+
+
+def _generate_with_llm(
+    request: GenerateRequest,
+    structure: Dict[str, Any],
+    category: Category,
+    seed: int,
+    expected: Dict[str, Any],
+    deadline: Deadline,
+    path: List[str],
+    variants: Dict[str, str],
+) -> Dict[str, Any]:
+    system_prompt = _load_variant("system_prompt.md", seed, variants)
+    generation_template = _load_variant("game_generation_prompt.md", seed, variants)
+    validation_template = _load_variant("validation_prompt.md", seed, variants)
+    shared = None
+    if env_bool("CATEGORY_CACHE", False):
+        cache = get_category_cache(_generate_shared_block, _shared_version)
+        shared = cache.get(category, structure["meta"]["tone"])
+    shared_context = ""
+    if shared is not None:
+        # Setting-level sections come from the cache; the LLM only writes the
+        # seed-specific parts.
+        _apply_shared(structure, shared)
+        path.append("cache:category")
+        compact_structure = compact_schema(structure, omit=frozenset(SHARED_FIELDS))
+        shared_context = (
+            f"Setting (already written, stay consistent with it): {shared['theme_summary']}"
+        )
+    else:
+        compact_structure = compact_schema(structure)
     base_tokens = 3200
     extra_tokens = max(0, request.player_count - 6) * 250
     max_tokens = min(6500, base_tokens + extra_tokens)
@@ -590,36 +581,50 @@ def generate_game(request: GenerateRequest) -> Dict[str, Any]:
         suggested_props=", ".join(category.suggested_props),
         suggested_archetypes=", ".join(category.suggested_archetypes),
         seed=seed,
+        shared_context=shared_context,
         structure=compact_structure,
     )
+    checkpoint("prompt")
 
-    client = TogetherClient()
-    try:
-        response = client.generate_text(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            temperature=0.2,
-            top_p=0.85,
-            max_tokens=max_tokens,
-        )
-    except TogetherClientError as exc:
-        raise RuntimeError(str(exc)) from exc
+    budget = deadline.require_call(max_tokens, "generation")
+    client = MeteredClient(_make_client(request, seed))
+    response = client.generate_text(
+        prompt=prompt,
+        system_prompt=system_prompt,
+        temperature=0.2,
+        top_p=0.85,
+        max_tokens=budget,
+        timeout=deadline.remaining(),
+        requested_tokens=max_tokens,
+    )
+    path.append("llm")
     _log_llm_debug(response)
+    checkpoint("llm")
 
     try:
-        candidate = parse_json_strict(response)
+        candidate, fixes = parse_json_with_fixes(response)
+        if fixes:
+            path.append("repair:local")
     except json.JSONDecodeError as exc:
-        if not _is_balanced_json(response):
+        # A truncated answer only gets a full retry when there is time for one;
+        # otherwise the shorter JSON repair call is the cheaper way out.
+        retry_budget = 0 if _is_balanced_json(response) else deadline.token_budget(retry_max_tokens)
+        if retry_budget:
             response = client.generate_text(
                 prompt=prompt,
                 system_prompt=system_prompt,
                 temperature=0.1,
                 top_p=0.85,
-                max_tokens=retry_max_tokens,
+                max_tokens=retry_budget,
+                timeout=deadline.remaining(),
+                requested_tokens=retry_max_tokens,
             )
+            path.append("retry")
             _log_llm_debug(response)
             try:
-                candidate = parse_json_strict(response)
+                candidate, fixes = parse_json_with_fixes(response)
+                if fixes:
+                    path.append("repair:local")
             except json.JSONDecodeError as retry_exc:
                 candidate = repair_invalid_json(
                     client,
@@ -627,8 +632,12 @@ def generate_game(request: GenerateRequest) -> Dict[str, Any]:
                     response,
                     str(retry_exc),
                     compact_structure,
-                    retry_max_tokens,
+                    deadline.require_call(retry_max_tokens, "JSON repair"),
+                    timeout=deadline.remaining(),
+                    validation_prompt=validation_template,
+                    requested_tokens=retry_max_tokens,
                 )
+                path.append("repair:json")
         else:
             candidate = repair_invalid_json(
                 client,
@@ -636,59 +645,284 @@ def generate_game(request: GenerateRequest) -> Dict[str, Any]:
                 response,
                 str(exc),
                 compact_structure,
-                max_tokens,
+                deadline.require_call(max_tokens, "JSON repair"),
+                timeout=deadline.remaining(),
+                validation_prompt=validation_template,
+                requested_tokens=max_tokens,
             )
-    merged = _merge_structure(structure, candidate)
-    merged = _normalize_game_package(merged)
+            path.append("repair:json")
+    checkpoint("parse")
+    merger = StructureMerger(structure)
+    merged = merger.merge(expand_keyed(candidate))
+    checkpoint("merge")
     issues = _validate_structure(merged, expected)
-
-    if issues:
-        validation_prompt = load_prompt("validation_prompt.md")
-        repair_prompt = validation_prompt.format(
-            issues="\n".join(f"- {issue}" for issue in issues),
+    first_issues = len(issues)
+    checkpoint("validate")
+
+    fixable = text_fixable(issues)
+    repair_budget = deadline.token_budget(retry_max_tokens) if fixable else 0
+    if repair_budget:
+        repair_prompt = validation_template.format(
+            issues=format_issues_for_prompt(fixable),
             structure=compact_structure,
-            candidate=json.dumps(merged, indent=2),
+            candidate=json.dumps(to_keyed(merged), separators=(",", ":")),
         )
         response = client.generate_text(
             prompt=repair_prompt,
             system_prompt=system_prompt,
             temperature=0.2,
             top_p=0.85,
-            max_tokens=retry_max_tokens,
+            max_tokens=repair_budget,
+            timeout=deadline.remaining(),
+            requested_tokens=retry_max_tokens,
         )
+        path.append("repair:llm")
         _log_llm_debug(response)
-        candidate = parse_json_strict(response)
-        merged = _merge_structure(structure, candidate)
-        merged = _normalize_game_package(merged)
+        try:
+            merged = merger.merge(expand_keyed(parse_json_strict(response)))
+        except json.JSONDecodeError:
+            pass
         issues = _validate_structure(merged, expected)
-        if issues:
-            raise ValueError(f"Validation failed after repair: {issues}")
-
-    filter_or_raise(json.dumps(merged))
-    GamePackage.model_validate(merged)
+        checkpoint("repair:llm")
+    if is_blocking(issues):
+        # Out of time or the LLM repair did not converge: fill what is still
+        # missing from the deterministic templates.
+        fill_gaps(merged, category)
+        path.append("repair:template")
+        issues = _validate_structure(merged, expected)
+        if is_blocking(issues):
+            raise ValueError(f"Validation failed after repair: {issue_messages(issues)}")
+        checkpoint("repair:template")
+    _note_unsolvable(path, issues)
+    merged["meta"]["stats"] = client.stats(first_issues)
     return merged
 
 
-def validate_only(data: Dict[str, Any]) -> List[str]:
-    issues: List[str] = []
-    if "character_packets" not in data:
-        issues.append("character_packets missing.")
-    elif not isinstance(data.get("character_packets"), list) or not data.get("character_packets"):
-        issues.append("character_packets empty or invalid.")
-    if "solution" not in data:
-        issues.append("solution missing.")
-    if "timeline" not in data:
-        issues.append("timeline missing.")
-    elif not isinstance(data.get("timeline"), list) or not data.get("timeline"):
-        issues.append("timeline empty or invalid.")
-    if "clues" not in data:
-        issues.append("clues missing.")
-    elif not isinstance(data.get("clues"), list) or not data.get("clues"):
-        issues.append("clues empty or invalid.")
+# `fallback` overrides LLM_FALLBACK; batch runs turn it off so an outage shows up
+# as failed jobs instead of procedural games.
+def generate_game(
+    request: GenerateRequest,
+    deadline: Optional[Deadline] = None,
+    fallback: Optional[bool] = None,
+) -> GamePackage:
+    with profiled_request(f"generate:{request.player_count}"):
+        return _generate_game(request, deadline, fallback)
+
+
+def _generate_game(
+    request: GenerateRequest, deadline: Optional[Deadline], fallback: Optional[bool]
+) -> GamePackage:
+    if request.player_count < MIN_PLAYERS or request.player_count > MAX_PLAYERS:
+        raise ValueError("player_count out of range.")
+    if deadline is None:
+        deadline = deadline_from_header(None)
 
+    categories = get_categories()
+    seed = normalize_seed(request.seed)
+    rng = seeded_random(seed)
+    category = _select_category(categories, request.category_id, rng)
+
+    structure = _build_structure(request, category, seed, rng)
+    _stamp_meta(structure["meta"], _default_model(), request.player_names, categories)
+
+    expected = {
+        "player_count": request.player_count,
+        "character_ids": [p["character_id"] for p in structure["character_packets"]],
+        "clue_ids": [c["clue_id"] for c in structure["clues"]],
+    }
+    checkpoint("structure")
+
+    if env_bool("USE_MOCK_LLM", False):
+        structure["meta"]["generation_path"] = ["procedural"]
+        return _procedural_package(structure, category, expected)
+
+    path: List[str] = []
+    variants: Dict[str, str] = {}
+    try:
+        merged = _generate_with_llm(
+            request, structure, category, seed, expected, deadline, path, variants
+        )
+    except (TogetherClientError, DeadlineExceeded) as exc:
+        if fallback is None:
+            fallback = env_bool("LLM_FALLBACK", True)
+        # A replay miss means the cassette is stale; substituting content would hide it.
+        if not fallback or cassette_mode() == "replay":
+            raise RuntimeError(str(exc)) from exc
+        reason = "deadline" if isinstance(exc, DeadlineExceeded) else "fallback"
+        logging.getLogger("mp1.llm").warning("Using procedural content (%s): %s", reason, exc)
+        _stamp_meta(structure["meta"], PROCEDURAL_MODEL, request.player_names, categories)
+        structure["meta"]["generation_path"] = [*path, f"procedural:{reason}"]
+        structure["meta"]["prompt_variants"] = variants or None
+        game = _procedural_package(structure, category, expected)
+        get_variant_stats().record(game.meta.model_dump())
+        return game
+
+    merged["meta"]["generation_path"] = path
+    merged["meta"]["prompt_variants"] = variants or None
+    filter_package_or_raise(merged)
+    checkpoint("safety")
+    get_variant_stats().record(merged["meta"])
+    return _to_package(merged)
+
+
+SECTION_MAX_TOKENS = 2500
+
+
+def section_target(section: str) -> Tuple[str, Optional[str], int, Any]:
+    name, _, item_id = section.partition(".")
+    for step_name, kind, op in PACKAGE_PLAN.steps:
+        if step_name != name or (kind == NESTED and not op.steps):
+            continue
+        if item_id and kind != KEYED:
+            raise ValueError(f"Section {name} has no items.")
+        return name, item_id or None, kind, op
+    raise ValueError(f"Unknown section: {section}")
+
+
+def _blank_section(value: Any, kind: int, op: Any) -> Any:
+    if kind == TEXT:
+        return ""
+    if kind == SCALAR:
+        if isinstance(value, list):
+            return []
+        return "" if isinstance(value, str) else value
+    if kind == NESTED and isinstance(value, dict):
+        plan: ModelPlan = op
+        for name, sub_kind, sub_op in plan.steps:
+            if name in value:
+                value[name] = _blank_section(value[name], sub_kind, sub_op)
+    elif kind == KEYED and isinstance(value, list):
+        for item in value:
+            _blank_section(item, NESTED, op)
+    return value
+
+
+def _has_gaps(value: Any) -> bool:
+    if isinstance(value, dict):
+        return any(_has_gaps(item) for item in value.values())
+    if isinstance(value, list):
+        return not value or any(_has_gaps(item) for item in value)
+    return isinstance(value, str) and not value.strip()
+
+
+def _section_context(data: Dict[str, Any]) -> str:
+    context = {
+        "title": data["title"],
+        "theme_summary": data["theme_summary"],
+        "victim": data["victim"],
+        "solution": data["solution"],
+        "characters": {
+            p["character_id"]: f"{p['name']}, {p['role_title']}" for p in data["character_packets"]
+        },
+        "clues": {c["clue_id"]: c["title"] for c in data["clues"]},
+    }
+    return json.dumps(context, separators=(",", ":"))
+
+
+def _regenerate_with_llm(
+    data: Dict[str, Any],
+    section: str,
+    subset: Dict[str, Any],
+    current: str,
+    seed: int,
+    deadline: Deadline,
+    path: List[str],
+) -> Optional[Dict[str, Any]]:
+    name = next(iter(subset))
+    omit = frozenset(step[0] for step in PACKAGE_PLAN.steps if step[0] != name)
+    prompt = load_prompt("section_prompt.md").format(
+        context=_section_context(data),
+        section=section,
+        current=current,
+        structure=compact_schema(subset, omit=omit),
+        field=name,
+        seed=seed,
+    )
+    max_tokens = min(SECTION_MAX_TOKENS, 300 + len(current) // 2)
+    response = _make_client().generate_text(
+        prompt=prompt,
+        system_prompt=load_prompt("system_prompt.md"),
+        temperature=0.7,
+        top_p=0.9,
+        max_tokens=deadline.require_call(max_tokens, "section"),
+        timeout=deadline.remaining(),
+        requested_tokens=max_tokens,
+    )
+    path.append("llm")
+    _log_llm_debug(response)
+    try:
+        candidate, fixes = parse_json_with_fixes(response)
+    except json.JSONDecodeError:
+        return None
+    if fixes:
+        path.append("repair:local")
+    return expand_keyed({name: candidate.get(name)})
+
+
+# Rerolls one section of a finished game: only that subtree (plus a compact
+# summary of the rest) goes to the LLM, and the answer is merged back over the
+# fixed ids and assignments before the whole package is validated again.
+def regenerate_section(
+    game: GamePackage,
+    section: str,
+    seed: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+) -> GamePackage:
+    name, item_id, kind, op = section_target(section)
+    if deadline is None:
+        deadline = deadline_from_header(None)
+    seed = normalize_seed(seed)
+    data = game.model_dump()
+    if item_id is None:
+        current = json.dumps(to_keyed({name: data[name]}), separators=(",", ":"))
+        data[name] = _blank_section(data[name], kind, op)
+        subset = {name: data[name]}
+    else:
+        item = next((i for i in data[name] if i.get(op.id_field) == item_id), None)
+        if item is None:
+            raise KeyError(section)
+        current = json.dumps(to_keyed({name: [item]}), separators=(",", ":"))
+        subset = {name: [_blank_section(item, NESTED, op)]}
+
+    meta = data["meta"]
+    category = next((c for c in get_categories() if c.id == meta["category_id"]), None)
+    if category is None:
+        raise ValueError(f"Unknown category: {meta['category_id']}")
     expected = {
-        "player_count": len(data.get("character_packets", [])),
-        "character_ids": [p.get("character_id") for p in data.get("character_packets", [])],
-        "clue_ids": [c.get("clue_id") for c in data.get("clues", [])],
+        "player_count": meta["player_count"],
+        "character_ids": [p["character_id"] for p in data["character_packets"]],
+        "clue_ids": [c["clue_id"] for c in data["clues"]],
     }
-    return issues + _validate_structure(data, expected)
+    path = [f"regenerate:{section}"]
+    if env_bool("USE_MOCK_LLM", False):
+        fill_gaps(data, category, seed)
+        path.append("procedural")
+    else:
+        try:
+            candidate = _regenerate_with_llm(data, section, subset, current, seed, deadline, path)
+        except (TogetherClientError, DeadlineExceeded) as exc:
+            if not env_bool("LLM_FALLBACK", True) or cassette_mode() == "replay":
+                raise RuntimeError(str(exc)) from exc
+            path.append("procedural:fallback")
+            candidate = None
+        if candidate is not None:
+            values = candidate[name]
+            if item_id is not None and isinstance(values, list):
+                values = [
+                    v for v in values if isinstance(v, dict) and v.get(op.id_field) == item_id
+                ]
+            StructureMerger(data).merge({name: values})
+        if _has_gaps(data[name]) or is_blocking(_validate_structure(data, expected)):
+            fill_gaps(data, category, seed)
+            path.append("repair:template")
+    issues = _validate_structure(data, expected)
+    if is_blocking(issues):
+        raise ValueError(f"Validation failed after regeneration: {issue_messages(issues)}")
+    _note_unsolvable(path, issues)
+    meta["generation_path"] = path
+    filter_package_or_raise(data)
+    return _to_package(data)
+
+
+def validate_only(data: Dict[str, Any]) -> List[str]:
+    return issue_messages(validate_payload(data))
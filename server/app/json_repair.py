@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from typing import Any, Dict, List, Set, Tuple
+
+
+SMART_DOUBLE = "“”„‟"
+SMART_SINGLE = "‘’"
+QUOTES = '"\'' + SMART_DOUBLE + SMART_SINGLE
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+TOKEN_RE = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|[A-Za-z_]+")
+SPACE = " \t\r\n"
+
+
+def _next_significant(text: str, pos: int) -> str:
+    while pos < len(text) and text[pos] in SPACE:
+        pos += 1
+    return text[pos] if pos < len(text) else ""
+
+
+def _starts_value(ch: str) -> bool:
+    return ch in QUOTES or ch in "{[-" or ch.isalnum()
+
+
+def _read_string(text: str, pos: int, out: List[str], fixes: Set[str]) -> int:
+    opener = text[pos]
+    if opener == '"':
+        closers = '"'
+    elif opener == "'":
+        closers = "'"
+        fixes.add("single_quotes")
+    elif opener in SMART_SINGLE:
+        closers = SMART_SINGLE
+        fixes.add("smart_quotes")
+    else:
+        closers = SMART_DOUBLE + '"'
+        fixes.add("smart_quotes")
+    out.append('"')
+    pos += 1
+    while pos < len(text):
+        ch = text[pos]
+        if ch == "\\" and pos + 1 < len(text):
+            escaped = text[pos + 1]
+            out.append("'" if escaped == "'" else ch + escaped)
+            pos += 2
+            continue
+        if ch in closers:
+            # A quote followed by more words is part of the text, not the end.
+            if _next_significant(text, pos + 1).isalnum():
+                out.append('\\"' if ch == '"' else ch)
+                fixes.add("unescaped_quotes")
+                pos += 1
+                continue
+            out.append('"')
+            return pos + 1
+        if ch in CONTROL_ESCAPES or ord(ch) < 0x20:
+            out.append(CONTROL_ESCAPES.get(ch) or f"\\u{ord(ch):04x}")
+            fixes.add("control_characters")
+        elif ch == '"':
+            out.append('\\"')
+        else:
+            out.append(ch)
+        pos += 1
+    return pos
+
+
+# Rewrites the usual LLM JSON defects in a single scan: comments, smart and
+# single quotes, raw control characters and stray quotes inside strings,
+# missing and trailing commas, and Python literals.
+def repair_json(text: str) -> Tuple[Any, List[str]]:
+    out: List[str] = []
+    fixes: Set[str] = set()
+    after_value = False
+    pos = 0
+    while pos < len(text):
+        ch = text[pos]
+        if ch in SPACE:
+            out.append(ch)
+            pos += 1
+            continue
+        if ch == "/" and text[pos + 1 : pos + 2] in ("/", "*"):
+            line = text[pos + 1] == "/"
+            end = text.find("\n" if line else "*/", pos + 2)
+            pos = len(text) if end == -1 else end + (0 if line else 2)
+            fixes.add("comments")
+            continue
+        if after_value and _starts_value(ch):
+            out.append(",")
+            fixes.add("missing_commas")
+        if ch in QUOTES:
+            pos = _read_string(text, pos, out, fixes)
+            after_value = True
+            continue
+        if ch == ",":
+            if not after_value or _next_significant(text, pos + 1) in ("}", "]", ","):
+                fixes.add("trailing_commas")
+            else:
+                out.append(ch)
+            after_value = False
+            pos += 1
+            continue
+        match = TOKEN_RE.match(text, pos)
+        if match:
+            token = match.group(0)
+            if token in PYTHON_LITERALS:
+                token = PYTHON_LITERALS[token]
+                fixes.add("python_literals")
+            out.append(token)
+            after_value = True
+            pos = match.end()
+            continue
+        out.append(ch)
+        after_value = ch in "}]"
+        pos += 1
+    return json.loads("".join(out)), sorted(fixes)
+
+
+class RepairStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.repaired = 0
+        self.llm_repairs = 0
+        self.fixes: Dict[str, int] = {}
+
+    def record(self, fixes: List[str], ok: bool) -> None:
+        with self._lock:
+            self.attempts += 1
+            if ok:
+                self.repaired += 1
+                for fix in fixes:
+                    self.fixes[fix] = self.fixes.get(fix, 0) + 1
+
+    def record_llm_repair(self) -> None:
+        with self._lock:
+            self.llm_repairs += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "local_attempts": self.attempts,
+                "local_repaired": self.repaired,
+                "local_success_rate": self.repaired / self.attempts if self.attempts else None,
+                "llm_repairs": self.llm_repairs,
+                "fixes": dict(self.fixes),
+            }
+
+
+_stats = RepairStats()
+
+
+def get_repair_stats() -> RepairStats:
+    return _stats
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import List
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Request, Response
 
+from .assets import IMMUTABLE_CACHE, REVALIDATE_CACHE, Asset, get_asset_bundle
 from .routes import router
 
 
@@ -24,9 +24,40 @@ def health() -> dict:
 BASE_DIR = Path(__file__).resolve().parent.parent
 CLIENT_DIR = BASE_DIR.parent / "client"
 
-app.mount("/static", StaticFiles(directory=CLIENT_DIR), name="static")
+assets = get_asset_bundle(CLIENT_DIR)
+
+
+def _etags(if_none_match: str) -> List[str]:
+    return [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+def _asset_response(request: Request, asset: Asset, cache_control: str) -> Response:
+    encoding, body = asset.pick(request.headers.get("accept-encoding", ""))
+    etag = asset.etag_for(encoding)
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag in _etags(request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.media_type, headers=headers)
+
+
+@app.get("/static/{name:path}")
+def static_asset(name: str, request: Request) -> Response:
+    asset = assets.get(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found.")
+    cache = IMMUTABLE_CACHE if name in assets.immutable else REVALIDATE_CACHE
+    return _asset_response(request, asset, cache)
 
 
 @app.get("/")
-def index() -> FileResponse:
-    return FileResponse(CLIENT_DIR / "index.html")
+def index(request: Request) -> Response:
+    return _asset_response(request, assets.index, REVALIDATE_CACHE)
+
+
+@app.get("/sw.js")
+def service_worker(request: Request) -> Response:
+    if assets.service_worker is None:
+        raise HTTPException(status_code=404, detail="Not found.")
+    return _asset_response(request, assets.service_worker, REVALIDATE_CACHE)
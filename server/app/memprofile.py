@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .seed import env_bool
+
+
+DEFAULT_FRAMES = 1
+RECENT_REQUESTS = 64
+IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+class _Active:
+    __slots__ = ("label", "start", "mark", "peak", "stages")
+
+    def __init__(self, label: str, start: int) -> None:
+        self.label = label
+        self.start = start
+        self.mark = start
+        self.peak = 0
+        self.stages: List[Dict[str, Any]] = []
+
+
+# tracemalloc is process-wide: the peak counter is reset at every checkpoint,
+# so figures are exact for one request at a time (the benchmark) and only
+# indicative when requests overlap on threads.
+class MemoryProfiler:
+    def __init__(self, frames: int = DEFAULT_FRAMES) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.baseline = tracemalloc.take_snapshot()
+        self.stages: Dict[str, Dict[str, int]] = {}
+        self.labels: Dict[str, Dict[str, int]] = {}
+        self.recent: deque = deque(maxlen=RECENT_REQUESTS)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def request(self, label: str) -> Iterator[None]:
+        tracemalloc.reset_peak()
+        active = _Active(label, tracemalloc.get_traced_memory()[0])
+        self._local.active = active
+        try:
+            yield
+        finally:
+            self.checkpoint("finish")
+            self._local.active = None
+            record = {
+                "label": label,
+                "peak_bytes": active.peak,
+                "retained_bytes": active.mark - active.start,
+                "stages": active.stages,
+            }
+            with self._lock:
+                self.recent.append(record)
+                _accumulate(self.labels, label, active.peak, record["retained_bytes"])
+                for stage in active.stages:
+                    _accumulate(self.stages, stage["stage"], stage["peak_bytes"],
+                                stage["retained_bytes"])
+
+    # Closes the segment since the previous checkpoint and books it under `name`.
+    def checkpoint(self, name: str) -> None:
+        active = getattr(self._local, "active", None)
+        if active is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        active.stages.append(
+            {
+                "stage": name,
+                "peak_bytes": peak - active.mark,
+                "retained_bytes": current - active.mark,
+            }
+        )
+        active.peak = max(active.peak, peak - active.start)
+        active.mark = current
+
+    def top_sites(self, limit: int = 20) -> List[Dict[str, Any]]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, name) for name in IGNORED_FILES]
+        )
+        sites = []
+        for stat in snapshot.compare_to(self.baseline, "lineno")[:limit]:
+            frame = stat.traceback[0]
+            sites.append(
+                {
+                    "site": f"{frame.filename}:{frame.lineno}",
+                    "size_bytes": stat.size,
+                    "growth_bytes": stat.size_diff,
+                    "count": stat.count,
+                }
+            )
+        return sites
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: _summary(data) for name, data in self.stages.items()}
+            labels = {name: _summary(data) for name, data in self.labels.items()}
+            recent = list(self.recent)[-5:]
+        return {
+            "traced_bytes": tracemalloc.get_traced_memory()[0],
+            "stages": stages,
+            "requests": labels,
+            "recent": recent,
+            "top_sites": self.top_sites(top),
+        }
+
+
+def _accumulate(table: Dict[str, Dict[str, int]], key: str, peak: int, retained: int) -> None:
+    entry = table.setdefault(
+        key, {"count": 0, "peak_total": 0, "peak_max": 0, "retained_total": 0}
+    )
+    entry["count"] += 1
+    entry["peak_total"] += peak
+    entry["peak_max"] = max(entry["peak_max"], peak)
+    entry["retained_total"] += retained
+
+
+def _summary(entry: Dict[str, int]) -> Dict[str, int]:
+    count = entry["count"] or 1
+    return {
+        "count": entry["count"],
+        "peak_mean_bytes": entry["peak_total"] // count,
+        "peak_max_bytes": entry["peak_max"],
+        "retained_mean_bytes": entry["retained_total"] // count,
+    }
+
+
+_profiler: Optional[MemoryProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_memory_profiler(force: bool = False) -> Optional[MemoryProfiler]:
+    global _profiler
+    if _profiler is None and (force or env_bool("MEMORY_PROFILE", False)):
+        with _profiler_lock:
+            if _profiler is None:
+                frames = int(os.getenv("MEMORY_PROFILE_FRAMES", str(DEFAULT_FRAMES)))
+                _profiler = MemoryProfiler(frames)
+    return _profiler
+
+
+@contextmanager
+def profiled_request(label: str) -> Iterator[None]:
+    profiler = get_memory_profiler()
+    if profiler is None:
+        yield
+        return
+    with profiler.request(label):
+        yield
+
+
+def checkpoint(name: str) -> None:
+    if _profiler is not None:
+        _profiler.checkpoint(name)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -19,7 +19,12 @@ class GenerateRequest(BaseModel):
     player_names: Optional[List[str]] = None
     category_id: str = Field(..., description="Category id or 'random'")
     tone: Optional[str] = Field(None, description="comedy/serious/suspense")
-    duration: Optional[int] = Field(None, description="45/60/90")
+    duration: Optional[int] = Field(None, ge=1, description="Minutes; 45/60/90 are presets")
+    seed: Optional[int] = None
+
+
+class RegenerateRequest(BaseModel):
+    section: str = Field(..., description="Top-level field, or field.item_id for one entry")
     seed: Optional[int] = None
 
 
@@ -88,6 +93,9 @@ class GameMeta(BaseModel):
     tone: str
     duration: int
     model: str
+    generation_path: List[str] = Field(default_factory=list)
+    prompt_variants: Optional[Dict[str, str]] = None
+    stats: Optional[Dict[str, float]] = None
 
 
 class GamePackage(BaseModel):
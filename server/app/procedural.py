@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import copy
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+from .models import Category
+
+
+PROCEDURAL_MODEL = "procedural-v1"
+SEED_SALT = 0x5EED_C0DE
+
+TONE_WORDS: Dict[str, Dict[str, Sequence[str]]] = {
+    "comedy": {
+        "adjective": ("Ridiculous", "Unfortunate", "Overdressed", "Suspiciously Cheerful", "Chaotic"),
+        "noun": ("Fiasco", "Mix-Up", "Soiree", "Caper", "Kerfuffle"),
+        "mood": ("giddy", "absurd", "farcical", "playful"),
+        "verb": ("bungled", "fumbled", "hastily improvised", "comically mishandled"),
+    },
+    "serious": {
+        "adjective": ("Silent", "Bitter", "Final", "Unforgiven", "Hollow"),
+        "noun": ("Reckoning", "Inheritance", "Testament", "Debt", "Vigil"),
+        "mood": ("somber", "grave", "measured", "heavy"),
+        "verb": ("concealed", "carefully arranged", "quietly planned", "coldly executed"),
+    },
+    "suspense": {
+        "adjective": ("Midnight", "Hidden", "Shattered", "Whispered", "Crimson"),
+        "noun": ("Secret", "Affair", "Gambit", "Masquerade", "Conspiracy"),
+        "mood": ("tense", "uneasy", "electric", "watchful"),
+        "verb": ("orchestrated", "staged", "timed to the minute", "meticulously planned"),
+    },
+}
+
+TITLE_PATTERNS = (
+    "The {adjective} {noun}",
+    "{adjective} {noun} at the {place}",
+    "A {noun} at the {place}",
+    "The {place} {noun}",
+    "Death and the {adjective} {noun}",
+)
+STORYLINE_OPENINGS = (
+    "Guests gather for {event}, each hiding more than they admit.",
+    "{victim} promises an announcement that could change everyone's fortunes.",
+    "Invitations to {event} arrive with a cryptic note from {victim}.",
+)
+STORYLINE_TURNS = (
+    "The mood turns {mood} when an argument spills into the {spot}.",
+    "Someone tampers with the {prop} and whispers spread through the crowd.",
+    "Old rivalries resurface over dinner and nobody is in a forgiving mood.",
+)
+STORYLINE_DISCOVERIES = (
+    "The lights flicker, and moments later {victim} is found dead in the {spot}.",
+    "A scream from the {spot} brings everyone running: {victim} is dead.",
+)
+STORYLINE_AFTERMATHS = (
+    "Doors are sealed, and nobody may leave until the truth comes out.",
+    "Someone in the room {verb} the perfect crime, but left a trail behind.",
+    "Every guest scrambles to clear their name before the night is over.",
+)
+EVENTS = ("an exclusive celebration", "a long-awaited reunion", "a private unveiling", "a gala fundraiser")
+SPOTS = ("library", "east hallway", "back terrace", "cellar", "conservatory", "service stairwell", "study")
+MOTIVES = (
+    "{victim} was about to expose {murderer}'s {secret}.",
+    "{murderer} stood to inherit everything once {victim} was gone.",
+    "{victim} had ruined {murderer}'s reputation years ago, and {murderer} never forgot.",
+    "{murderer} feared losing control of the {place} to {victim}.",
+)
+METHODS = (
+    "A dose of sleeping draught slipped into {victim}'s glass, disguised as a toast.",
+    "A blow with the {prop} in the dark, staged to look like an accident.",
+    "Tampered equipment in the {spot}, {verb} so it would fail at the right moment.",
+    "Poison hidden in the {prop}, handed over with a smile.",
+)
+OPPORTUNITIES = (
+    "{murderer} slipped away to the {spot} during the {time} commotion.",
+    "{murderer} volunteered to fetch refreshments and was alone with {victim} at {time}.",
+    "{murderer} claimed to be on a phone call, but nobody saw them between {time} and the discovery.",
+)
+SECRETS = (
+    "owes a dangerous amount of money",
+    "forged a signature on an important document",
+    "was secretly meeting {victim} after hours",
+    "lied about where they were last winter",
+    "is not who they claim to be",
+    "took something valuable from the {place}",
+    "overheard a threat and told no one",
+    "is planning to leave town tonight",
+)
+TRAITS = (
+    "charming", "guarded", "ambitious", "nervous", "witty", "meticulous", "impulsive",
+    "loyal", "sardonic", "observant", "proud", "secretive", "warm", "restless",
+)
+RELATIONSHIPS = (
+    "old friend", "business partner", "bitter rival", "former flame", "cousin",
+    "confidant", "creditor", "reluctant ally", "mentor", "sworn enemy", "neighbor",
+)
+CONNECTIONS = (
+    "Worked for {victim} for years and knew their habits.",
+    "Borrowed money from {victim} and never paid it back.",
+    "Was named in {victim}'s will only last month.",
+    "Shared a secret with {victim} that could ruin them both.",
+    "Competed with {victim} for the same prize.",
+    "Was invited personally by {victim}, to everyone's surprise.",
+)
+PUBLIC_GOALS = (
+    "Make a good impression on the other guests.",
+    "Close a deal before the night ends.",
+    "Find out who else {victim} invited and why.",
+    "Keep the evening running smoothly.",
+    "Win back the trust of an old friend.",
+)
+SECRET_GOALS = (
+    "Destroy the letter that could expose your secret.",
+    "Make sure nobody learns you were in the {spot}.",
+    "Steer suspicion toward {other}.",
+    "Find the {prop} before anyone else does.",
+    "Learn what {other} knows about you.",
+)
+# Every innocent alibi names a witness, so suspects framed by the misleading
+# clues can always be cleared.
+ALIBIS = (
+    "Was in the {spot} with {other} when it happened.",
+    "Was giving a toast in the main hall at {time}, with {other} at their side.",
+    "Stepped outside for air and saw {other} near the {spot}.",
+    "Was searching for the missing {prop} in the {spot} with {other}.",
+)
+MURDERER_ALIBIS = (
+    "Claims to have been alone in the {spot}, but nobody can confirm it.",
+    "Says they were fetching the {prop}, though it took far too long.",
+)
+INTRO_LINES = (
+    "I'm {name}, and I've known {victim} longer than most of you.",
+    "Call me {name}. I came tonight for one reason, and it wasn't the food.",
+    "{name}, {role}. Don't believe everything you hear about me.",
+    "Whatever happened here tonight, I had nothing to do with it.",
+    "Everyone in this room has a reason to be nervous. Some more than others.",
+    "{victim} always said the {place} would be the death of us.",
+)
+HARD_CLUES = (
+    ("Monogrammed {prop}", "The {prop}, engraved with {murderer}'s initials, turned up in the {spot}."),
+    ("Torn Glove", "A torn glove matching {murderer}'s outfit, caught on the {spot} door."),
+    ("Guest Ledger", "The ledger shows {murderer} signed out at {time}, minutes before the discovery."),
+    ("Smudged Glass", "A glass from {victim}'s table carries {murderer}'s fingerprints."),
+    ("Muddy Footprints", "Footprints from the {spot} match the shoes {murderer} wore tonight."),
+)
+MISLEADING_CLUES = (
+    ("Anonymous Note", "A note in {other}'s handwriting reads: 'Tonight it ends.'"),
+    ("Broken {prop}", "The {prop} belonging to {other} turned up broken near the {spot}."),
+    ("Overheard Quarrel", "Staff overheard {other} shouting at {victim} earlier in the evening."),
+    ("Missing Key", "The {spot} key was last seen on {other}'s keyring."),
+)
+SOFT_CLUES = (
+    ("Spilled Drink", "A spilled drink in the {spot} suggests someone left in a hurry."),
+    ("Stopped Clock", "A clock in the {spot} stopped at {time}."),
+    ("Half-Burned Letter", "A letter mentioning {victim}'s plans, half-burned in the fireplace."),
+    ("Misplaced {prop}", "The {prop} turned up far from where it was set out."),
+    ("Rumor", "{other} mentions that {victim} seemed frightened this afternoon."),
+)
+TIMELINE_OPENINGS = (
+    "Guests arrive and {victim} greets {a} warmly.",
+    "{victim} opens the evening with a toast to old friends.",
+)
+TIMELINE_MIDDLE = (
+    "{a} and {b} are seen arguing near the {spot}.",
+    "{victim} hints at an announcement that silences the room.",
+    "Someone notices the {prop} missing from its place.",
+    "{a} leaves the main hall for several minutes.",
+    "The lights flicker and the room falls quiet.",
+    "{b} is spotted near the {spot} looking shaken.",
+    "{a} takes a phone call and returns visibly upset.",
+)
+TIMELINE_LAST_SEEN = "{murderer} is briefly seen heading toward the {spot}."
+TIMELINE_DISCOVERY = "{victim} is found dead in the {spot}."
+ROUNDS = (
+    ("Arrival & Introductions", "Players read their intro monologues and mingle in character."),
+    ("The Discovery", "The host announces the death; players share first impressions and alibis."),
+    ("Evidence Round", "Clues are revealed; players question each other and trade information."),
+    ("Crossfire", "Players confront contradictions in each other's stories."),
+    ("Accusations & Reveal", "Each player names a suspect, then the host reads the solution."),
+)
+BASE_PROPS = ("Name cards", "Clue envelopes", "Evidence cards", "Timeline board")
+
+
+def _tone_words(tone: str) -> Dict[str, Sequence[str]]:
+    return TONE_WORDS.get(tone, TONE_WORDS["suspense"])
+
+
+def _times(count: int, rng: random.Random) -> List[str]:
+    minute = 19 * 60 + rng.choice((0, 15, 30))
+    times = []
+    for _ in range(count):
+        times.append(f"{minute // 60:02d}:{minute % 60:02d}")
+        minute += rng.choice((10, 15, 20, 25))
+    return times
+
+
+def fill_procedural(structure: Dict[str, Any], category: Category) -> Dict[str, Any]:
+    meta = structure["meta"]
+    rng = random.Random(meta["seed"] ^ SEED_SALT)
+    choice = rng.choice
+    words = _tone_words(meta["tone"])
+    packets = structure["character_packets"]
+    names = {p["character_id"]: p["name"] for p in packets}
+    character_ids = list(names)
+    victim = structure["victim"]["name"]
+    murderer_id = structure["solution"]["murderer_id"]
+    murderer = names.get(murderer_id, murderer_id)
+    innocents = [names[cid] for cid in character_ids if cid != murderer_id] or [murderer]
+    props = category.suggested_props or ["keepsake"]
+    archetypes = category.suggested_archetypes or ["guest"]
+    place = category.name
+    times = _times(len(structure["timeline"]), rng)
+    crime_time = times[-2] if len(times) > 1 else times[0]
+    spot = choice(SPOTS)
+    weapon = choice(props)
+    slots = {
+        "place": place,
+        "victim": victim,
+        "murderer": murderer,
+        "spot": spot,
+        "prop": weapon,
+        "time": crime_time,
+        "mood": choice(words["mood"]),
+        "verb": choice(words["verb"]),
+        "event": choice(EVENTS),
+    }
+
+    structure["title"] = choice(TITLE_PATTERNS).format(
+        adjective=choice(words["adjective"]), noun=choice(words["noun"]), place=place
+    )
+    structure["theme_summary"] = (
+        f"{meta['tone'].capitalize()} mystery, {slots['mood']} and {category.tone_tags[0]}: "
+        f"{category.description}"
+    )
+    structure["storyline_overview"] = [
+        choice(bank).format(**slots)
+        for bank in (STORYLINE_OPENINGS, STORYLINE_TURNS, STORYLINE_DISCOVERIES, STORYLINE_AFTERMATHS)
+    ]
+
+    structure["victim"]["role"] = f"{choice(words['adjective']).lower()} {choice(archetypes)}"
+    structure["victim"]["why_they_mattered"] = (
+        f"{victim} held the keys to the {place}'s future and knew everyone's secrets."
+    )
+
+    secret = choice(SECRETS).format(**slots)
+    solution = structure["solution"]
+    solution["motive"] = choice(MOTIVES).format(secret=secret, **slots)
+    solution["method"] = choice(METHODS).format(**slots)
+    solution["opportunity"] = choice(OPPORTUNITIES).format(**slots)
+    solution["reveal_explanation"] = (
+        f"The hard evidence all points to {murderer}: they were in the {spot} around {crime_time}, "
+        f"their alibi cannot be confirmed, and the evidence around the {weapon} "
+        f"ties them to {victim}'s death."
+    )
+
+    events = structure["timeline"]
+    middle = rng.sample(TIMELINE_MIDDLE, len(TIMELINE_MIDDLE))
+    last = len(events) - 1
+    for idx, (event, time) in enumerate(zip(events, times)):
+        if idx == 0:
+            pattern = choice(TIMELINE_OPENINGS)
+        elif idx == last:
+            pattern = TIMELINE_DISCOVERY
+        elif idx == last - 1:
+            pattern = TIMELINE_LAST_SEEN
+        else:
+            pattern = middle[(idx - 1) % len(middle)]
+        event["time"] = time
+        event["description"] = pattern.format(a=choice(innocents), b=choice(innocents), **slots)
+
+    for clue in structure["clues"]:
+        if clue["is_misleading"]:
+            bank = MISLEADING_CLUES
+        elif clue["type"] == "hard":
+            bank = HARD_CLUES
+        else:
+            bank = SOFT_CLUES
+        title, description = choice(bank)
+        clue_slots = {**slots, "prop": choice(props), "other": choice(innocents)}
+        if bank is HARD_CLUES:
+            clue_slots["prop"] = weapon
+        clue["title"] = title.format(prop=clue_slots["prop"].title())
+        clue["description"] = description.format(**clue_slots)
+
+    for idx, packet in enumerate(packets):
+        name = packet["name"]
+        is_murderer = packet["character_id"] == murderer_id
+        role = f"{choice(words['adjective'])} {archetypes[idx % len(archetypes)]}".title()
+        others = [n for n in innocents if n != name] or [victim]
+        packet_slots = {**slots, "name": name, "role": role, "other": choice(others)}
+        own_secret = choice(SECRETS).format(**slots)
+        packet["role_title"] = role
+        packet["backstory"] = (
+            f"{name} came to the {place} as a {archetypes[idx % len(archetypes)]} and stayed for the "
+            f"connections. Lately they have been {choice(words['mood'])} and distracted."
+        )
+        for rel in packet["relationships"]:
+            rel["relationship"] = choice(RELATIONSHIPS)
+        packet["connection_to_victim"] = choice(CONNECTIONS).format(**packet_slots)
+        packet["traits"] = rng.sample(TRAITS, 3)
+        packet["public_goal"] = choice(PUBLIC_GOALS).format(**packet_slots)
+        packet["secret_goal"] = choice(SECRET_GOALS).format(**packet_slots)
+        packet["secrets"] = [
+            f"{name} {own_secret}.",
+            (f"{name} {secret}." if is_murderer else f"{name} {choice(SECRETS).format(**slots)}."),
+        ]
+        alibi_bank = MURDERER_ALIBIS if is_murderer else ALIBIS
+        packet["alibi"] = choice(alibi_bank).format(**packet_slots)
+        first, second = rng.sample(INTRO_LINES, 2)
+        packet["intro_monologue"] = [first.format(**packet_slots), second.format(**packet_slots)]
+        packet["prop_suggestion"] = choice(props)
+
+    rounds = structure["how_to_play"]
+    minutes = max(1, int(meta["duration"]) // max(1, len(rounds)))
+    for idx, round_info in enumerate(rounds):
+        if idx == len(rounds) - 1:
+            title, description = ROUNDS[-1]
+        else:
+            title, description = ROUNDS[idx % (len(ROUNDS) - 1)]
+        round_info["title"] = title
+        round_info["description"] = description
+        round_info["minutes"] = minutes
+
+    structure["props_list"] = list(BASE_PROPS) + [p.capitalize() for p in props]
+    meta["model"] = PROCEDURAL_MODEL
+    return structure
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if type(value) is str:
+        return not value.strip()
+    return type(value) is list and not value
+
+
+def _fill_gaps(target: Any, source: Any) -> None:
+    if type(target) is dict and type(source) is dict:
+        for key, value in source.items():
+            current = target.get(key)
+            if _is_empty(current):
+                target[key] = value
+            else:
+                _fill_gaps(current, value)
+    elif type(target) is list and type(source) is list:
+        for current, value in zip(target, source):
+            _fill_gaps(current, value)
+
+
+def fill_gaps(
+    structure: Dict[str, Any], category: Category, seed: Optional[int] = None
+) -> Dict[str, Any]:
+    source = copy.deepcopy(structure)
+    if seed is not None:
+        source["meta"]["seed"] = seed
+    filled = fill_procedural(source, category)
+    filled["meta"] = structure["meta"]
+    _fill_gaps(structure, filled)
+    return structure
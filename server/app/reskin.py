@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple, Union
+
+
+FULL, FIRST, LAST = 0, 1, 2
+# Template-owned fields never carry generated prose.
+SKIP_KEYS = frozenset(
+    {"meta", "character_id", "clue_id", "event_id", "round_id", "clue_ids", "name"}
+)
+
+Path = Tuple[Union[str, int], ...]
+
+
+@dataclass(frozen=True)
+class NameIndex:
+    character_ids: Tuple[str, ...]
+    tokens: Dict[str, Tuple[int, int]]
+    pattern: Optional[Pattern[str]]
+    paths: Tuple[Path, ...]
+
+
+def _parts(name: str) -> Tuple[str, str, str]:
+    words = name.split()
+    if not words:
+        return name, name, name
+    return name, words[0], words[-1]
+
+
+def _walk(value: Any, path: Path, pattern: Pattern[str], found: List[Path]) -> None:
+    if isinstance(value, str):
+        if pattern.search(value):
+            found.append(path)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key not in SKIP_KEYS:
+                _walk(item, path + (key,), pattern, found)
+    elif isinstance(value, list):
+        for pos, item in enumerate(value):
+            _walk(item, path + (pos,), pattern, found)
+
+
+# Maps name tokens (full, first and last names) to the packet they belong to.
+# Tokens shared by two people, or with the victim, are left out because a bare
+# mention cannot be attributed.
+def name_tokens(game: Dict[str, Any]) -> Dict[str, Tuple[int, int]]:
+    owners: Dict[str, Tuple[int, int]] = {}
+    holders: Dict[str, Set[int]] = {}
+    for pos, packet in enumerate(game["character_packets"]):
+        for kind, token in enumerate(_parts(packet["name"])):
+            if token:
+                holders.setdefault(token, set()).add(pos)
+                owners.setdefault(token, (pos, kind))
+    blocked = set(_parts(game.get("victim", {}).get("name", "")))
+    return {
+        token: owner
+        for token, owner in owners.items()
+        if len(holders[token]) == 1 and token not in blocked
+    }
+
+
+def token_pattern(tokens: Dict[str, Tuple[int, int]]) -> Optional[Pattern[str]]:
+    if not tokens:
+        return None
+    alternatives = "|".join(re.escape(token) for token in sorted(tokens, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})\b")
+
+
+# Records which packet each name token belongs to and which text fields
+# mention one, so a reskin only rewrites those fields.
+def build_name_index(game: Dict[str, Any]) -> NameIndex:
+    packets = game["character_packets"]
+    tokens = name_tokens(game)
+    pattern = token_pattern(tokens)
+    if pattern is None:
+        return NameIndex(tuple(p["character_id"] for p in packets), {}, None, ())
+    found: List[Path] = []
+    _walk(game, (), pattern, found)
+    return NameIndex(tuple(p["character_id"] for p in packets), tokens, pattern, tuple(found))
+
+
+def reskin(game: Dict[str, Any], index: NameIndex, names: List[str]) -> Dict[str, Any]:
+    if len(names) != len(index.character_ids):
+        raise ValueError("player_names length must match the number of characters.")
+    new_parts = [_parts(name) for name in names]
+    for packet, name in zip(game["character_packets"], names):
+        packet["name"] = name
+
+    def substitute(match: "re.Match[str]") -> str:
+        pos, kind = index.tokens[match.group(0)]
+        return new_parts[pos][kind]
+
+    for path in index.paths:
+        parent = game
+        for step in path[:-1]:
+            parent = parent[step]
+        parent[path[-1]] = index.pattern.sub(substitute, parent[path[-1]])
+    return game
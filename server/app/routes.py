@@ -1,36 +1,371 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+import json
+import secrets
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from .generator import generate_game, validate_only
-from .models import Category, GenerateRequest
-from .storage import get_categories
+from .admission import BATCH, AdmissionRejected, get_admission_controller
+from .deadline import Deadline, deadline_from_header
+from .experiments import get_variant_stats
+from .export import TEMPLATE_VERSION, get_kit, iter_chunks
+from .generator import (
+    canonical_request,
+    generate_game,
+    planned_share_code,
+    regenerate_section,
+    reskin_game,
+    section_target,
+)
+from .json_repair import get_repair_stats
+from .memprofile import get_memory_profiler
+from .models import Category, GamePackage, GenerateRequest, RegenerateRequest
+from .reskin import build_name_index
+from .seed import decode_share_code
+from .sessions import broadcast, dumps, get_session_registry
+from .storage import StoredGame, get_categories, get_game_store
+from .validation import issue_messages, validate_payload
+from .views import render_character_view, render_host_view, render_solution_view
 
 
 router = APIRouter()
 
+PUBLIC_CACHE = "public, max-age=300"
+PRIVATE_CACHE = "private, max-age=300"
+NO_STORE = "private, no-store"
+HOST_AUTH_TIMEOUT_SECONDS = 10.0
+
+
+def _load_game(share_code: str) -> StoredGame:
+    stored = get_game_store().get(share_code)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Game not found for share code.")
+    return stored
+
+
+def _json_view(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _require_host(stored: StoredGame, host_token: Optional[str]) -> None:
+    if not host_token or not secrets.compare_digest(host_token, stored.host_token):
+        raise HTTPException(status_code=403, detail="Host token required.")
+
+
+# Generation work waits for a slot; the wait counts against the deadline,
+# which is why callers start it before admission.
+@asynccontextmanager
+async def _admitted(request: Request, request_class: Optional[str]) -> AsyncIterator[None]:
+    controller = get_admission_controller()
+    # The header is self-declared, so unlabeled callers such as scripts queue as
+    # batch and only the UI, which labels itself, gets interactive priority.
+    request_class = request_class or BATCH
+    if request_class not in controller.weights:
+        raise HTTPException(status_code=400, detail=f"Unknown request class: {request_class}")
+    client = request.client.host if request.client else "unknown"
+    try:
+        async with controller.admit(client, request_class):
+            yield
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=429,
+            detail=exc.reason,
+            headers={"Retry-After": exc.retry_after_header},
+        ) from exc
+
+
+# Named requests reuse the name-agnostic game for the same seed and settings
+# and only swap the names in.
+def _generate_named(request: GenerateRequest, deadline: Deadline) -> GamePackage:
+    store = get_game_store()
+    canonical = canonical_request(request)
+    base = store.get(planned_share_code(canonical))
+    cached = base is not None
+    if base is None:
+        # Another worker may be generating the same base game; the first save wins.
+        base = store.save(generate_game(canonical, deadline))
+    if base.name_index is None:
+        base.name_index = build_name_index(base.game.model_dump())
+    return reskin_game(base.game, base.name_index, request.player_names, cached=cached)
+
+
+@router.get("/api/metrics")
+def metrics() -> Dict[str, Any]:
+    return {
+        "json_repair": get_repair_stats().snapshot(),
+        "admission": get_admission_controller().snapshot(),
+        "prompt_variants": get_variant_stats().snapshot(),
+    }
+
+
+@router.get("/api/debug/memory")
+def debug_memory(top: int = 20) -> Dict[str, Any]:
+    profiler = get_memory_profiler()
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Memory profiling is off (MEMORY_PROFILE=1).")
+    return profiler.snapshot(top=max(1, min(top, 100)))
+
 
 @router.get("/api/categories", response_model=List[Category])
 def list_categories() -> List[Category]:
     return get_categories()
 
 
-@router.post("/api/generate", response_model=Dict[str, Any])
-def generate(request: GenerateRequest) -> Dict[str, Any]:
+@router.post("/api/generate", response_model=GamePackage)
+async def generate(
+    request: GenerateRequest,
+    http_request: Request,
+    x_request_deadline_ms: Optional[int] = Header(None),
+    x_request_class: Optional[str] = Header(None),
+) -> Response:
+    deadline = deadline_from_header(x_request_deadline_ms)
     if request.player_names and len(request.player_names) != request.player_count:
         raise HTTPException(
             status_code=400,
             detail="player_names length must match player_count.",
         )
+    build = _generate_named if request.player_names else generate_game
+    async with _admitted(http_request, x_request_class):
+        try:
+            game = await run_in_threadpool(build, request, deadline)
+        except Exception as exc:  # noqa: BLE001
+            raise HTTPException(status_code=500, detail=str(exc)) from exc
+    stored = get_game_store().save(game)
+    headers = {"X-Generation-Path": ",".join(stored.game.meta.generation_path)}
+    # Share codes are reproducible from their settings, so only the request that
+    # first stored the game becomes its host; later ones get the stored game.
+    if stored.game is game:
+        headers["X-Host-Token"] = stored.host_token
+    return Response(content=stored.body, media_type="application/json", headers=headers)
+
+
+@router.post("/api/games/{share_code}/regenerate", response_model=GamePackage)
+async def regenerate(
+    share_code: str,
+    body: RegenerateRequest,
+    http_request: Request,
+    x_host_token: Optional[str] = Header(None),
+    x_request_deadline_ms: Optional[int] = Header(None),
+    x_request_class: Optional[str] = Header(None),
+) -> Response:
+    stored = _load_game(share_code)
+    _require_host(stored, x_host_token)
     try:
-        return generate_game(request)
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+        section_target(body.section)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    deadline = deadline_from_header(x_request_deadline_ms)
+    async with _admitted(http_request, x_request_class):
+        try:
+            game = await run_in_threadpool(
+                regenerate_section, stored.game, body.section, body.seed, deadline
+            )
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail="Section not found.") from exc
+        except Exception as exc:  # noqa: BLE001
+            raise HTTPException(status_code=500, detail=str(exc)) from exc
+    # Same share code and host token, so guests pick up the change by ETag.
+    stored = get_game_store().save(game, host_token=stored.host_token, replace=True)
+    session = get_session_registry().get(share_code)
+    if session is not None:
+        session.stored = stored
+    return Response(
+        content=stored.body,
+        media_type="application/json",
+        headers={"X-Generation-Path": ",".join(game.meta.generation_path)},
+    )
+
+
+@router.get("/api/share-codes/{share_code}")
+def share_code_info(share_code: str) -> Dict[str, Any]:
+    try:
+        data = decode_share_code(share_code, [c.id for c in get_categories()])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid share code: {exc}") from exc
+    return {**asdict(data), "stored": get_game_store().get(share_code) is not None}
+
+
+@router.get("/api/games/{share_code}")
+def game_host_view(share_code: str, request: Request) -> Response:
+    stored = _load_game(share_code)
+    return _json_view(request, render_host_view(stored), stored.etag, PUBLIC_CACHE)
+
+
+@router.get("/api/games/{share_code}/characters/{character_id}")
+def game_character_view(share_code: str, character_id: str, request: Request) -> Response:
+    stored = _load_game(share_code)
+    body = render_character_view(stored, character_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Character not found.")
+    return _json_view(request, body, stored.etag, PRIVATE_CACHE)
+
+
+@router.get("/api/games/{share_code}/solution")
+def game_solution_view(
+    share_code: str,
+    request: Request,
+    x_host_token: Optional[str] = Header(None),
+) -> Response:
+    stored = _load_game(share_code)
+    _require_host(stored, x_host_token)
+    return _json_view(request, render_solution_view(stored), stored.etag, NO_STORE)
+
+
+@router.get("/api/games/{share_code}/export")
+def game_export(
+    share_code: str,
+    request: Request,
+    x_host_token: Optional[str] = Header(None),
+) -> Response:
+    stored = _load_game(share_code)
+    _require_host(stored, x_host_token)
+    etag = f'"kit{TEMPLATE_VERSION}-{stored.etag[1:-1]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": PRIVATE_CACHE,
+        "Content-Disposition": 'attachment; filename="murder_mystery_kit.zip"',
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    kit = get_kit(share_code, stored.etag, stored.game.model_dump)
+    headers["Content-Length"] = str(len(kit))
+    return StreamingResponse(iter_chunks(kit), media_type="application/zip", headers=headers)
 
 
 @router.post("/api/validate", response_model=Dict[str, Any])
 def validate(payload: Dict[str, Any]) -> Dict[str, Any]:
-    issues = validate_only(payload)
-    return {"issues": issues}
+    issues = validate_payload(payload)
+    return {"issues": issue_messages(issues), "details": [issue.to_dict() for issue in issues]}
+
+
+def _validate_lines(lines: List[bytes], first_line: int) -> List[bytes]:
+    results = []
+    for offset, line in enumerate(lines):
+        number = first_line + offset
+        if not line.strip():
+            continue
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError as exc:
+            result: Dict[str, Any] = {"line": number, "ok": False, "error": f"invalid JSON: {exc}"}
+        else:
+            issues = validate_payload(payload)
+            meta = payload.get("meta") if isinstance(payload, dict) else None
+            result = {
+                "line": number,
+                "share_code": meta.get("share_code") if isinstance(meta, dict) else None,
+                "ok": not issues,
+                "issues": [issue.to_dict() for issue in issues],
+            }
+        results.append(json.dumps(result, separators=(",", ":")).encode("utf-8") + b"\n")
+    return results
+
+
+@router.post("/api/validate/batch")
+async def validate_batch(request: Request) -> Response:
+    output: List[bytes] = []
+    pending = bytearray()
+    line_number = 1
+    async for chunk in request.stream():
+        # Only the new bytes are searched, so a long line costs one pass.
+        start = len(pending)
+        pending += chunk
+        cut = pending.rfind(b"\n", start)
+        if cut < 0:
+            continue
+        lines = bytes(pending[:cut]).split(b"\n")
+        del pending[: cut + 1]
+        output.extend(await run_in_threadpool(_validate_lines, lines, line_number))
+        line_number += len(lines)
+    if pending.strip():
+        output.extend(await run_in_threadpool(_validate_lines, [bytes(pending)], line_number))
+    return Response(content=b"".join(output), media_type="application/x-ndjson")
+
+
+@router.post("/api/games/{share_code}/session")
+async def open_session(
+    share_code: str, x_host_token: Optional[str] = Header(None)
+) -> Dict[str, Any]:
+    stored = _load_game(share_code)
+    _require_host(stored, x_host_token)
+    try:
+        session = get_session_registry().open(stored)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return session.state_message()
+
+
+@router.websocket("/ws/games/{share_code}/host")
+async def host_socket(websocket: WebSocket, share_code: str) -> None:
+    session = get_session_registry().get(share_code)
+    if session is None:
+        await websocket.close(code=4403)
+        return
+    await websocket.accept()
+    # The token comes in the first message so it never lands in URLs or access logs.
+    try:
+        hello = json.loads(
+            await asyncio.wait_for(websocket.receive_text(), HOST_AUTH_TIMEOUT_SECONDS)
+        )
+        token = hello.get("token") if isinstance(hello, dict) else None
+    except (asyncio.TimeoutError, ValueError, WebSocketDisconnect):
+        token = None
+    if not isinstance(token, str) or not secrets.compare_digest(
+        token.encode("utf-8"), session.stored.host_token.encode("utf-8")
+    ):
+        await websocket.close(code=4403)
+        return
+    session.hosts.add(websocket)
+    try:
+        await websocket.send_text(dumps(session.state_message()))
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = session.apply(json.loads(text), time.time())
+            except (ValueError, TypeError, AttributeError) as exc:
+                await websocket.send_text(dumps({"type": "error", "detail": str(exc)}))
+                continue
+            await broadcast(session, message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.hosts.discard(websocket)
+
+
+@router.websocket("/ws/games/{share_code}/players/{character_id}")
+async def player_socket(websocket: WebSocket, share_code: str, character_id: str) -> None:
+    session = get_session_registry().get(share_code)
+    packet = render_character_view(session.stored, character_id) if session else None
+    if packet is None:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    session.players[websocket] = character_id
+    try:
+        # The cached packet bytes are spliced in rather than re-serialized.
+        await websocket.send_text('{"type":"packet","data":' + packet.decode("utf-8") + "}")
+        await websocket.send_text(dumps(session.state_message()))
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.players.pop(websocket, None)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Any, Iterator, List
 
 
 DISALLOWED_KEYWORDS: List[str] = [
@@ -23,3 +23,19 @@ def is_pg13(text: str) -> bool:
 def filter_or_raise(text: str) -> None:
     if not is_pg13(text):
         raise ValueError("Content failed PG-13 safety filter.")
+
+
+def iter_text(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_text(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_text(item)
+
+
+def filter_package_or_raise(data: Any) -> None:
+    if not all(is_pg13(text) for text in iter_text(data)):
+        raise ValueError("Content failed PG-13 safety filter.")
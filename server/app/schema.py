@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import re
+import typing
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from .models import CharacterPacket, Clue, GameMeta, GamePackage, Solution
+
+
+Normalizer = Callable[[Any], Any]
+
+# Fields the seeded template owns; LLM output never overwrites them.
+# Id fields of keyed lists are always template-owned and need no entry here.
+TEMPLATE_FIELDS: Dict[Type[BaseModel], FrozenSet[str]] = {
+    CharacterPacket: frozenset({"name", "clue_ids"}),
+    Clue: frozenset({"type", "is_misleading"}),
+    Solution: frozenset({"murderer_id"}),
+    GameMeta: frozenset(GameMeta.model_fields),
+}
+
+
+_LIST_SEPARATORS = re.compile(r"(?:\r?\n|;|•)")
+
+
+def _split_text_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        for item in value:
+            if type(item) is not str or not item or item[0].isspace() or item[-1].isspace():
+                break
+        else:
+            return value
+        stripped = (item.strip() if type(item) is str else str(item).strip() for item in value)
+        return [item for item in stripped if item]
+    if isinstance(value, str):
+        # Most answers only use "; ", which str.split handles without the regex.
+        if "\n" in value or "•" in value:
+            pieces = _LIST_SEPARATORS.split(value)
+        else:
+            pieces = value.split(";")
+        cleaned = [part for part in [piece.strip(" \t-•") for piece in pieces] if part]
+        return cleaned or [value.strip()]
+    return [str(value).strip()]
+
+
+def _split_lines(value: Any) -> List[str]:
+    if isinstance(value, str):
+        lines = value.splitlines() if "\n" in value else [value]
+        return [line.strip() for line in lines if line.strip()]
+    return _split_text_list(value)
+
+
+def normalize_props_list(props: Any) -> List[str]:
+    if props is None:
+        return []
+    if isinstance(props, dict):
+        props = [props]
+    if not isinstance(props, list):
+        return [str(props)]
+    normalized: List[str] = []
+    for item in props:
+        if isinstance(item, dict):
+            name = str(item.get("name", "")).strip()
+            description = str(item.get("description", "")).strip()
+            if name and description:
+                normalized.append(f"{name}: {description}")
+            elif name:
+                normalized.append(name)
+            elif description:
+                normalized.append(description)
+            else:
+                normalized.append(", ".join(f"{k}: {v}" for k, v in item.items()))
+        else:
+            normalized.append(str(item))
+    return [entry for entry in normalized if entry.strip()]
+
+
+def coerce_str(value: Any) -> Any:
+    if value is None or isinstance(value, (str, dict)):
+        return value
+    if isinstance(value, list):
+        return " ".join(str(item).strip() for item in value if str(item).strip())
+    return str(value)
+
+
+# Per-field overrides where the type alone does not say how to coerce.
+FIELD_NORMALIZERS: Dict[str, Normalizer] = {
+    "intro_monologue": _split_lines,
+    "props_list": normalize_props_list,
+}
+
+
+SCALAR, TEXT, NESTED, KEYED = 0, 1, 2, 3
+_MISSING = object()
+
+Step = Tuple[str, int, Any]
+
+
+# A model's fields as a table of (name, kind, op) steps, built once from the
+# types; merge and normalize walk it instead of inspecting the model per call.
+@dataclass(frozen=True)
+class ModelPlan:
+    model: Type[BaseModel]
+    id_field: Optional[str]
+    steps: Tuple[Step, ...]
+    text_steps: Tuple[Tuple[str, Normalizer], ...] = field(
+        init=False, repr=False, compare=False
+    )
+    other_steps: Tuple[Step, ...] = field(init=False, repr=False, compare=False)
+
+    # Text fields are most of every model, so merges walk them in their own loop.
+    def __post_init__(self) -> None:
+        text = tuple((name, op) for name, kind, op in self.steps if kind == TEXT)
+        other = tuple(step for step in self.steps if step[1] != TEXT)
+        object.__setattr__(self, "text_steps", text)
+        object.__setattr__(self, "other_steps", other)
+
+    # Keyed lists merge many small items (clues, relationships) whose fields are all
+    # text; those are merged inline rather than through one merge call per item.
+    def merge_pairs(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        if self.other_steps:
+            merge = self.merge
+            for base, update in pairs:
+                merge(base, update)
+            return
+        steps = self.text_steps
+        for base, update in pairs:
+            get = update.get
+            for name, op in steps:
+                value = get(name, _MISSING)
+                if value is not _MISSING:
+                    base[name] = value if type(value) is str else op(value)
+
+    def merge(self, base: Dict[str, Any], update: Dict[str, Any]) -> None:
+        get = update.get
+        for name, op in self.text_steps:
+            value = get(name, _MISSING)
+            if value is not _MISSING:
+                base[name] = value if type(value) is str else op(value)
+        for name, kind, op in self.other_steps:
+            value = get(name, _MISSING)
+            if value is _MISSING:
+                continue
+            if kind == SCALAR:
+                base[name] = value if op is None else op(value)
+            else:
+                current = base.get(name)
+                if kind == NESTED:
+                    if type(value) is dict and type(current) is dict:
+                        op.merge(current, value)
+                elif type(value) is list and type(current) is list:
+                    _merge_keyed_small(op, current, value)
+
+    def normalize(self, data: Dict[str, Any]) -> None:
+        for name, kind, op in self.steps:
+            if kind == SCALAR and op is None:
+                continue
+            value = data.get(name, _MISSING)
+            if value is _MISSING:
+                continue
+            if kind == SCALAR:
+                data[name] = op(value)
+            elif kind == TEXT:
+                if type(value) is not str:
+                    data[name] = op(value)
+            elif kind == NESTED:
+                if type(value) is dict:
+                    op.normalize(value)
+            elif type(value) is list:
+                _normalize_items(op, value)
+
+
+def _is_model(tp: Any) -> bool:
+    return isinstance(tp, type) and issubclass(tp, BaseModel)
+
+
+def _unwrap_optional(tp: Any) -> Any:
+    if typing.get_origin(tp) is typing.Union:
+        args = [arg for arg in typing.get_args(tp) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return tp
+
+
+def _id_field(model: Type[BaseModel]) -> Optional[str]:
+    return next((name for name in model.model_fields if name.endswith("_id")), None)
+
+
+def _merge_keyed_small(plan: ModelPlan, base_items: List[Any], updates: List[Any]) -> None:
+    id_field = plan.id_field
+    count = len(updates)
+    pairs = []
+    index: Optional[Dict[Any, Any]] = None
+    for pos, base in enumerate(base_items):
+        key = base.get(id_field)
+        if pos < count:
+            update = updates[pos]
+            if type(update) is dict and update.get(id_field) == key:
+                pairs.append((base, update))
+                continue
+        # Out of order: index the updates once instead of rescanning them per item.
+        if index is None:
+            index = {}
+            for update in updates:
+                if type(update) is dict:
+                    index.setdefault(update.get(id_field), update)
+        update = index.get(key)
+        if update is not None:
+            pairs.append((base, update))
+    plan.merge_pairs(pairs)
+
+
+def _normalize_items(plan: ModelPlan, items: List[Any]) -> None:
+    normalize = plan.normalize
+    for item in items:
+        if type(item) is dict:
+            normalize(item)
+
+
+def compile_model(model: Type[BaseModel], keyed: bool = False) -> ModelPlan:
+    id_field = _id_field(model) if keyed else None
+    fixed = TEMPLATE_FIELDS.get(model, frozenset()) | {id_field}
+    steps: List[Step] = []
+    for name, info in model.model_fields.items():
+        if name in fixed:
+            continue
+        tp = _unwrap_optional(info.annotation)
+        item_tp = typing.get_args(tp)[0] if typing.get_origin(tp) in (list, List) else None
+        if name in FIELD_NORMALIZERS:
+            steps.append((name, SCALAR, FIELD_NORMALIZERS[name]))
+        elif _is_model(tp):
+            steps.append((name, NESTED, compile_model(tp)))
+        elif item_tp is not None and _is_model(item_tp):
+            steps.append((name, KEYED, compile_model(item_tp, keyed=True)))
+        elif item_tp is str:
+            steps.append((name, SCALAR, _split_text_list))
+        elif tp is str:
+            steps.append((name, TEXT, coerce_str))
+        else:
+            steps.append((name, SCALAR, None))
+    return ModelPlan(model=model, id_field=id_field, steps=tuple(steps))
+
+
+PACKAGE_PLAN = compile_model(GamePackage)
+
+
+# Answers usually keep the template order, so a keyed item is first matched to
+# the base item at its own position; a section's id index is only built (once per
+# structure, then reused by repair merges) when an item is out of place.
+class StructureMerger:
+    def __init__(self, structure: Dict[str, Any], plan: ModelPlan = PACKAGE_PLAN) -> None:
+        self.structure = structure
+        self.plan = plan
+        self._indexes: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+
+    def _index(self, name: str, id_field: str) -> Dict[Any, Dict[str, Any]]:
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = {
+                item[id_field]: item for item in self.structure.get(name, [])
+            }
+        return index
+
+    def merge(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        structure = self.structure
+        for name, kind, op in self.plan.steps:
+            value = candidate.get(name, _MISSING)
+            if value is _MISSING or name not in structure:
+                continue
+            if kind == KEYED:
+                if type(value) is not list:
+                    continue
+                base_items = structure[name]
+                count = len(base_items)
+                id_field = op.id_field
+                pairs = []
+                index = None
+                for pos, item in enumerate(value):
+                    if type(item) is not dict:
+                        continue
+                    key = item.get(id_field)
+                    if pos < count and base_items[pos][id_field] == key:
+                        pairs.append((base_items[pos], item))
+                        continue
+                    if index is None:
+                        index = self._index(name, id_field)
+                    base = index.get(key)
+                    if base is not None:
+                        pairs.append((base, item))
+                op.merge_pairs(pairs)
+            elif kind == NESTED:
+                if type(value) is dict:
+                    op.merge(structure[name], value)
+            elif kind == TEXT:
+                structure[name] = value if type(value) is str else op(value)
+            else:
+                structure[name] = value if op is None else op(value)
+        return structure
+
+
+def merge_structure(structure: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    return StructureMerger(structure).merge(candidate)
+
+
+def normalize_package(data: Dict[str, Any]) -> Dict[str, Any]:
+    PACKAGE_PLAN.normalize(data)
+    return data
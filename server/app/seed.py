@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
 import os
 import random
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 
 MIN_PLAYERS = 4
 MAX_PLAYERS = 20
 
+SHARE_CODE_VERSION = 2
+# Table positions are part of the v2 format; append new values, never reorder.
+TONES = ("comedy", "serious", "suspense")
+DURATIONS = (45, 60, 90)
+CUSTOM = 3
+HAS_NAMES = 0x10
+NAMES_HASH_SIZE = 4
+FINGERPRINT_SIZE = 4
+CHECKSUM_SIZE = 2
+
 
 @dataclass(frozen=True)
 class ShareCodeData:
@@ -19,6 +30,9 @@ class ShareCodeData:
     category_id: str
     tone: str
     duration: int
+    names_hash: Optional[str] = None
+    fingerprint: Optional[str] = None
+    version: int = SHARE_CODE_VERSION
 
 
 def normalize_seed(seed: Optional[int]) -> int:
@@ -33,32 +47,136 @@ def seeded_random(seed: int) -> random.Random:
     return rng
 
 
-def encode_share_code(data: ShareCodeData) -> str:
-    payload = {
-        "seed": data.seed,
-        "player_count": data.player_count,
-        "category_id": data.category_id,
-        "tone": data.tone,
-        "duration": data.duration,
-        "v": 1,
-    }
-    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    return base64.urlsafe_b64encode(raw).decode("utf-8").rstrip("=")
+def names_hash(names: Optional[List[str]]) -> Optional[str]:
+    if not names:
+        return None
+    joined = "\x1f".join(names).encode("utf-8")
+    return hashlib.blake2b(joined, digest_size=NAMES_HASH_SIZE).hexdigest()
 
 
-def decode_share_code(code: str) -> ShareCodeData:
-    padded = code + "=" * (-len(code) % 4)
-    raw = base64.urlsafe_b64decode(padded.encode("utf-8")).decode("utf-8")
-    payload: Dict[str, Any] = json.loads(raw)
+def generation_fingerprint(model: str, prompt_version: str) -> str:
+    raw = f"{model}\x1f{prompt_version}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=FINGERPRINT_SIZE).hexdigest()
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    if value < 0:
+        raise ValueError("Share code fields must not be negative.")
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(raw: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = raw[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _checksum(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=CHECKSUM_SIZE).digest()
+
+
+# v2 layout: version byte, zigzag varint seed, category index, player count,
+# flags (tone index, duration index, names bit), optional custom tone/duration,
+# optional names hash, model/prompt fingerprint, checksum.
+def encode_share_code(data: ShareCodeData, category_ids: Sequence[str]) -> str:
+    out = bytearray([SHARE_CODE_VERSION])
+    _put_varint(out, data.seed << 1 if data.seed >= 0 else (-data.seed << 1) - 1)
+    out.append(list(category_ids).index(data.category_id))
+    out.append(data.player_count)
+    tone_idx = TONES.index(data.tone) if data.tone in TONES else CUSTOM
+    duration_idx = DURATIONS.index(data.duration) if data.duration in DURATIONS else CUSTOM
+    out.append(tone_idx | duration_idx << 2 | (HAS_NAMES if data.names_hash else 0))
+    if tone_idx == CUSTOM:
+        tone = data.tone.encode("utf-8")
+        _put_varint(out, len(tone))
+        out += tone
+    if duration_idx == CUSTOM:
+        _put_varint(out, data.duration)
+    if data.names_hash:
+        out += bytes.fromhex(data.names_hash)
+    out += bytes.fromhex(data.fingerprint or "00" * FINGERPRINT_SIZE)
+    out += _checksum(out)
+    return base64.urlsafe_b64encode(bytes(out)).decode("ascii").rstrip("=")
+
+
+def _decode_v1(raw: bytes) -> ShareCodeData:
+    payload: Dict[str, Any] = json.loads(raw.decode("utf-8"))
     return ShareCodeData(
         seed=int(payload["seed"]),
         player_count=int(payload["player_count"]),
         category_id=str(payload["category_id"]),
         tone=str(payload["tone"]),
         duration=int(payload["duration"]),
+        version=1,
     )
 
 
+def _decode_v2(raw: bytes, category_ids: Sequence[str]) -> ShareCodeData:
+    body, checksum = raw[:-CHECKSUM_SIZE], raw[-CHECKSUM_SIZE:]
+    if _checksum(body) != checksum:
+        raise ValueError("Share code checksum mismatch.")
+    zigzag, pos = _get_varint(body, 1)
+    category_idx, player_count, flags = body[pos], body[pos + 1], body[pos + 2]
+    pos += 3
+    if category_idx >= len(category_ids):
+        raise ValueError("Share code refers to an unknown category.")
+    tone_idx = flags & 0x03
+    duration_idx = (flags >> 2) & 0x03
+    if tone_idx == CUSTOM:
+        length, pos = _get_varint(body, pos)
+        tone = body[pos : pos + length].decode("utf-8")
+        pos += length
+    else:
+        tone = TONES[tone_idx]
+    if duration_idx == CUSTOM:
+        duration, pos = _get_varint(body, pos)
+    else:
+        duration = DURATIONS[duration_idx]
+    hashed = None
+    if flags & HAS_NAMES:
+        hashed = body[pos : pos + NAMES_HASH_SIZE].hex()
+        pos += NAMES_HASH_SIZE
+    fingerprint = body[pos : pos + FINGERPRINT_SIZE]
+    if len(fingerprint) != FINGERPRINT_SIZE or pos + FINGERPRINT_SIZE != len(body):
+        raise ValueError("Share code has an invalid length.")
+    return ShareCodeData(
+        seed=(zigzag >> 1) ^ -(zigzag & 1),
+        player_count=player_count,
+        category_id=category_ids[category_idx],
+        tone=tone,
+        duration=duration,
+        names_hash=hashed,
+        fingerprint=fingerprint.hex(),
+    )
+
+
+def decode_share_code(code: str, category_ids: Sequence[str]) -> ShareCodeData:
+    padded = code + "=" * (-len(code) % 4)
+    raw = base64.urlsafe_b64decode(padded.encode("ascii"))
+    if not raw:
+        raise ValueError("Empty share code.")
+    # v1 codes are base64 JSON, so their first byte is always "{".
+    if raw[0] == ord("{"):
+        try:
+            return _decode_v1(raw)
+        except (KeyError, TypeError) as exc:
+            raise ValueError("Share code is missing fields.") from exc
+    if raw[0] != SHARE_CODE_VERSION or len(raw) < 8:
+        raise ValueError("Unsupported share code version.")
+    try:
+        return _decode_v2(raw, category_ids)
+    except IndexError as exc:
+        raise ValueError("Share code is truncated.") from exc
+
+
 def env_bool(name: str, default: bool = False) -> bool:
     value = os.getenv(name)
     if value is None:
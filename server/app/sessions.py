@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import WebSocket
+
+from .storage import StoredGame
+
+
+LOBBY = -1
+DEFAULT_MAX_SESSIONS = 5000
+DEFAULT_IDLE_SECONDS = 6 * 3600
+SEND_TIMEOUT_SECONDS = 5.0
+
+
+def dumps(message: Dict[str, Any]) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+
+# One per open game. Timers are sent as an absolute ends_at and counted down
+# by the clients, so a session needs no task of its own; revealed clues are a
+# bitmask over the game's clue order.
+class Session:
+    __slots__ = ("stored", "round_index", "ends_at", "revealed", "hosts", "players", "touched_at")
+
+    def __init__(self, stored: StoredGame) -> None:
+        self.stored = stored
+        self.round_index = LOBBY
+        self.ends_at: Optional[float] = None
+        self.revealed = 0
+        self.hosts: Set[WebSocket] = set()
+        self.players: Dict[WebSocket, str] = {}
+        self.touched_at = time.time()
+
+    @property
+    def sockets(self) -> List[WebSocket]:
+        return [*self.hosts, *self.players]
+
+    def revealed_ids(self) -> List[str]:
+        clues = self.stored.game.clues
+        return [clue.clue_id for pos, clue in enumerate(clues) if self.revealed >> pos & 1]
+
+    def round_message(self, kind: str = "round") -> Dict[str, Any]:
+        message: Dict[str, Any] = {"type": kind, "round": self.round_index, "ends_at": self.ends_at}
+        if self.round_index != LOBBY:
+            round_info = self.stored.game.how_to_play[self.round_index]
+            message.update(
+                round_id=round_info.round_id,
+                title=round_info.title,
+                description=round_info.description,
+                minutes=round_info.minutes,
+            )
+        return message
+
+    def state_message(self) -> Dict[str, Any]:
+        return {**self.round_message("state"), "revealed": self.revealed_ids()}
+
+    def start_round(self, index: int, now: float) -> Dict[str, Any]:
+        rounds = self.stored.game.how_to_play
+        if not 0 <= index < len(rounds):
+            raise ValueError("Round out of range.")
+        self.round_index = index
+        self.ends_at = now + rounds[index].minutes * 60
+        return self.round_message()
+
+    def extend(self, seconds: float) -> Dict[str, Any]:
+        if self.ends_at is None:
+            raise ValueError("No round is running.")
+        if not math.isfinite(seconds):
+            raise ValueError("Extension must be a finite number of seconds.")
+        self.ends_at += seconds
+        return self.round_message()
+
+    def reveal(self, clue_id: str) -> Dict[str, Any]:
+        for pos, clue in enumerate(self.stored.game.clues):
+            if clue.clue_id == clue_id:
+                self.revealed |= 1 << pos
+                return {
+                    "type": "clue",
+                    "clue": {
+                        "clue_id": clue.clue_id,
+                        "title": clue.title,
+                        "description": clue.description,
+                    },
+                }
+        raise ValueError("Unknown clue.")
+
+    def apply(self, action: Dict[str, Any], now: float) -> Dict[str, Any]:
+        kind = action.get("action")
+        if kind == "next_round":
+            return self.start_round(self.round_index + 1, now)
+        if kind == "start_round":
+            return self.start_round(int(action.get("round", 0)), now)
+        if kind == "extend":
+            return self.extend(float(action.get("seconds", 60)))
+        if kind == "reveal":
+            return self.reveal(str(action.get("clue_id", "")))
+        raise ValueError("Unknown action.")
+
+
+class SessionRegistry:
+    def __init__(
+        self, max_sessions: int = DEFAULT_MAX_SESSIONS, idle_seconds: float = DEFAULT_IDLE_SECONDS
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions: Dict[str, Session] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, share_code: str) -> Optional[Session]:
+        return self._sessions.get(share_code)
+
+    def open(self, stored: StoredGame) -> Session:
+        share_code = stored.game.meta.share_code
+        session = self._sessions.get(share_code)
+        if session is None:
+            if len(self._sessions) >= self.max_sessions:
+                self._evict_idle(time.time())
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError("Too many live sessions.")
+            session = self._sessions[share_code] = Session(stored)
+        session.touched_at = time.time()
+        return session
+
+    def _evict_idle(self, now: float) -> None:
+        for share_code, session in list(self._sessions.items()):
+            idle = now - session.touched_at > self.idle_seconds
+            if idle and not session.hosts and not session.players:
+                del self._sessions[share_code]
+
+
+async def _send(socket: WebSocket, text: str) -> None:
+    await asyncio.wait_for(socket.send_text(text), SEND_TIMEOUT_SECONDS)
+
+
+async def broadcast(session: Session, message: Dict[str, Any]) -> None:
+    text = dumps(message)
+    sockets = session.sockets
+    results = await asyncio.gather(*(_send(s, text) for s in sockets), return_exceptions=True)
+    for socket, result in zip(sockets, results):
+        if isinstance(result, BaseException):
+            session.hosts.discard(socket)
+            session.players.pop(socket, None)
+    session.touched_at = time.time()
+
+
+_registry: Optional[SessionRegistry] = None
+
+
+def get_session_registry() -> SessionRegistry:
+    global _registry
+    if _registry is None:
+        _registry = SessionRegistry(
+            max_sessions=int(os.getenv("MAX_LIVE_SESSIONS", str(DEFAULT_MAX_SESSIONS))),
+        )
+    return _registry
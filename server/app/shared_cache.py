@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional
+    redis = None
+
+
+DEFAULT_MAX_MB = 256
+# Reads refresh an entry's LRU position at most this often, so hot keys do not
+# turn every read into a write.
+TOUCH_INTERVAL_SECONDS = 30.0
+# Eviction frees down to this share of the budget, so it does not run on every insert.
+EVICT_TO = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    meta TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+class Entry(NamedTuple):
+    value: bytes
+    meta: str
+
+
+# One file shared by every worker on the host. WAL lets readers run alongside
+# the single writer, and the mmap'd pages mean a read is one copy out of the
+# page cache into the returned bytes.
+class SQLiteSharedCache:
+    def __init__(self, path: Path, max_bytes: int, clock=time.time) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._conn = sqlite3.connect(str(path), timeout=10.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={max(max_bytes * 2, 1 << 26)}")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Entry]:
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, meta, accessed FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > TOUCH_INTERVAL_SECONDS:
+                with self._conn:
+                    self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return Entry(row[0], row[1])
+
+    def meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT meta FROM entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, meta: str = "") -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, value, meta, len(value), self.clock()),
+            )
+            self._evict(key)
+
+    # Atomic set-if-absent: the first writer wins and every caller gets the
+    # stored entry back.
+    def add(self, key: str, value: bytes, meta: str = "") -> Entry:
+        with self._lock, self._conn:
+            inserted = self._conn.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO NOTHING",
+                (key, value, meta, len(value), self.clock()),
+            ).rowcount
+            if inserted:
+                self._evict(key)
+                return Entry(value, meta)
+            row = self._conn.execute(
+                "SELECT value, meta FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return Entry(row[0], row[1])
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self, keep: str) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * EVICT_TO)
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries WHERE key != ? ORDER BY accessed", (keep,)
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+
+# Value and meta live in one hash, so the freshness check reads only the meta.
+ADD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('HMGET', KEYS[1], 'value', 'meta')
+end
+redis.call('HSET', KEYS[1], 'value', ARGV[1], 'meta', ARGV[2])
+return false
+"""
+
+
+# For hosts that already run Redis (or a compatible server). Size bounds come
+# from the server's maxmemory and an allkeys-lru policy.
+class RedisSharedCache:
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError("SHARED_CACHE is a redis:// URL but the redis package is missing.")
+        self._redis = redis.Redis.from_url(url)
+        self._add = self._redis.register_script(ADD_SCRIPT)
+
+    def get(self, key: str) -> Optional[Entry]:
+        value, meta = self._redis.hmget(key, "value", "meta")
+        return None if value is None else Entry(value, meta.decode("utf-8"))
+
+    def meta(self, key: str) -> Optional[str]:
+        meta = self._redis.hget(key, "meta")
+        return None if meta is None else meta.decode("utf-8")
+
+    def set(self, key: str, value: bytes, meta: str = "") -> None:
+        self._redis.hset(key, mapping={"value": value, "meta": meta})
+
+    def add(self, key: str, value: bytes, meta: str = "") -> Entry:
+        existing = self._add(keys=[key], args=[value, meta])
+        if not existing:
+            return Entry(value, meta)
+        return Entry(existing[0], existing[1].decode("utf-8"))
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(key)
+
+    def size_bytes(self) -> int:
+        return int(self._redis.info("memory").get("used_memory", 0))
+
+
+SharedCache = Union[SQLiteSharedCache, RedisSharedCache]
+
+
+def open_shared_cache(url: str, max_bytes: int) -> SharedCache:
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSharedCache(url)
+    path = url[len("sqlite://") :] if url.startswith("sqlite://") else url
+    return SQLiteSharedCache(Path(path), max_bytes)
+
+
+_shared: Optional[SharedCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    global _shared
+    url = os.getenv("SHARED_CACHE", "")
+    if not url:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            max_mb = float(os.getenv("SHARED_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+            _shared = open_shared_cache(url, int(max_mb * 1024 * 1024))
+    return _shared
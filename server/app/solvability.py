@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Set
+
+from .reskin import name_tokens, token_pattern
+from .validation import ValidationIssue
+
+
+SOLVABILITY_PREFIX = "solvability."
+# Clue ownership, clue types and the murderer are fixed by the structure, so no
+# rewrite of the text can fix these; _build_structure prevents them instead.
+STRUCTURAL_CODES = frozenset({"solvability.evidence_hidden"})
+
+
+def is_blocking(issues: List[ValidationIssue]) -> bool:
+    return any(not issue.code.startswith(SOLVABILITY_PREFIX) for issue in issues)
+
+
+def text_fixable(issues: List[ValidationIssue]) -> List[ValidationIssue]:
+    return [issue for issue in issues if issue.code not in STRUCTURAL_CODES]
+
+
+# Deduction over the finished game: characters are linked to clues and
+# alibis by name mentions. The non-misleading hard clues must single out the
+# murderer, someone other than the murderer must hold one of them, and every
+# innocent who looks as guilty (counting the misleading clues) needs an alibi
+# that another character backs up.
+def check_solvability(game: Dict[str, Any]) -> List[ValidationIssue]:
+    packets = game["character_packets"]
+    ids = [p["character_id"] for p in packets]
+    murderer_id = game["solution"]["murderer_id"]
+    if murderer_id not in ids:
+        return []
+    murderer = ids.index(murderer_id)
+    tokens = name_tokens(game)
+    pattern = token_pattern(tokens)
+    if pattern is None:
+        return []
+
+    def named(text: str) -> Set[int]:
+        return {tokens[token][0] for token in pattern.findall(text)}
+
+    holders: Dict[str, Set[int]] = {}
+    for pos, packet in enumerate(packets):
+        for clue_id in packet["clue_ids"]:
+            holders.setdefault(clue_id, set()).add(pos)
+
+    evidence = [0.0] * len(ids)
+    suspicion = [0.0] * len(ids)
+    against_murderer: List[Dict[str, Any]] = []
+    for clue in game["clues"]:
+        true_hard = clue["type"] == "hard" and not clue["is_misleading"]
+        if not (true_hard or clue["is_misleading"]):
+            continue
+        people = named(f"{clue['title']} {clue['description']}")
+        for pos in people:
+            weight = 1.0 / len(people)
+            suspicion[pos] += weight
+            if true_hard:
+                evidence[pos] += weight
+        if true_hard and murderer in people:
+            against_murderer.append(clue)
+
+    issues: List[ValidationIssue] = []
+    if not against_murderer:
+        return [
+            ValidationIssue(
+                "solvability.no_evidence",
+                "clues",
+                "No hard, non-misleading clue names the murderer.",
+                (murderer_id,),
+            )
+        ]
+    if not any(holders.get(c["clue_id"], set()) - {murderer} for c in against_murderer):
+        issues.append(
+            ValidationIssue(
+                "solvability.evidence_hidden",
+                "character_packets",
+                "Only the murderer holds the clues that point to them.",
+                (murderer_id, *(c["clue_id"] for c in against_murderer)),
+            )
+        )
+    rivals = [
+        ids[p] for p in range(len(ids)) if p != murderer and evidence[p] >= evidence[murderer]
+    ]
+    if rivals:
+        issues.append(
+            ValidationIssue(
+                "solvability.ambiguous",
+                "clues",
+                "Hard clues implicate innocent characters as strongly as the murderer.",
+                tuple(rivals),
+            )
+        )
+
+    alibis = [named(p["alibi"]) - {pos} for pos, p in enumerate(packets)]
+    vouched = {other for seen in alibis for other in seen}
+    witnesses = [ids[p] for p in alibis[murderer] if murderer in alibis[p]]
+    if witnesses:
+        issues.append(
+            ValidationIssue(
+                "solvability.murderer_alibi_confirmed",
+                "character_packets",
+                "The murderer and a witness confirm each other's alibi.",
+                (murderer_id, *witnesses),
+            )
+        )
+    uncleared = [
+        ids[p]
+        for p in range(len(ids))
+        if p != murderer
+        and suspicion[p] >= evidence[murderer]
+        and p not in vouched
+        and not alibis[p] - {murderer}
+    ]
+    if uncleared:
+        issues.append(
+            ValidationIssue(
+                "solvability.uncleared_suspect",
+                "character_packets",
+                "Suspects implicated as strongly as the murderer have no confirmed alibi.",
+                tuple(uncleared),
+            )
+        )
+    return issues
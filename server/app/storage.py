@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
-from .models import Category
+from .models import Category, GamePackage
+from .reskin import NameIndex
+from .shared_cache import Entry, SharedCache, get_shared_cache
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 PROMPTS_DIR = BASE_DIR / "prompts"
+DEFAULT_GAME_STORE_SIZE = 256
+BASE_VARIANT = "base"
 
 
 def get_categories() -> List[Category]:
@@ -111,6 +123,155 @@ def get_categories() -> List[Category]:
     ]
 
 
-def load_prompt(name: str) -> str:
-    path = PROMPTS_DIR / name
-    return path.read_text(encoding="utf-8")
+def _variant_path(name: str, variant: str) -> Path:
+    if variant == BASE_VARIANT:
+        return PROMPTS_DIR / name
+    stem, _, suffix = name.rpartition(".")
+    return PROMPTS_DIR / "variants" / f"{stem}.{variant}.{suffix}"
+
+
+def load_prompt(name: str, variant: str = BASE_VARIANT) -> str:
+    return _variant_path(name, variant).read_text(encoding="utf-8")
+
+
+# prompts/variants.json maps a prompt file to variant weights, for example
+# {"game_generation_prompt.md": {"base": 90, "terse": 10}}; "base" is the file
+# itself and the others live in prompts/variants/<stem>.<variant>.md.
+@lru_cache(maxsize=1)
+def prompt_variants() -> Dict[str, Dict[str, float]]:
+    path = PROMPTS_DIR / "variants.json"
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        config = json.load(handle)
+    for name, weights in config.items():
+        for variant in weights:
+            if not _variant_path(name, variant).exists():
+                raise ValueError(f"Prompt variant file missing: {_variant_path(name, variant)}")
+    return config
+
+
+# Stable per seed, so a share code always maps back to the same prompts.
+def pick_variant(name: str, seed: int) -> str:
+    weights = prompt_variants().get(name)
+    if not weights:
+        return BASE_VARIANT
+    digest = hashlib.blake2b(f"{name}:{seed}".encode("utf-8"), digest_size=8).digest()
+    point = int.from_bytes(digest, "big") / 2**64 * sum(weights.values())
+    for variant, weight in sorted(weights.items()):
+        point -= weight
+        if point < 0:
+            return variant
+    return max(weights, key=weights.__getitem__)
+
+
+@lru_cache(maxsize=1)
+def prompt_version() -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(PROMPTS_DIR.rglob("*")):
+        if path.suffix not in (".md", ".json"):
+            continue
+        digest.update(path.relative_to(PROMPTS_DIR).as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class StoredGame:
+    game: GamePackage
+    body: bytes
+    host_token: str
+    etag: str
+    views: Dict[str, bytes] = field(default_factory=dict)
+    name_index: Optional[NameIndex] = None
+
+
+def _game_key(share_code: str) -> str:
+    return f"game:{share_code}"
+
+
+# Each worker keeps parsed games and rendered views in its own LRU. With a
+# shared cache configured, saves are written through and local misses are
+# read back from it; a local hit is only trusted while its ETag still matches
+# the shared entry, so edits made on another worker are picked up. Saves keep
+# an existing game and its host token unless `replace` is set, since anyone
+# can rebuild a game's settings from its share code.
+class GameStore:
+    def __init__(
+        self, max_size: int = DEFAULT_GAME_STORE_SIZE, shared: Optional[SharedCache] = None
+    ) -> None:
+        self.max_size = max_size
+        self.shared = shared
+        self._games: "OrderedDict[str, StoredGame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(
+        self, game: GamePackage, host_token: Optional[str] = None, replace: bool = False
+    ) -> StoredGame:
+        share_code = game.meta.share_code
+        if not replace:
+            existing = self.get(share_code)
+            if existing is not None:
+                return existing
+        body = game.model_dump_json().encode("utf-8")
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        token = host_token or secrets.token_urlsafe(18)
+        stored = StoredGame(game=game, body=body, host_token=token, etag=etag)
+        if self.shared is not None:
+            meta = json.dumps({"host_token": token, "etag": etag})
+            if replace:
+                self.shared.set(_game_key(share_code), body, meta)
+            else:
+                entry = self.shared.add(_game_key(share_code), body, meta)
+                if entry.meta != meta:
+                    stored = self._from_entry(entry)
+        return self._remember(share_code, stored, replace or self.shared is not None)
+
+    def get(self, share_code: str) -> Optional[StoredGame]:
+        with self._lock:
+            stored = self._games.get(share_code)
+            if stored is not None:
+                self._games.move_to_end(share_code)
+        if self.shared is None:
+            return stored
+        if stored is not None:
+            meta = self.shared.meta(_game_key(share_code))
+            if meta is not None and json.loads(meta)["etag"] == stored.etag:
+                return stored
+        entry = self.shared.get(_game_key(share_code))
+        if entry is None:
+            return stored
+        stored = self._from_entry(entry)
+        self._remember(share_code, stored)
+        return stored
+
+    # The stored body is served as-is; only the model is rebuilt from it.
+    def _from_entry(self, entry: Entry) -> StoredGame:
+        meta = json.loads(entry.meta)
+        return StoredGame(
+            game=GamePackage.model_validate_json(entry.value),
+            body=entry.value,
+            host_token=meta["host_token"],
+            etag=meta["etag"],
+        )
+
+    def _remember(self, share_code: str, stored: StoredGame, replace: bool = True) -> StoredGame:
+        with self._lock:
+            if not replace:
+                stored = self._games.get(share_code, stored)
+            self._games[share_code] = stored
+            self._games.move_to_end(share_code)
+            while len(self._games) > self.max_size:
+                self._games.popitem(last=False)
+        return stored
+
+
+_game_store: Optional[GameStore] = None
+
+
+def get_game_store() -> GameStore:
+    global _game_store
+    if _game_store is None:
+        size = int(os.getenv("GAME_STORE_SIZE", str(DEFAULT_GAME_STORE_SIZE)))
+        _game_store = GameStore(max_size=size, shared=get_shared_cache())
+    return _game_store
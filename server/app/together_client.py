@@ -7,6 +7,7 @@ import httpx
 
 
 TOGETHER_API_URL = "https://api.together.xyz/v1/chat/completions"
+DEFAULT_TIMEOUT = 30.0
 
 
 class TogetherClientError(RuntimeError):
@@ -17,6 +18,9 @@ class TogetherClient:
     def __init__(self) -> None:
         self.api_key = os.getenv("TOGETHER_API_KEY", "")
         self.model = os.getenv("TOGETHER_MODEL", "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo")
+        self.api_url = os.getenv("TOGETHER_API_URL", TOGETHER_API_URL)
+        # Summed over this client's calls, as reported by the API.
+        self.usage = {"prompt_tokens": 0, "completion_tokens": 0}
         if not self.api_key:
             raise TogetherClientError("TOGETHER_API_KEY is not set.")
 
@@ -27,7 +31,11 @@ class TogetherClient:
         temperature: float = 0.2,
         top_p: float = 0.8,
         max_tokens: int = 3500,
+        timeout: Optional[float] = None,
+        requested_tokens: Optional[int] = None,
     ) -> str:
+        # requested_tokens is the cap before a deadline shrank max_tokens; only
+        # cassettes use it, so the provider call ignores it.
         headers = {"Authorization": f"Bearer {self.api_key}"}
         messages = []
         if system_prompt:
@@ -43,8 +51,8 @@ class TogetherClient:
         }
 
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(TOGETHER_API_URL, headers=headers, json=payload)
+            with httpx.Client(timeout=timeout or DEFAULT_TIMEOUT) as client:
+                response = client.post(self.api_url, headers=headers, json=payload)
         except httpx.RequestError as exc:
             raise TogetherClientError(f"Together API request failed: {exc}") from exc
 
@@ -54,6 +62,9 @@ class TogetherClient:
             )
 
         data = response.json()
+        for key, value in (data.get("usage") or {}).items():
+            if key in self.usage and isinstance(value, int):
+                self.usage[key] += value
         try:
             return data["choices"][0]["message"]["content"]
         except (KeyError, IndexError) as exc:
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+
+MIN_TIMELINE_EVENTS = 8
+MIN_CLUES = 12
+MIN_HARD_CLUES = 3
+MIN_RELATIONSHIPS = 2
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    code: str
+    path: str
+    message: str
+    ids: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"code": self.code, "path": self.path, "message": self.message, "ids": list(self.ids)}
+
+    def to_prompt_line(self) -> str:
+        ids = f" ids={','.join(self.ids)}" if self.ids else ""
+        return f"- [{self.code}] {self.path}: {self.message}{ids}"
+
+
+def _list(data: Dict[str, Any], key: str) -> List[Any]:
+    value = data.get(key)
+    return value if isinstance(value, list) else []
+
+
+def _unreachable(graph: Dict[str, Set[str]]) -> List[str]:
+    if not graph:
+        return []
+    start = next(iter(graph))
+    visited = {start}
+    stack = [start]
+    while stack:
+        for target in graph[stack.pop()]:
+            if target not in visited:
+                visited.add(target)
+                stack.append(target)
+    return [node for node in graph if node not in visited]
+
+
+def validate_package(data: Dict[str, Any], expected: Dict[str, Any]) -> List[ValidationIssue]:
+    issues: List[ValidationIssue] = []
+    character_ids: List[str] = list(expected["character_ids"])
+    character_set = set(character_ids)
+    expected_clues: Set[str] = set(expected["clue_ids"])
+
+    packets = _list(data, "character_packets")
+    if len(packets) != expected["player_count"]:
+        issues.append(
+            ValidationIssue(
+                "packets.count_mismatch",
+                "character_packets",
+                "player_count does not match character_packets length.",
+            )
+        )
+
+    solution = data.get("solution")
+    murderer_id = solution.get("murderer_id") if isinstance(solution, dict) else None
+    if murderer_id not in character_set:
+        issues.append(
+            ValidationIssue(
+                "solution.unknown_murderer",
+                "solution.murderer_id",
+                "murderer_id is not one of the characters.",
+                (str(murderer_id),),
+            )
+        )
+
+    if len(_list(data, "timeline")) < MIN_TIMELINE_EVENTS:
+        issues.append(
+            ValidationIssue("timeline.too_short", "timeline", "timeline has fewer than 8 events.")
+        )
+
+    clues = _list(data, "clues")
+    clue_id_set: Set[str] = set()
+    hard_count = 0
+    for clue in clues:
+        clue_id_set.add(clue.get("clue_id"))
+        if clue.get("type") == "hard":
+            hard_count += 1
+    if len(clues) < MIN_CLUES:
+        issues.append(ValidationIssue("clues.too_few", "clues", "clues has fewer than 12 items."))
+    missing = expected_clues - clue_id_set
+    if missing:
+        issues.append(
+            ValidationIssue(
+                "clues.missing_ids", "clues", "clue ids missing from clues list.", tuple(sorted(missing))
+            )
+        )
+    if hard_count < MIN_HARD_CLUES:
+        issues.append(
+            ValidationIssue("clues.too_few_hard", "clues", "hard evidence clues fewer than 3.")
+        )
+
+    graph: Dict[str, Set[str]] = {cid: set() for cid in character_ids}
+    for idx, packet in enumerate(packets):
+        cid = packet.get("character_id")
+        path = f"character_packets[{idx}]"
+        rels = packet.get("relationships") or []
+        if len(rels) < MIN_RELATIONSHIPS:
+            issues.append(
+                ValidationIssue(
+                    "character.too_few_relationships",
+                    f"{path}.relationships",
+                    f"character {cid} has too few relationships.",
+                    (str(cid),),
+                )
+            )
+        if not packet.get("connection_to_victim"):
+            issues.append(
+                ValidationIssue(
+                    "character.missing_connection",
+                    f"{path}.connection_to_victim",
+                    f"character {cid} missing connection_to_victim.",
+                    (str(cid),),
+                )
+            )
+        edges = graph.get(cid)
+        if edges is not None:
+            for rel in rels:
+                target = rel.get("character_id")
+                if target in character_set:
+                    edges.add(target)
+
+        owned = packet.get("clue_ids")
+        if not owned:
+            issues.append(
+                ValidationIssue(
+                    "character.missing_clue_ids",
+                    f"{path}.clue_ids",
+                    f"character {cid} missing clue_ids.",
+                    (str(cid),),
+                )
+            )
+            continue
+        unknown = [clue_id for clue_id in owned if clue_id not in expected_clues]
+        if unknown:
+            issues.append(
+                ValidationIssue(
+                    "character.unknown_clue",
+                    f"{path}.clue_ids",
+                    "character packet references unknown clue_id.",
+                    (str(cid), *unknown),
+                )
+            )
+
+    unreachable = _unreachable(graph)
+    if not graph or unreachable:
+        issues.append(
+            ValidationIssue(
+                "relationships.disconnected",
+                "character_packets[*].relationships",
+                "relationship graph is not connected.",
+                tuple(unreachable),
+            )
+        )
+    return issues
+
+
+def _shape_issues(data: Dict[str, Any]) -> List[ValidationIssue]:
+    issues: List[ValidationIssue] = []
+    for key in ("character_packets", "solution", "timeline", "clues"):
+        if key not in data:
+            issues.append(ValidationIssue(f"{key}.missing", key, f"{key} missing."))
+        elif key != "solution" and (not isinstance(data[key], list) or not data[key]):
+            issues.append(ValidationIssue(f"{key}.empty", key, f"{key} empty or invalid."))
+    return issues
+
+
+def expected_from_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    packets = _list(data, "character_packets")
+    return {
+        "player_count": len(packets),
+        "character_ids": [p.get("character_id") for p in packets if isinstance(p, dict)],
+        "clue_ids": [c.get("clue_id") for c in _list(data, "clues") if isinstance(c, dict)],
+    }
+
+
+def validate_payload(data: Any) -> List[ValidationIssue]:
+    if not isinstance(data, dict):
+        return [ValidationIssue("package.invalid", "$", "payload is not a JSON object.")]
+    issues = _shape_issues(data)
+    try:
+        return issues + validate_package(data, expected_from_payload(data))
+    except (AttributeError, TypeError):
+        issues.append(ValidationIssue("package.invalid", "$", "payload has malformed entries."))
+        return issues
+
+
+def issue_messages(issues: Iterable[ValidationIssue]) -> List[str]:
+    return [issue.message for issue in issues]
+
+
+def format_issues_for_prompt(issues: Iterable[ValidationIssue]) -> str:
+    return "\n".join(issue.to_prompt_line() for issue in issues)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+from .models import GamePackage
+from .storage import StoredGame
+
+
+HOST_VIEW_KEYS = {
+    "title",
+    "theme_summary",
+    "storyline_overview",
+    "victim",
+    "timeline",
+    "how_to_play",
+    "props_list",
+    "meta",
+}
+
+
+def _dump(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def host_view(game: GamePackage) -> Dict[str, Any]:
+    view = game.model_dump(include=HOST_VIEW_KEYS)
+    view["characters"] = [
+        {
+            "character_id": packet.character_id,
+            "name": packet.name,
+            "role_title": packet.role_title,
+        }
+        for packet in game.character_packets
+    ]
+    return view
+
+
+def character_view(game: GamePackage, character_id: str) -> Optional[Dict[str, Any]]:
+    packet = next((p for p in game.character_packets if p.character_id == character_id), None)
+    if packet is None:
+        return None
+    wanted = set(packet.clue_ids)
+    return {
+        "share_code": game.meta.share_code,
+        "character": packet.model_dump(),
+        "clues": [clue.model_dump() for clue in game.clues if clue.clue_id in wanted],
+    }
+
+
+def solution_view(game: GamePackage) -> Dict[str, Any]:
+    murderer = next(
+        (p for p in game.character_packets if p.character_id == game.solution.murderer_id),
+        None,
+    )
+    return {
+        "share_code": game.meta.share_code,
+        "solution": game.solution.model_dump(),
+        "murderer_name": murderer.name if murderer else None,
+    }
+
+
+def render_host_view(stored: StoredGame) -> bytes:
+    body = stored.views.get("host")
+    if body is None:
+        body = stored.views["host"] = _dump(host_view(stored.game))
+    return body
+
+
+def render_character_view(stored: StoredGame, character_id: str) -> Optional[bytes]:
+    key = f"character:{character_id}"
+    body = stored.views.get(key)
+    if body is None:
+        view = character_view(stored.game, character_id)
+        if view is None:
+            return None
+        body = stored.views[key] = _dump(view)
+    return body
+
+
+def render_solution_view(stored: StoredGame) -> bytes:
+    body = stored.views.get("solution")
+    if body is None:
+        body = stored.views["solution"] = _dump(solution_view(stored.game))
+    return body
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from app import generator
+from app.balance import (
+    HARD_CONCENTRATION,
+    MIN_TRUE_HARD,
+    MISLEADING_OVERLAP,
+    MURDERER_HARD_SHARE,
+    degenerate_flags,
+    structure_metrics,
+)
+from app.models import GenerateRequest
+from app.seed import MAX_PLAYERS, MIN_PLAYERS, seeded_random
+from app.storage import get_categories
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional
+    np = None
+
+
+FLAGS = (
+    "murderer_holds_evidence",
+    "hard_concentrated",
+    "weak_evidence",
+    "misleading_overlap",
+    "disconnected",
+)
+
+
+def exact_metrics(seed: int, player_count: int) -> Dict[str, float]:
+    request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    return structure_metrics(generator._build_structure(request, category, seed, rng))
+
+
+def _sample_mask(rng, rows: int, size: int, count: int):
+    keys = rng.random((rows, size))
+    cutoff = np.partition(keys, count - 1, axis=1)[:, count - 1 : count]
+    return keys <= cutoff
+
+
+# Mirrors _build_structure with NumPy draws: the same distributions, not the
+# same per-seed outcomes (random.Random cannot be vectorized). The exact
+# per-seed scan below is what maps problems back to seeds.
+def vectorized_metrics(rng, rows: int, player_count: int) -> Dict[str, "np.ndarray"]:
+    p = player_count
+    clue_count = max(12, p * 2)
+    hard_count = max(3, int(clue_count * 0.25))
+    hard = _sample_mask(rng, rows, clue_count, hard_count)
+    misleading = _sample_mask(rng, rows, clue_count, max(1, int(clue_count * 0.3)))
+    order = np.argsort(rng.random((rows, clue_count)), axis=1)
+    owner = np.empty((rows, clue_count), dtype=np.int64)
+    slots = np.broadcast_to(np.arange(clue_count) % p, (rows, clue_count))
+    np.put_along_axis(owner, order, slots, axis=1)
+    third = rng.random((rows, p)) > 0.5 if p > 4 else np.zeros((rows, p), dtype=bool)
+    murderer = rng.integers(0, p, rows)
+    _secure_evidence(hard, misleading, owner, order, murderer)
+
+    flat = (owner + p * np.arange(rows)[:, None])[hard]
+    hard_held = np.bincount(flat, minlength=rows * p).reshape(rows, p)
+
+    degrees, diameter = _graph_metrics(third, p)
+
+    return {
+        "murderer_hard_share": hard_held[np.arange(rows), murderer] / hard_count,
+        "hard_max_share": hard_held.max(axis=1) / hard_count,
+        "true_hard": (hard & ~misleading).sum(axis=1),
+        "misleading_overlap": (hard & misleading).sum(axis=1) / hard_count,
+        "degree_min": degrees.min(axis=1),
+        "degree_max": degrees.max(axis=1),
+        "murderer_degree": degrees[np.arange(rows), murderer],
+        "diameter": diameter,
+    }
+
+
+def _rotate(mask, shift: int, p: int):
+    return ((mask << shift) | (mask >> (p - shift))) & ((1 << p) - 1)
+
+
+# Relationship graphs as p-bit neighbour masks: the ring edges (+-1, +-2) and the
+# optional +-3 chords are rotations, so degrees are popcounts and the diameter
+# comes from a breadth-first search run from every node at once, a few integer
+# ops per step instead of p x p matrix products.
+def _graph_metrics(third, p: int):
+    rows = third.shape[0]
+    full = (1 << p) - 1
+    bits = np.left_shift(1, np.arange(p, dtype=np.int32))
+    chord_from = np.where(third, _rotate(bits, 3, p), 0)
+    chord_to = np.where(np.roll(third, 3, axis=1), _rotate(bits, p - 3, p), 0)
+    ring = _rotate(bits, 1, p) | _rotate(bits, p - 1, p) | _rotate(bits, 2, p) | _rotate(
+        bits, p - 2, p
+    )
+    degrees = np.bitwise_count((ring | chord_from | chord_to) & ~bits).astype(np.int64)
+
+    chords = (third * bits).sum(axis=1, dtype=np.int32)[:, None]
+    chord_ends = _rotate(chords, 3, p)
+    reach = np.broadcast_to(bits, (rows, p)).copy()
+    diameter = np.zeros(rows, dtype=np.int64)
+    complete = (reach == full).all(axis=1)
+    for _ in range(p):
+        if complete.all():
+            break
+        diameter += ~complete
+        reach = (
+            reach
+            | _rotate(reach, 1, p)
+            | _rotate(reach, p - 1, p)
+            | _rotate(reach, 2, p)
+            | _rotate(reach, p - 2, p)
+            | _rotate(reach & chords, 3, p)
+            | _rotate(reach & chord_ends, p - 3, p)
+        )
+        complete = (reach == full).all(axis=1)
+    diameter[~complete] = -1
+    return degrees, diameter
+
+
+# Mirrors generator._secure_evidence. Every clue has exactly one owner and a
+# character's first clue is the one at its own position in the shuffle.
+def _secure_evidence(hard, misleading, owner, order, murderer) -> None:
+    no_evidence = ~(hard & ~misleading).any(axis=1)
+    misleading[no_evidence, hard[no_evidence].argmax(axis=1)] = False
+    evidence = hard & ~misleading
+    hidden = np.nonzero(~(evidence & (owner != murderer[:, None])).any(axis=1))[0]
+    clue = evidence[hidden].argmax(axis=1)
+    holder = np.where(murderer[hidden] == 0, 1, 0)
+    displaced = order[hidden, holder]
+    owner[hidden, clue] = holder
+    owner[hidden, displaced] = murderer[hidden]
+
+
+def vectorized_flags(metrics: Dict[str, "np.ndarray"]) -> Dict[str, "np.ndarray"]:
+    return {
+        "murderer_holds_evidence": metrics["murderer_hard_share"] >= MURDERER_HARD_SHARE,
+        "hard_concentrated": metrics["hard_max_share"] > HARD_CONCENTRATION,
+        "weak_evidence": metrics["true_hard"] < MIN_TRUE_HARD,
+        "misleading_overlap": metrics["misleading_overlap"] >= MISLEADING_OVERLAP,
+        "disconnected": metrics["diameter"] < 0,
+    }
+
+
+def _percentiles(values) -> str:
+    if np is not None:
+        pick = np.percentile(values, [50, 90, 99]).tolist()
+        top = float(np.max(values))
+    else:
+        ordered = sorted(values)
+        pick = [ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in (0.5, 0.9, 0.99)]
+        top = ordered[-1]
+    return " ".join(f"{v:.2f}" for v in pick) + f" max={top:.2f}"
+
+
+def _histogram(values) -> str:
+    if np is not None:
+        keys, counts = np.unique(np.asarray(values), return_counts=True)
+        pairs = zip(keys.tolist(), counts.tolist())
+    else:
+        tally: Dict[int, int] = {}
+        for value in values:
+            tally[int(value)] = tally.get(int(value), 0) + 1
+        pairs = sorted(tally.items())
+    return " ".join(f"{int(k)}:{v / len(values):.1%}" for k, v in pairs)
+
+
+def _ranges(seeds: List[int]) -> Iterator[Tuple[int, int]]:
+    start = prev = None
+    for seed in seeds:
+        if prev is not None and seed == prev + 1:
+            prev = seed
+            continue
+        if start is not None:
+            yield start, prev
+        start = prev = seed
+    if start is not None:
+        yield start, prev
+
+
+def report_distribution(player_count: int, samples: int, chunk: int, seed: int) -> None:
+    started = time.perf_counter()
+    columns: Dict[str, List] = {}
+    flag_counts = {flag: 0 for flag in FLAGS}
+    any_flag = 0
+    if np is not None:
+        rng = np.random.default_rng(seed + player_count)
+        for offset in range(0, samples, chunk):
+            metrics = vectorized_metrics(rng, min(chunk, samples - offset), player_count)
+            flags = vectorized_flags(metrics)
+            for flag, hits in flags.items():
+                flag_counts[flag] += int(hits.sum())
+            any_flag += int(np.logical_or.reduce(list(flags.values())).sum())
+            for name, values in metrics.items():
+                columns.setdefault(name, []).append(values)
+        data = {name: np.concatenate(parts) for name, parts in columns.items()}
+        source = "numpy draws"
+    else:
+        rows = [exact_metrics(s, player_count) for s in range(seed, seed + samples)]
+        for metrics in rows:
+            flags = degenerate_flags(metrics)
+            any_flag += bool(flags)
+            for flag in flags:
+                flag_counts[flag] += 1
+        data = {name: [m[name] for m in rows] for name in rows[0]}
+        source = "exact seeds (numpy not installed)"
+    elapsed = time.perf_counter() - started
+
+    print(f"players={player_count} samples={samples} source={source} elapsed={elapsed:.2f}s")
+    for name in ("murderer_hard_share", "hard_max_share", "misleading_overlap"):
+        print(f"  {name:<20} p50/p90/p99 {_percentiles(data[name])}")
+    for name in ("true_hard", "degree_min", "degree_max", "murderer_degree", "diameter"):
+        print(f"  {name:<20} {_histogram(data[name])}")
+    rates = " ".join(f"{flag}={count / samples:.2%}" for flag, count in flag_counts.items())
+    print(f"  degenerate={any_flag / samples:.2%} {rates}")
+
+
+def report_seed_scan(player_count: int, start: int, stop: int, limit: int) -> None:
+    flagged: Dict[str, List[int]] = {flag: [] for flag in FLAGS}
+    for seed in range(start, stop):
+        for flag in degenerate_flags(exact_metrics(seed, player_count)):
+            flagged[flag].append(seed)
+    for flag, seeds in flagged.items():
+        if not seeds:
+            continue
+        spans = [f"{a}" if a == b else f"{a}-{b}" for a, b in _ranges(seeds)]
+        more = f" (+{len(spans) - limit} more)" if len(spans) > limit else ""
+        print(f"  seeds {start}-{stop - 1} {flag}: {len(seeds)} -> {', '.join(spans[:limit])}{more}")
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo balance of the seeded game structure, plus a per-seed scan."
+    )
+    parser.add_argument("--players", type=int, nargs="+", default=[4, 6, 10, 15, 20])
+    parser.add_argument("--samples", type=int,
+                        help="Structures per player count (default 1000000 with numpy, 5000 without).")
+    parser.add_argument("--chunk", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scan", default="1:2001",
+                        help="Seed range start:stop to check exactly and list flagged seeds.")
+    parser.add_argument("--show", type=int, default=12, help="Flagged seed ranges to print.")
+    args = parser.parse_args(argv)
+
+    samples = args.samples or (1_000_000 if np is not None else 5000)
+    start, stop = (int(part) for part in args.scan.split(":"))
+    for player_count in args.players:
+        if not MIN_PLAYERS <= player_count <= MAX_PLAYERS:
+            raise SystemExit(f"--players must be between {MIN_PLAYERS} and {MAX_PLAYERS}.")
+        report_distribution(player_count, samples, args.chunk, args.seed)
+        if stop > start:
+            report_seed_scan(player_count, start, stop, args.show)
+
+
+if __name__ == "__main__":
+    main()
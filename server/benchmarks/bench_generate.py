@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app import generator
+from app.models import GamePackage, GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+LEGACY_RESPONSE_FIELD = create_model_field(name="Response_generate", type_=Dict[str, Any])
+LOOP = asyncio.new_event_loop()
+
+
+def _filled_structure(player_count: int, seed: int) -> Dict[str, Any]:
+    request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    structure = generator._build_structure(request, category, seed, rng)
+    structure["meta"]["share_code"] = f"bench-{seed}"
+    return generator._fill_mock(structure, category)
+
+
+# What the route did before: validate and discard, return the dict, and let
+# FastAPI validate it against Dict[str, Any], jsonable_encode it and json.dumps it.
+def legacy_finish(data: Dict[str, Any]) -> bytes:
+    GamePackage.model_validate(data)
+    content = LOOP.run_until_complete(
+        serialize_response(field=LEGACY_RESPONSE_FIELD, response_content=data, is_coroutine=True)
+    )
+    return JSONResponse(content).body
+
+
+def typed_finish(data: Dict[str, Any]) -> bytes:
+    return generator._to_package(data).model_dump_json().encode("utf-8")
+
+
+def measure(finish: Callable[[Dict[str, Any]], bytes], cases: List[str]) -> Dict[str, float]:
+    inputs = [json.loads(case) for case in cases]
+    gc.collect()
+    start = time.process_time()
+    for data in inputs:
+        finish(data)
+    cpu = (time.process_time() - start) / len(inputs)
+
+    inputs = [json.loads(case) for case in cases[:20]]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for data in inputs:
+        finish(data)
+    after = tracemalloc.take_snapshot()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return {"cpu_us": cpu * 1e6, "peak_kb": peak / 1024, "blocks": blocks / len(inputs)}
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Per-request CPU/allocation cost of /api/generate output.")
+    parser.add_argument("--players", type=int, nargs="+", default=[6, 20])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'players':>8} {'path':>7} {'cpu_us':>9} {'peak_kb':>9} {'blocks':>8}")
+    for player_count in args.players:
+        cases = [json.dumps(_filled_structure(player_count, seed)) for seed in range(args.requests)]
+        for name, finish in (("legacy", legacy_finish), ("typed", typed_finish)):
+            result = measure(finish, cases)
+            print(
+                f"{player_count:>8} {name:>7} {result['cpu_us']:>9.1f} "
+                f"{result['peak_kb']:>9.1f} {result['blocks']:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
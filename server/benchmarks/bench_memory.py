@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from app import generator
+from app.compact import to_keyed
+from app.memprofile import get_memory_profiler
+from app.models import GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "memory_baseline.json"
+
+
+class CannedClient:
+    response = ""
+
+    def generate_text(self, **_kwargs) -> str:
+        return CannedClient.response
+
+
+# What a well-behaved model would answer for this seed: the procedural game in
+# the keyed compact format, pretty-printed inside a code fence.
+def canned_response(player_count: int, seed: int) -> str:
+    request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    structure = generator._build_structure(request, category, seed, rng)
+    filled = generator._fill_mock(structure, category)
+    return "```json\n" + json.dumps(to_keyed(filled), indent=2) + "\n```"
+
+
+def measure(player_count: int, requests: int) -> Dict[str, int]:
+    profiler = get_memory_profiler(force=True)
+    peaks: List[int] = []
+    stages: Dict[str, int] = {}
+    for seed in range(1, requests + 1):
+        CannedClient.response = canned_response(player_count, seed)
+        generator.generate_game(
+            GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+        )
+        record = profiler.recent[-1]
+        peaks.append(record["peak_bytes"])
+        for stage in record["stages"]:
+            stages[stage["stage"]] = max(stages.get(stage["stage"], 0), stage["peak_bytes"])
+    return {"peak_max": max(peaks), "peak_mean": sum(peaks) // len(peaks), **stages}
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Peak traced memory per generate_game stage on the LLM path (canned answers)."
+    )
+    parser.add_argument("--players", type=int, nargs="+", default=[4, 10, 20])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed growth of peak_max over the baseline (0.15 = 15%%).")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+    os.environ.update(USE_MOCK_LLM="0", CATEGORY_CACHE="0", LLM_CASSETTE="off")
+    generator.TogetherClient = CannedClient
+
+    results = {str(p): measure(p, args.requests) for p in args.players}
+    stage_names: List[str] = []
+    for row in results.values():
+        stage_names += [n for n in row if n not in stage_names and not n.startswith("peak_")]
+    print(f"{'players':>8} {'peak_max':>10} {'peak_mean':>10} " + " ".join(
+        f"{name:>10}" for name in stage_names
+    ) + "   (KiB)")
+    for players, row in results.items():
+        cells = [row["peak_max"], row["peak_mean"], *(row.get(n, 0) for n in stage_names)]
+        print(f"{players:>8} " + " ".join(f"{value / 1024:>10.0f}" for value in cells))
+
+    if args.update_baseline:
+        baseline = {players: {"peak_max": row["peak_max"]} for players, row in results.items()}
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"wrote {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --update-baseline")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    failures = []
+    for players, row in results.items():
+        if players not in baseline:
+            continue
+        limit = baseline[players]["peak_max"] * (1 + args.tolerance)
+        if row["peak_max"] > limit:
+            failures.append(
+                f"players={players} peak {row['peak_max'] / 1024:.0f} KiB > "
+                f"{limit / 1024:.0f} KiB ({baseline[players]['peak_max'] / 1024:.0f} KiB baseline "
+                f"+{args.tolerance:.0%})"
+            )
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+    print("memory per request within baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import gc
+import json
+import re
+import time
+from typing import Any, Callable, Dict, List
+
+from app import generator
+from app.models import GenerateRequest
+from app.schema import StructureMerger, normalize_package
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+# Pre-schema implementation, kept verbatim as the comparison baseline.
+def legacy_split_text_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    if isinstance(value, str):
+        parts = re.split(r"(?:\r?\n|;|•)", value)
+        cleaned = [part.strip(" \t-•") for part in parts if part.strip(" \t-•")]
+        return cleaned or [value.strip()]
+    return [str(value).strip()]
+
+
+def legacy_normalize_props_list(props: Any) -> List[str]:
+    if props is None:
+        return []
+    if isinstance(props, dict):
+        props = [props]
+    if not isinstance(props, list):
+        return [str(props)]
+    normalized: List[str] = []
+    for item in props:
+        if isinstance(item, dict):
+            name = str(item.get("name", "")).strip()
+            description = str(item.get("description", "")).strip()
+            if name and description:
+                normalized.append(f"{name}: {description}")
+            elif name:
+                normalized.append(name)
+            elif description:
+                normalized.append(description)
+            else:
+                normalized.append(", ".join(f"{k}: {v}" for k, v in item.items()))
+        else:
+            normalized.append(str(item))
+    return [entry for entry in normalized if entry.strip()]
+
+
+def legacy_normalize_game_package(data: Dict[str, Any]) -> Dict[str, Any]:
+    packets = data.get("character_packets", [])
+    for packet in packets:
+        intro = packet.get("intro_monologue")
+        if isinstance(intro, str):
+            lines = intro.splitlines() if "\n" in intro else [intro]
+            packet["intro_monologue"] = [line.strip() for line in lines if line.strip()]
+        else:
+            packet["intro_monologue"] = legacy_split_text_list(intro)
+
+        for field in ("traits", "secrets"):
+            value = packet.get(field)
+            if isinstance(value, str):
+                packet[field] = legacy_split_text_list(value)
+            else:
+                packet[field] = legacy_split_text_list(value)
+
+    data["props_list"] = legacy_normalize_props_list(data.get("props_list"))
+    return data
+
+
+def legacy_merge_relationships(
+    base: List[Dict[str, Any]], update: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    update_map = {rel.get("character_id"): rel for rel in update}
+    merged = []
+    for rel in base:
+        updated = update_map.get(rel.get("character_id"), {})
+        merged.append(
+            {
+                "character_id": rel.get("character_id"),
+                "relationship": updated.get("relationship", rel.get("relationship", "")),
+            }
+        )
+    return merged
+
+
+def legacy_merge_structure(structure: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    merged = structure
+
+    for key, value in candidate.items():
+        if key not in merged:
+            continue
+
+        if key == "character_packets" and isinstance(value, list):
+            base_packets = {p["character_id"]: p for p in merged["character_packets"]}
+            for packet in value:
+                cid = packet.get("character_id")
+                if cid not in base_packets:
+                    continue
+                base = base_packets[cid]
+                base["role_title"] = packet.get("role_title", base["role_title"])
+                base["backstory"] = packet.get("backstory", base["backstory"])
+                base["relationships"] = legacy_merge_relationships(
+                    base.get("relationships", []), packet.get("relationships", [])
+                )
+                base["connection_to_victim"] = packet.get(
+                    "connection_to_victim", base.get("connection_to_victim", "")
+                )
+                base["traits"] = packet.get("traits", base.get("traits", []))
+                base["public_goal"] = packet.get("public_goal", base.get("public_goal", ""))
+                base["secret_goal"] = packet.get("secret_goal", base.get("secret_goal", ""))
+                base["secrets"] = packet.get("secrets", base.get("secrets", []))
+                base["alibi"] = packet.get("alibi", base.get("alibi", ""))
+                base["intro_monologue"] = packet.get(
+                    "intro_monologue", base.get("intro_monologue", [])
+                )
+                base["prop_suggestion"] = packet.get(
+                    "prop_suggestion", base.get("prop_suggestion", "")
+                )
+            merged["character_packets"] = list(base_packets.values())
+            continue
+
+        if key == "clues" and isinstance(value, list):
+            base_clues = {c["clue_id"]: c for c in merged["clues"]}
+            for clue in value:
+                cid = clue.get("clue_id")
+                if cid not in base_clues:
+                    continue
+                base = base_clues[cid]
+                base["title"] = clue.get("title", base["title"])
+                base["description"] = clue.get("description", base["description"])
+            merged["clues"] = list(base_clues.values())
+            continue
+
+        if key == "timeline" and isinstance(value, list):
+            base_events = {e["event_id"]: e for e in merged["timeline"]}
+            for event in value:
+                eid = event.get("event_id")
+                if eid not in base_events:
+                    continue
+                base = base_events[eid]
+                base["time"] = event.get("time", base["time"])
+                base["description"] = event.get("description", base["description"])
+            merged["timeline"] = list(base_events.values())
+            continue
+
+        if key == "how_to_play" and isinstance(value, list):
+            base_rounds = {r["round_id"]: r for r in merged["how_to_play"]}
+            for rnd in value:
+                rid = rnd.get("round_id")
+                if rid not in base_rounds:
+                    continue
+                base = base_rounds[rid]
+                base["title"] = rnd.get("title", base["title"])
+                base["description"] = rnd.get("description", base["description"])
+                base["minutes"] = rnd.get("minutes", base["minutes"])
+            merged["how_to_play"] = list(base_rounds.values())
+            continue
+
+        if isinstance(merged[key], dict) and isinstance(value, dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+
+    return merged
+
+
+def build_case(player_count: int, seed: int = 2024) -> Dict[str, Any]:
+    request = GenerateRequest.model_construct(
+        player_count=player_count,
+        player_names=[f"Player {i + 1}" for i in range(player_count)],
+        category_id="random",
+        tone="suspense",
+        duration=60,
+        seed=seed,
+    )
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    structure = generator._build_structure(request, category, seed, rng)
+    candidate = generator._fill_mock(copy.deepcopy(structure), category)
+    for packet in candidate["character_packets"]:
+        packet["intro_monologue"] = "\n".join(packet["intro_monologue"])
+        packet["traits"] = "; ".join(packet["traits"])
+    # A validation repair answers with the few sections it was asked to fix.
+    repair = {
+        "character_packets": copy.deepcopy(candidate["character_packets"][:2]),
+        "clues": copy.deepcopy(candidate["clues"][:3]),
+    }
+    return {"structure": json.dumps(structure), "candidate": candidate, "repair": repair}
+
+
+def legacy_pipeline(structure: Dict[str, Any], case: Dict[str, Any]) -> Dict[str, Any]:
+    return legacy_normalize_game_package(legacy_merge_structure(structure, case["candidate"]))
+
+
+def schema_pipeline(structure: Dict[str, Any], case: Dict[str, Any]) -> Dict[str, Any]:
+    return StructureMerger(structure).merge(case["candidate"])
+
+
+def legacy_repair_pipeline(structure: Dict[str, Any], case: Dict[str, Any]) -> Dict[str, Any]:
+    legacy_pipeline(structure, case)
+    return legacy_normalize_game_package(legacy_merge_structure(structure, case["repair"]))
+
+
+def schema_repair_pipeline(structure: Dict[str, Any], case: Dict[str, Any]) -> Dict[str, Any]:
+    merger = StructureMerger(structure)
+    merger.merge(case["candidate"])
+    return merger.merge(case["repair"])
+
+
+def time_pipelines(
+    pipelines: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]],
+    case: Dict[str, Any],
+    iterations: int,
+    repeats: int = 15,
+) -> Dict[str, float]:
+    # Repeats are interleaved so machine noise hits every pipeline alike; best run wins.
+    best = {name: float("inf") for name in pipelines}
+    for _ in range(repeats):
+        for name, pipeline in pipelines.items():
+            structures = [json.loads(case["structure"]) for _ in range(iterations)]
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for structure in structures:
+                    pipeline(structure, case)
+                elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            best[name] = min(best[name], elapsed / iterations)
+    return best
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark merge + normalize pipelines.")
+    parser.add_argument("--players", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'players':>8} {'pass':>7} {'legacy_us':>10} {'schema_us':>10} {'speedup':>8}")
+    for player_count in args.players:
+        case = build_case(player_count)
+        legacy_result = legacy_repair_pipeline(json.loads(case["structure"]), case)
+        schema_result = normalize_package(
+            schema_repair_pipeline(json.loads(case["structure"]), case)
+        )
+        assert legacy_result["character_packets"] == schema_result["character_packets"]
+        timings = time_pipelines(
+            {
+                "legacy": legacy_pipeline,
+                "schema": schema_pipeline,
+                "legacy_repair": legacy_repair_pipeline,
+                "schema_repair": schema_repair_pipeline,
+            },
+            case,
+            args.iterations,
+        )
+        # "repair" is the first merge plus one repair merge, as in a repaired request.
+        for label, suffix in (("single", ""), ("repair", "_repair")):
+            legacy, schema = timings["legacy" + suffix], timings["schema" + suffix]
+            print(
+                f"{player_count:>8} {label:>7} {legacy * 1e6:>10.1f} {schema * 1e6:>10.1f} "
+                f"{legacy / schema:>7.2f}x"
+            )
+
+if __name__ == "__main__":
+    main()
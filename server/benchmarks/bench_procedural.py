@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import List
+
+from app import generator
+from app.models import GenerateRequest
+from app.procedural import fill_procedural
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Single-core throughput of the procedural engine.")
+    parser.add_argument("--players", type=int, nargs="+", default=[6, 20])
+    parser.add_argument("--games", type=int, default=2000)
+    args = parser.parse_args(argv)
+    os.environ["USE_MOCK_LLM"] = "1"
+
+    categories = get_categories()
+    print(f"{'players':>8} {'fill/s':>9} {'full/s':>9}")
+    for player_count in args.players:
+        cases = []
+        for seed in range(args.games):
+            request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+            rng = seeded_random(seed)
+            category = generator._select_category(categories, "random", rng)
+            cases.append((generator._build_structure(request, category, seed, rng), category))
+
+        start = time.perf_counter()
+        for structure, category in cases:
+            fill_procedural(structure, category)
+        fill_rate = len(cases) / (time.perf_counter() - start)
+
+        # Structure, content, validation and the typed package, as /api/generate runs it.
+        start = time.perf_counter()
+        for seed in range(args.games):
+            generator.generate_game(
+                GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+            )
+        full_rate = args.games / (time.perf_counter() - start)
+        print(f"{player_count:>8} {fill_rate:>9.0f} {full_rate:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Callable, Dict, List
+
+from app import generator
+from app.compact import compact_schema, to_keyed
+from app.models import GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories, load_prompt
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional
+    tiktoken = None
+
+
+def _counter() -> Callable[[str], int]:
+    if tiktoken is not None:
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    # Roughly four characters per token for English prose and JSON.
+    return lambda text: (len(text) + 3) // 4
+
+
+def _prompts(player_count: int, seed: int) -> Dict[str, Any]:
+    request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    structure = generator._build_structure(request, category, seed, rng)
+    filled = generator._fill_mock(json.loads(json.dumps(structure)), category)
+    template = load_prompt("game_generation_prompt.md")
+    repair = load_prompt("validation_prompt.md")
+    fields = dict(
+        category_name=category.name,
+        category_description=category.description,
+        tone_tags=", ".join(category.tone_tags),
+        suggested_props=", ".join(category.suggested_props),
+        suggested_archetypes=", ".join(category.suggested_archetypes),
+        shared_context="",
+        seed=seed,
+    )
+    legacy_structure = json.dumps(structure, separators=(",", ":"))
+    compact = compact_schema(structure)
+    return {
+        "legacy_prompt": template.format(structure=legacy_structure, **fields),
+        "compact_prompt": template.format(structure=compact, **fields),
+        "legacy_repair": repair.format(
+            issues="- [x] y: z", structure=legacy_structure, candidate=json.dumps(filled, indent=2)
+        ),
+        "compact_repair": repair.format(
+            issues="- [x] y: z",
+            structure=compact,
+            candidate=json.dumps(to_keyed(filled), separators=(",", ":")),
+        ),
+        "legacy_output": json.dumps(filled),
+        "compact_output": json.dumps(to_keyed(filled)),
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Prompt/completion tokens, legacy template vs compact schema.")
+    parser.add_argument("--players", type=int, nargs="+", default=[4, 6, 10, 15, 20])
+    parser.add_argument("--prefill-tps", type=float, default=2000.0,
+                        help="Assumed provider prompt-processing rate (tokens/s).")
+    parser.add_argument("--decode-tps", type=float, default=120.0,
+                        help="Assumed provider generation rate (tokens/s).")
+    args = parser.parse_args(argv)
+
+    count = _counter()
+    source = "tiktoken cl100k_base" if tiktoken is not None else "chars/4 estimate"
+    print(f"token counts: {source}; latency assumes {args.prefill_tps:.0f} tok/s prefill, "
+          f"{args.decode_tps:.0f} tok/s decode")
+    print(f"{'players':>7} {'prompt':>13} {'repair':>13} {'output':>13} {'est_latency_s':>15}")
+    for player_count in args.players:
+        tokens = {name: count(text) for name, text in _prompts(player_count, 1000 + player_count).items()}
+
+        def latency(kind: str) -> float:
+            return tokens[f"{kind}_prompt"] / args.prefill_tps + tokens[f"{kind}_output"] / args.decode_tps
+
+        print(
+            f"{player_count:>7} "
+            f"{tokens['legacy_prompt']:>6}>{tokens['compact_prompt']:<6} "
+            f"{tokens['legacy_repair']:>6}>{tokens['compact_repair']:<6} "
+            f"{tokens['legacy_output']:>6}>{tokens['compact_output']:<6} "
+            f"{latency('legacy'):>7.1f}>{latency('compact'):<7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import List
+
+from app.cassette import get_cassette_store
+from app.generator import generate_game
+from app.models import GenerateRequest
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded generate traffic through parse/merge/repair/validate."
+    )
+    parser.add_argument("--cassette", help="Cassette path (default LLM_CASSETTE_PATH).")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Emulate recorded LLM latency (1.0 = as recorded, 0 = full speed).")
+    parser.add_argument("--passes", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.cassette:
+        os.environ["LLM_CASSETTE_PATH"] = args.cassette
+    os.environ["LLM_CASSETTE"] = "replay"
+    os.environ["LLM_CASSETTE_LATENCY"] = str(args.latency_scale)
+    os.environ["USE_MOCK_LLM"] = "0"
+
+    store = get_cassette_store(args.cassette)
+    requests = [GenerateRequest(**payload) for payload in store.iter_requests()]
+    if not requests:
+        raise SystemExit("Cassette has no recorded requests; record with LLM_CASSETTE=record.")
+
+    ok = failed = 0
+    start = time.perf_counter()
+    for _ in range(args.passes):
+        for request in requests:
+            try:
+                generate_game(request)
+                ok += 1
+            except Exception:  # noqa: BLE001
+                failed += 1
+    elapsed = time.perf_counter() - start
+    total = ok + failed
+    print(f"requests={total} ok={ok} failed={failed} responses={store.count()}")
+    print(f"elapsed={elapsed:.3f}s throughput={total / elapsed:.1f} games/s "
+          f"mean={elapsed / total * 1000:.2f} ms/game")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "rate": 20.0,
+    "duration": 20.0,
+    "concurrency": 256,
+    "arrival": "poisson",
+    "timeout": 60.0,
+    "mix": {"categories": 5, "generate": 1, "validate": 2},
+    "generate": {"player_count": 6, "category_id": "random", "unique_seeds": True},
+    "slo": {
+        "all": {"error_rate": 0.01},
+        "categories": {"p99_ms": 100},
+        "validate": {"p99_ms": 250},
+        "generate": {"p95_ms": 2000},
+    },
+}
+# Generate calls stand in for people waiting on a game, not for bulk jobs.
+GENERATE_HEADERS = {"X-Request-Class": "interactive"}
+
+
+@dataclass
+class Stats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms)
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def summary(self, elapsed: float) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "throughput": self.count / elapsed if elapsed else 0.0,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
+def load_config(path: Optional[str]) -> Dict[str, Any]:
+    config = json.loads(json.dumps(DEFAULT_CONFIG))
+    if path:
+        with open(path, encoding="utf-8") as handle:
+            overrides = json.load(handle)
+        for key, value in overrides.items():
+            if key == "generate":
+                config[key].update(value)
+            else:
+                config[key] = value
+    return config
+
+
+# Thresholds are maxima except min_throughput.
+def check_slo(report: Dict[str, Dict[str, float]], slo: Dict[str, Dict[str, float]]) -> List[str]:
+    failures = []
+    for target, limits in slo.items():
+        summary = report.get(target)
+        if summary is None:
+            continue
+        for metric, limit in limits.items():
+            if metric == "min_throughput":
+                if summary["throughput"] < limit:
+                    failures.append(f"{target}.throughput {summary['throughput']:.1f} < {limit}")
+            elif summary[metric] > limit:
+                failures.append(f"{target}.{metric} {summary[metric]:.3f} > {limit}")
+    return failures
+
+
+class LoadDriver:
+    def __init__(self, client: httpx.AsyncClient, config: Dict[str, Any], seed: int = 0) -> None:
+        self.client = client
+        self.config = config
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, Stats] = {name: Stats() for name in config["mix"]}
+        self.sample_game: Optional[Dict[str, Any]] = None
+        self.rate_limited = 0
+        self._sequence = 0
+
+    def _generate_payload(self) -> Dict[str, Any]:
+        settings = dict(self.config["generate"])
+        unique = settings.pop("unique_seeds", True)
+        self._sequence += 1
+        return {**settings, "seed": self._sequence if unique else 1}
+
+    async def _call(self, name: str) -> httpx.Response:
+        if name == "categories":
+            return await self.client.get("/api/categories")
+        if name == "generate":
+            return await self.client.post(
+                "/api/generate", json=self._generate_payload(), headers=GENERATE_HEADERS
+            )
+        if name == "validate":
+            return await self.client.post("/api/validate", json=self.sample_game)
+        raise ValueError(f"Unknown endpoint in mix: {name}")
+
+    async def prepare(self) -> None:
+        if "validate" in self.config["mix"]:
+            response = await self.client.post(
+                "/api/generate", json=self._generate_payload(), headers=GENERATE_HEADERS
+            )
+            response.raise_for_status()
+            self.sample_game = response.json()
+
+    # Open-loop: latency is measured from the scheduled start, so time spent
+    # queued behind a saturated server counts against it.
+    async def _fire(self, name: str, scheduled: float, limit: asyncio.Semaphore) -> None:
+        stats = self.stats[name]
+        async with limit:
+            try:
+                response = await self._call(name)
+                failed = response.status_code >= 400
+                self.rate_limited += response.status_code == 429
+            except httpx.HTTPError:
+                failed = True
+        stats.latencies_ms.append((time.perf_counter() - scheduled) * 1000.0)
+        stats.errors += failed
+
+    async def run(self) -> Dict[str, Dict[str, float]]:
+        await self.prepare()
+        rate = float(self.config["rate"])
+        duration = float(self.config["duration"])
+        names = list(self.config["mix"])
+        weights = [float(self.config["mix"][name]) for name in names]
+        limit = asyncio.Semaphore(int(self.config["concurrency"]))
+        tasks = []
+        start = time.perf_counter()
+        next_at = start
+        while next_at - start < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = self.rng.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(self._fire(name, next_at, limit)))
+            if self.config["arrival"] == "poisson":
+                next_at += self.rng.expovariate(rate)
+            else:
+                next_at += 1.0 / rate
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        total = Stats()
+        for stats in self.stats.values():
+            total.latencies_ms.extend(stats.latencies_ms)
+            total.errors += stats.errors
+        report = {name: stats.summary(elapsed) for name, stats in self.stats.items()}
+        report["all"] = total.summary(elapsed)
+        return report
+
+
+def print_report(report: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'endpoint':<12} {'count':>6} {'req/s':>8} {'errors':>7} "
+          f"{'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    for name, summary in report.items():
+        print(f"{name:<12} {summary['count']:>6} {summary['throughput']:>8.1f} "
+              f"{summary['error_rate']:>7.2%} {summary['p50_ms']:>9.1f} "
+              f"{summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f}")
+
+
+# Minimal Together-compatible endpoint: waits, then answers with an empty JSON
+# object, so generate pays realistic LLM latency for the first call and the
+# repair call and finishes through the template repair.
+class _StubLLMHandler(BaseHTTPRequestHandler):
+    latency_s = 1.0
+
+    def do_POST(self) -> None:  # noqa: N802
+        self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        time.sleep(self.latency_s)
+        body = json.dumps({"choices": [{"message": {"content": "{}"}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+def serve_stub_llm(port: int, latency_ms: float) -> ThreadingHTTPServer:
+    handler = type("StubLLMHandler", (_StubLLMHandler,), {"latency_s": latency_ms / 1000.0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _run(args: argparse.Namespace, config: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    if args.in_process:
+        # Every simulated user shares one address here.
+        os.environ.setdefault("CLIENT_RATE_PER_MINUTE", "0")
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+    else:
+        transport = None
+        base_url = args.base_url
+    limits = httpx.Limits(max_connections=int(config["concurrency"]))
+    async with httpx.AsyncClient(
+        base_url=base_url, transport=transport, timeout=float(config["timeout"]), limits=limits
+    ) as client:
+        driver = LoadDriver(client, config, args.seed)
+        report = await driver.run()
+    if driver.rate_limited:
+        # All simulated users share this machine's address, so the server's
+        # per-client limit (30/min by default) caps the whole run.
+        print(
+            f"{driver.rate_limited} requests got 429; start the server with "
+            "CLIENT_RATE_PER_MINUTE=0 for load tests",
+            file=sys.stderr,
+        )
+    return report
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Open-loop load test with latency SLO checks.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Drive the app through ASGI in this process instead of over HTTP.")
+    parser.add_argument("--config", help="JSON file overriding the default rate, mix and SLOs.")
+    parser.add_argument("--rate", type=float, help="Requests per second.")
+    parser.add_argument("--duration", type=float, help="Seconds of load.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--stub-llm-port", type=int,
+                        help="Only run a stand-in LLM endpoint on this port until interrupted.")
+    parser.add_argument("--stub-llm-latency-ms", type=float, default=1500.0)
+    args = parser.parse_args(argv)
+
+    if args.stub_llm_port:
+        serve_stub_llm(args.stub_llm_port, args.stub_llm_latency_ms)
+        print(f"stub LLM on http://127.0.0.1:{args.stub_llm_port}/v1/chat/completions")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            return
+
+    config = load_config(args.config)
+    if args.rate:
+        config["rate"] = args.rate
+    if args.duration:
+        config["duration"] = args.duration
+    report = asyncio.run(_run(args, config))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    failures = check_slo(report, config["slo"])
+    for failure in failures:
+        print(f"SLO FAIL {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("SLO ok")
+
+
+if __name__ == "__main__":
+    main()
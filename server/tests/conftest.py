@@ -0,0 +1,10 @@
+import pytest
+
+from app import admission
+
+
+# Every TestClient request comes from one address, so the per-client rate limit
+# would trip across tests; tests that exercise it build their own controller.
+@pytest.fixture(autouse=True)
+def _unlimited_admission(monkeypatch):
+    monkeypatch.setattr(admission, "_controller", admission.AdmissionController())
@@ -0,0 +1,88 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app import admission
+from app.admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejected
+from app.main import app
+
+
+def test_token_bucket_rejects_with_retry_after():
+    now = [0.0]
+    controller = AdmissionController(rate_per_second=0.5, burst=2, clock=lambda: now[0])
+
+    async def run():
+        for _ in range(2):
+            async with controller.admit("a"):
+                pass
+        try:
+            async with controller.admit("a"):
+                pass
+        except AdmissionRejected as exc:
+            assert exc.retry_after_header == "2"
+        else:
+            raise AssertionError("third request should be limited")
+        async with controller.admit("b"):
+            pass
+        now[0] = 2.0
+        async with controller.admit("a"):
+            pass
+
+    asyncio.run(run())
+    assert controller.rejected["rate"] == 1
+
+
+def test_interactive_requests_jump_queued_batch_work():
+    controller = AdmissionController(max_active=1, max_queue=8)
+    order = []
+
+    async def job(name, client, request_class):
+        async with controller.admit(client, request_class):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def holder():
+            async with controller.admit("host", INTERACTIVE):
+                await gate.wait()
+
+        first = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(job(f"b{i}", "cli", BATCH)) for i in range(3)]
+        tasks += [asyncio.create_task(job(f"i{i}", f"host{i}", INTERACTIVE)) for i in range(2)]
+        await asyncio.sleep(0)
+        assert controller.snapshot()["queue_depth"] == {"interactive": 2, "batch": 3, "prefetch": 0}
+        gate.set()
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(run())
+    assert order[:2] == ["i0", "i1"]
+    assert sorted(order[2:]) == ["b0", "b1", "b2"]
+    assert controller.active == 0 and controller.queued == 0
+
+
+def test_generate_returns_429_when_queue_is_full(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    monkeypatch.setattr(admission, "_controller", AdmissionController(max_active=0, max_queue=0))
+    client = TestClient(app)
+    payload = {"player_count": 5, "category_id": "random", "seed": 77}
+    response = client.post("/api/generate", json=payload)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    bad = client.post("/api/generate", json=payload, headers={"X-Request-Class": "urgent"})
+    assert bad.status_code == 400
+    assert client.get("/api/metrics").json()["admission"]["rejected"]["queue"] == 1
+
+
+def test_rate_limit_is_on_and_unlabeled_callers_queue_as_batch(monkeypatch):
+    monkeypatch.delenv("CLIENT_RATE_PER_MINUTE", raising=False)
+    monkeypatch.setattr(admission, "_controller", None)
+    assert admission.get_admission_controller().rate == admission.DEFAULT_RATE_PER_MINUTE / 60
+
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    monkeypatch.setattr(admission, "_controller", AdmissionController())
+    client = TestClient(app)
+    client.post("/api/generate", json={"player_count": 4, "category_id": "random", "seed": 78})
+    assert list(client.get("/api/metrics").json()["admission"]["wait"]) == [BATCH]
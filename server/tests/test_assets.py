@@ -0,0 +1,53 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_index_points_at_fingerprinted_immutable_assets():
+    client = TestClient(app)
+    index = client.get("/")
+    assert index.status_code == 200
+    assert index.headers["cache-control"] == "no-cache"
+    script = re.search(r'src="(/static/app\.[0-9a-f]+\.js)"', index.text).group(1)
+
+    response = client.get(script, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    raw = client.get(script, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    assert response.content == raw.content
+
+    assert raw.headers["etag"] != response.headers["etag"]
+    again = client.get(
+        script, headers={"If-None-Match": response.headers["etag"], "Accept-Encoding": "gzip"}
+    )
+    assert again.status_code == 304
+    # A gzip validator must not revalidate the identity representation.
+    stale = client.get(
+        script, headers={"If-None-Match": response.headers["etag"], "Accept-Encoding": "identity"}
+    )
+    assert stale.status_code == 200 and stale.headers["etag"] == raw.headers["etag"]
+
+    refused = client.get(script, headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in refused.headers
+    assert refused.headers["etag"] == raw.headers["etag"]
+    assert client.get("/static/app.js").headers["cache-control"] == "no-cache"
+    assert client.get("/static/missing.js").status_code == 404
+
+
+def test_service_worker_precaches_the_fingerprinted_shell():
+    client = TestClient(app)
+    script = re.search(r'src="(/static/app\.[0-9a-f]+\.js)"', client.get("/").text).group(1)
+
+    worker = client.get("/sw.js")
+    assert worker.status_code == 200
+    assert worker.headers["cache-control"] == "no-cache"
+    assert "javascript" in worker.headers["content-type"]
+    assert f'"{script}"' in worker.text
+    assert "__SHELL__" not in worker.text and "__VERSION__" not in worker.text
+    assert client.get("/static/sw.js").status_code == 404
@@ -0,0 +1,50 @@
+import pytest
+
+from app import generator
+from app.balance import degenerate_flags, graph_diameter, structure_metrics
+from app.models import GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+def _structure(player_count, seed):
+    request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    return generator._build_structure(request, category, seed, rng)
+
+
+def test_structure_metrics_and_flags():
+    structure = _structure(6, 13)
+    metrics = structure_metrics(structure)
+    assert metrics["degree_min"] >= 4 and metrics["diameter"] in (1, 2)
+
+    hard = [c for c in structure["clues"] if c["type"] == "hard"]
+    for clue in hard:
+        clue["is_misleading"] = True
+    murderer = structure["solution"]["murderer_id"]
+    packet = next(p for p in structure["character_packets"] if p["character_id"] == murderer)
+    packet["clue_ids"] = [c["clue_id"] for c in hard]
+    flags = degenerate_flags(structure_metrics(structure))
+    assert {"murderer_holds_evidence", "weak_evidence", "misleading_overlap"} <= set(flags)
+
+
+def test_graph_diameter():
+    assert graph_diameter([[1], [0, 2], [1]]) == 2
+    assert graph_diameter([[1], [0], []]) == -1
+
+
+def test_vectorized_draws_match_exact_seeds():
+    np = pytest.importorskip("numpy")
+    from benchmarks.balance import exact_metrics, vectorized_flags, vectorized_metrics
+
+    for player_count in (4, 6):
+        exact = [exact_metrics(seed, player_count) for seed in range(1, 1501)]
+        drawn = vectorized_metrics(np.random.default_rng(7), 50000, player_count)
+        for name, values in drawn.items():
+            expected = sum(m[name] for m in exact) / len(exact)
+            assert abs(float(values.mean()) - expected) <= 0.05 * max(1.0, expected), name
+        flags = vectorized_flags(drawn)
+        for flag, hits in flags.items():
+            expected = sum(flag in degenerate_flags(m) for m in exact) / len(exact)
+            assert abs(float(hits.mean()) - expected) <= 0.03, flag
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from app import generator
+from app.cassette import CassetteClient, CassetteStore
+from app.deadline import Deadline
+from app.models import GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories
+from app.together_client import TogetherClientError
+
+
+class RecordingClient:
+    model = "test-model"
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def generate_text(self, **_kwargs):
+        self.calls += 1
+        return self.response
+
+
+def _filled_game_json(request):
+    rng = seeded_random(request.seed)
+    category = generator._select_category(get_categories(), request.category_id, rng)
+    structure = generator._build_structure(request, category, request.seed, rng)
+    return json.dumps(generator._fill_mock(structure, category))
+
+
+def test_record_then_replay_without_provider(monkeypatch, tmp_path):
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    monkeypatch.setenv("TOGETHER_MODEL", "test-model")
+    monkeypatch.setenv("LLM_CASSETTE_PATH", str(tmp_path / "cassette.sqlite3"))
+    request = GenerateRequest(player_count=5, category_id="jazz_club", seed=31337)
+    live = RecordingClient(_filled_game_json(request))
+    monkeypatch.setattr(generator, "TogetherClient", lambda: live)
+
+    monkeypatch.setenv("LLM_CASSETTE", "record")
+    recorded = generator.generate_game(request)
+    assert live.calls == 1
+
+    def offline():
+        raise AssertionError("replay must not construct a live client")
+
+    monkeypatch.setattr(generator, "TogetherClient", offline)
+    monkeypatch.setenv("LLM_CASSETTE", "replay")
+    replayed = generator.generate_game(request)
+    assert replayed == recorded
+
+    store = generator.get_cassette_store()
+    assert [r["seed"] for r in store.iter_requests()] == [31337]
+
+    with pytest.raises(RuntimeError):
+        generator.generate_game(GenerateRequest(player_count=5, category_id="jazz_club", seed=1))
+
+
+class SlowSequenceClient:
+    model = "test-model"
+
+    def __init__(self, responses, clock, seconds_per_call):
+        self.responses = responses
+        self.clock = clock
+        self.seconds_per_call = seconds_per_call
+        self.max_tokens = []
+
+    def generate_text(self, max_tokens, **_kwargs):
+        self.max_tokens.append(max_tokens)
+        self.clock[0] += self.seconds_per_call
+        return self.responses[min(len(self.max_tokens), len(self.responses)) - 1]
+
+
+def test_retry_recorded_under_a_shrunk_budget_replays(monkeypatch, tmp_path):
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    monkeypatch.setenv("TOGETHER_MODEL", "test-model")
+    monkeypatch.setenv("LLM_CASSETTE_PATH", str(tmp_path / "cassette.sqlite3"))
+    request = GenerateRequest(player_count=6, category_id="jazz_club", seed=31338)
+    full = _filled_game_json(request)
+    clock = [0.0]
+    live = SlowSequenceClient([full[: len(full) // 2], full], clock, seconds_per_call=2.0)
+    monkeypatch.setattr(generator, "TogetherClient", lambda: live)
+
+    monkeypatch.setenv("LLM_CASSETTE", "record")
+    recorded = generator.generate_game(request, Deadline(30.0, clock=lambda: clock[0]))
+    assert recorded.meta.generation_path[:2] == ["llm", "retry"]
+    # The retry was shrunk by the time the first call took.
+    assert live.max_tokens[1] < 3200 + 800
+
+    monkeypatch.setattr(generator, "TogetherClient", None)
+    monkeypatch.setenv("LLM_CASSETTE", "replay")
+    replayed = generator.generate_game(request, Deadline(30.0, clock=lambda: 0.0))
+    assert replayed == recorded
+
+
+def test_replay_miss_raises_client_error(tmp_path):
+    client = CassetteClient(CassetteStore(tmp_path / "empty.sqlite3"), "replay", model="m")
+    with pytest.raises(TogetherClientError):
+        client.generate_text(prompt="hello")
@@ -0,0 +1,68 @@
+import json
+
+from app import generator
+from app.category_cache import SHARED_FIELDS, CategoryContentCache
+from app.models import GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories
+
+SHARED = {
+    "theme_summary": "Smoke, brass and old grudges.",
+    "props_list": ["Fedoras", "Cocktail napkins"],
+    "how_to_play": [
+        {"title": f"Round {i}", "description": "Talk it out.", "minutes": 10} for i in range(4)
+    ],
+}
+
+
+def test_cache_refreshes_on_miss_version_change_and_expiry():
+    category = get_categories()[0]
+    calls = []
+    version = ["v1"]
+    now = [0.0]
+
+    def producer(cat, tone):
+        calls.append((cat.id, tone))
+        return {**SHARED, "theme_summary": f"theme {len(calls)}"}
+
+    cache = CategoryContentCache(producer, lambda: version[0], ttl_seconds=60, clock=lambda: now[0])
+    assert cache.get(category, "comedy") is None
+    assert cache.get(category, "comedy")["theme_summary"] == "theme 1"
+    assert len(calls) == 1
+
+    now[0] = 120.0
+    assert cache.get(category, "comedy")["theme_summary"] == "theme 1"
+    assert cache.get(category, "comedy")["theme_summary"] == "theme 2"
+
+    version[0] = "v2"
+    assert cache.get(category, "comedy") is None
+    assert len(calls) == 3
+
+
+def test_cached_sections_are_left_out_of_the_prompt(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    monkeypatch.setenv("CATEGORY_CACHE", "1")
+    request = GenerateRequest(player_count=4, category_id="jazz_club", tone="serious", duration=60, seed=8)
+    rng = seeded_random(8)
+    category = generator._select_category(get_categories(), "jazz_club", rng)
+    filled = generator._fill_mock(generator._build_structure(request, category, 8, rng), category)
+    seed_only = {k: v for k, v in filled.items() if k not in SHARED_FIELDS}
+
+    cache = CategoryContentCache(lambda cat, tone: SHARED, generator._shared_version)
+    cache.put("jazz_club", "serious", SHARED)
+    monkeypatch.setattr(generator, "get_category_cache", lambda producer, version: cache)
+    prompts = []
+
+    class Client:
+        def generate_text(self, prompt, **_kwargs):
+            prompts.append(prompt)
+            return json.dumps(seed_only)
+
+    monkeypatch.setattr(generator, "TogetherClient", Client)
+    game = generator.generate_game(request)
+
+    assert len(prompts) == 1
+    assert '"how_to_play"' not in prompts[0] and '"props_list"' not in prompts[0]
+    assert game.theme_summary == SHARED["theme_summary"]
+    assert [r.minutes for r in game.how_to_play] == [15, 15, 15, 15]
+    assert game.meta.generation_path == ["cache:category", "llm"]
@@ -0,0 +1,81 @@
+import gzip
+import json
+import os
+
+from app import cli
+
+
+def _read(out_dir):
+    games = []
+    for name in sorted(os.listdir(out_dir)):
+        if name.endswith(".jsonl.gz"):
+            with gzip.open(os.path.join(out_dir, name), "rt", encoding="utf-8") as handle:
+                games.extend(json.loads(line) for line in handle)
+    return games
+
+
+def test_generate_writes_shards_and_resumes(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    out = str(tmp_path / "corpus")
+    argv = ["generate", "--seeds", "10:13", "--players", "4,5", "--tones", "comedy",
+            "--out", out, "--workers", "1", "--shard-size", "4"]
+    cli.main(argv)
+    games = _read(out)
+    assert len(games) == 6
+    assert {(g["meta"]["player_count"], g["meta"]["tone"]) for g in games} == {
+        (4, "comedy"), (5, "comedy")
+    }
+    manifest = json.loads((tmp_path / "corpus" / cli.MANIFEST_NAME).read_text())
+    assert sorted(manifest["shards"]) == [cli.shard_name(0), cli.shard_name(1)]
+
+    os.remove(os.path.join(out, cli.shard_name(1)))
+    capsys.readouterr()
+    cli.main(argv)
+    assert "1 already done, 1 to run" in capsys.readouterr().out
+    assert sorted(g["meta"]["share_code"] for g in _read(out)) == sorted(
+        g["meta"]["share_code"] for g in games
+    )
+
+
+def test_failed_jobs_are_retried_on_resume(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    out = str(tmp_path / "corpus")
+    argv = ["generate", "--seeds", "20:24", "--out", out, "--workers", "1", "--shard-size", "4"]
+    generate_line = cli._generate_line
+
+    def flaky(job, *args):
+        if job[0] == 21:
+            raise RuntimeError("LLM unavailable")
+        return generate_line(job, *args)
+
+    monkeypatch.setattr(cli, "_generate_line", flaky)
+    cli.main(argv)
+    assert len(_read(out)) == 3
+    entry = json.loads((tmp_path / "corpus" / cli.MANIFEST_NAME).read_text())["shards"][
+        cli.shard_name(0)
+    ]
+    assert entry["error_count"] == 1 and entry["failed_jobs"][0][0] == 21
+
+    monkeypatch.setattr(cli, "_generate_line", generate_line)
+    capsys.readouterr()
+    cli.main(argv)
+    assert "0 already done, 1 to run" in capsys.readouterr().out
+    assert sorted(g["meta"]["seed"] for g in _read(out)) == [20, 21, 22, 23]
+    entry = json.loads((tmp_path / "corpus" / cli.MANIFEST_NAME).read_text())["shards"][
+        cli.shard_name(0)
+    ]
+    assert (entry["games"], entry["error_count"]) == (4, 0)
+
+
+def test_llm_outage_fails_jobs_instead_of_falling_back(tmp_path, monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    monkeypatch.setenv("LLM_FALLBACK", "1")
+    monkeypatch.delenv("TOGETHER_API_KEY", raising=False)
+    out = str(tmp_path / "corpus")
+    cli.main(["generate", "--seeds", "30:32", "--out", out, "--workers", "1"])
+    assert _read(out) == []
+    entry = json.loads((tmp_path / "corpus" / cli.MANIFEST_NAME).read_text())["shards"][
+        cli.shard_name(0)
+    ]
+    assert entry["error_count"] == 2
+    assert "TOGETHER_API_KEY" in entry["errors"][0]["error"]
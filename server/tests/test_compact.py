@@ -0,0 +1,48 @@
+import json
+
+from app import generator
+from app.compact import compact_schema, expand_keyed, to_keyed
+from app.models import GamePackage, GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+def _structure(seed, player_count=6):
+    request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    return request, category, generator._build_structure(request, category, seed, rng)
+
+
+def test_keyed_output_expands_back_into_the_template():
+    _request, category, structure = _structure(17)
+    filled = generator._fill_mock(json.loads(json.dumps(structure)), category)
+    keyed = json.loads(json.dumps(to_keyed(filled)))
+    assert isinstance(keyed["character_packets"]["char_01"]["relationships"], dict)
+    assert "name" not in keyed["character_packets"]["char_01"]
+
+    merged = generator._merge_structure(structure, expand_keyed(keyed))
+    assert {k: v for k, v in merged.items() if k != "meta"} == {
+        k: v for k, v in filled.items() if k != "meta"
+    }
+
+    schema = compact_schema(structure)
+    assert len(schema) < len(json.dumps(structure, separators=(",", ":"))) / 2
+    for packet in structure["character_packets"]:
+        assert packet["character_id"] in schema and packet["name"] in schema
+
+
+def test_generate_accepts_keyed_llm_output(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    request, category, structure = _structure(23, player_count=4)
+    keyed = to_keyed(generator._fill_mock(structure, category))
+
+    class Client:
+        def generate_text(self, **_kwargs):
+            return json.dumps(keyed)
+
+    monkeypatch.setattr(generator, "TogetherClient", Client)
+    game = generator.generate_game(request)
+    assert isinstance(game, GamePackage)
+    assert game.meta.generation_path == ["llm"]
+    assert all(rel.relationship for p in game.character_packets for rel in p.relationships)
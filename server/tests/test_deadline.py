@@ -0,0 +1,60 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from app import generator
+from app.deadline import Deadline
+from app.main import app
+from app.models import GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+class SlowClient:
+    def __init__(self, response, clock, seconds_per_call):
+        self.response = response
+        self.clock = clock
+        self.seconds_per_call = seconds_per_call
+        self.calls = 0
+
+    def generate_text(self, **_kwargs):
+        self.calls += 1
+        self.clock[0] += self.seconds_per_call
+        return self.response
+
+
+def test_expired_budget_skips_llm_and_reports_path(monkeypatch):
+    os.environ["USE_MOCK_LLM"] = "0"
+
+    def offline():
+        raise AssertionError("no LLM call should be attempted")
+
+    monkeypatch.setattr(generator, "TogetherClient", offline)
+    client = TestClient(app)
+    response = client.post(
+        "/api/generate",
+        json={"player_count": 5, "category_id": "random", "seed": 99},
+        headers={"X-Request-Deadline-Ms": "500"},
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Generation-Path"] == "procedural:deadline"
+    assert response.json()["meta"]["generation_path"] == ["procedural:deadline"]
+
+
+def test_late_validation_failure_uses_template_repair(monkeypatch):
+    os.environ["USE_MOCK_LLM"] = "0"
+    request = GenerateRequest(player_count=4, category_id="random", seed=321)
+    rng = seeded_random(321)
+    category = generator._select_category(get_categories(), "random", rng)
+    filled = generator._fill_mock(generator._build_structure(request, category, 321, rng), category)
+    filled["character_packets"][0]["connection_to_victim"] = ""
+
+    clock = [0.0]
+    llm = SlowClient(json.dumps(filled), clock, seconds_per_call=20.0)
+    monkeypatch.setattr(generator, "TogetherClient", lambda: llm)
+    game = generator.generate_game(request, Deadline(30.0, clock=lambda: clock[0]))
+
+    assert llm.calls == 1
+    assert game.meta.generation_path == ["llm", "repair:template"]
+    assert game.character_packets[0].connection_to_victim
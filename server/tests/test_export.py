@@ -0,0 +1,65 @@
+import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from app import export
+from app.main import app
+
+
+def _generate(client, monkeypatch, player_count=8):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    payload = {
+        "player_count": player_count,
+        "category_id": "haunted_estate",
+        "tone": "comedy",
+        "duration": 90,
+        "seed": 5150,
+    }
+    response = client.post("/api/generate", json=payload)
+    assert response.status_code == 200
+    return response.json(), response.headers["X-Host-Token"]
+
+
+def _read_zip(data):
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    return {name: archive.read(name) for name in archive.namelist()}
+
+
+def test_export_kit_contains_every_page_and_is_cached(monkeypatch):
+    monkeypatch.setenv("EXPORT_WORKERS", "1")
+    client = TestClient(app)
+    game, host_token = _generate(client, monkeypatch)
+    share_code = game["meta"]["share_code"]
+
+    assert client.get(f"/api/games/{share_code}/export").status_code == 403
+
+    calls = []
+    original = export.render_kit
+
+    def counting_render_kit(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(export, "render_kit", counting_render_kit)
+    headers = {"X-Host-Token": host_token}
+    first = client.get(f"/api/games/{share_code}/export", headers=headers)
+    second = client.get(f"/api/games/{share_code}/export", headers=headers)
+    assert first.status_code == 200
+    assert first.content == second.content
+    assert len(calls) == 1
+
+    names = zipfile.ZipFile(io.BytesIO(first.content)).namelist()
+    assert "host_booklet.html" in names
+    assert "props_checklist.html" in names
+    assert len([n for n in names if n.startswith("characters/")]) == 8
+
+
+def test_process_pool_render_matches_serial(monkeypatch):
+    client = TestClient(app)
+    game, _token = _generate(client, monkeypatch, player_count=12)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel = export.render_kit(game, pool)
+    serial = export.render_kit(game)
+    assert _read_zip(parallel) == _read_zip(serial)
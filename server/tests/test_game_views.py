@@ -0,0 +1,79 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def _generate(client, monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    payload = {
+        "player_count": 6,
+        "category_id": "jazz_club",
+        "tone": "suspense",
+        "duration": 60,
+        "seed": 777,
+    }
+    response = client.post("/api/generate", json=payload)
+    assert response.status_code == 200
+    return response.json(), response.headers["X-Host-Token"]
+
+
+def test_views_split_game_by_audience(monkeypatch):
+    client = TestClient(app)
+    game, host_token = _generate(client, monkeypatch)
+    share_code = game["meta"]["share_code"]
+
+    host = client.get(f"/api/games/{share_code}")
+    assert host.status_code == 200
+    view = host.json()
+    assert "solution" not in view
+    assert "character_packets" not in view
+    assert len(view["characters"]) == 6
+    assert len(host.content) < len(json.dumps(game))
+
+    packet = game["character_packets"][2]
+    character = client.get(f"/api/games/{share_code}/characters/{packet['character_id']}")
+    assert character.status_code == 200
+    body = character.json()
+    assert body["character"]["character_id"] == packet["character_id"]
+    assert [c["clue_id"] for c in body["clues"]] == [
+        c["clue_id"] for c in game["clues"] if c["clue_id"] in packet["clue_ids"]
+    ]
+
+    cached = client.get(
+        f"/api/games/{share_code}/characters/{packet['character_id']}",
+        headers={"If-None-Match": character.headers["ETag"]},
+    )
+    assert cached.status_code == 304
+
+    assert client.get(f"/api/games/{share_code}/solution").status_code == 403
+    solution = client.get(
+        f"/api/games/{share_code}/solution", headers={"X-Host-Token": host_token}
+    )
+    assert solution.status_code == 200
+    assert solution.json()["solution"]["murderer_id"] == game["solution"]["murderer_id"]
+    assert solution.headers["Cache-Control"] == "private, no-store"
+
+
+def test_unknown_share_code_is_not_found():
+    client = TestClient(app)
+    assert client.get("/api/games/missing").status_code == 404
+
+
+def test_regenerating_a_stored_game_does_not_hand_out_its_host_token(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    payload = {"player_count": 5, "category_id": "random", "seed": 6161}
+    first = client.post("/api/generate", json=payload)
+    host_token = first.headers["X-Host-Token"]
+    share_code = first.json()["meta"]["share_code"]
+
+    settings = client.get(f"/api/share-codes/{share_code}").json()
+    replay = client.post("/api/generate", json={**payload, "seed": settings["seed"]})
+    assert replay.status_code == 200
+    assert "X-Host-Token" not in replay.headers
+    assert replay.content == first.content
+
+    solution = f"/api/games/{share_code}/solution"
+    assert client.get(solution, headers={"X-Host-Token": host_token}).status_code == 200
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from app.json_repair import repair_json
+
+
+def test_repairs_common_llm_defects_in_one_pass():
+    text = """{
+      // generated
+      "title": “The Last Toast”,
+      'tagline': 'It's late' /* note */
+      "notes": "line one
+line two",
+      "quote": "She said "never" twice",
+      "flags": [True, None, 1,],
+    }"""
+    data, fixes = repair_json(text)
+    assert data == {
+        "title": "The Last Toast",
+        "tagline": "It's late",
+        "notes": "line one\nline two",
+        "quote": 'She said "never" twice',
+        "flags": [True, None, 1],
+    }
+    assert fixes == [
+        "comments",
+        "control_characters",
+        "missing_commas",
+        "python_literals",
+        "single_quotes",
+        "smart_quotes",
+        "trailing_commas",
+        "unescaped_quotes",
+    ]
+
+
+def test_valid_json_round_trips_and_garbage_still_fails():
+    payload = {"a": ["x, y", {"b": 'c"d'}], "n": -1.5e3, "t": True}
+    assert repair_json(json.dumps(payload)) == (payload, [])
+    with pytest.raises(json.JSONDecodeError):
+        repair_json('{"title": Test Game}')
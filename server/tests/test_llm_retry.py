@@ -2,7 +2,7 @@ import json
 import os
 
 from app import generator
-from app.models import GenerateRequest
+from app.models import GamePackage, GenerateRequest
 from app.seed import seeded_random
 from app.storage import get_categories
 
@@ -45,5 +45,23 @@ def test_truncated_response_triggers_retry_and_repair(monkeypatch):
     monkeypatch.setattr(generator, "_validate_structure", lambda data, expected: [])
 
     result = generator.generate_game(request)
-    assert mock_client.calls >= 3
-    assert "title" in result
+    assert mock_client.calls == 2
+    assert isinstance(result, GamePackage)
+    assert result.meta.generation_path == ["llm", "retry", "repair:local"]
+
+
+def test_unrepairable_json_falls_back_to_llm_repair(monkeypatch):
+    os.environ["USE_MOCK_LLM"] = "0"
+
+    request = GenerateRequest(player_count=4, category_id="random", seed=124)
+    rng = seeded_random(124)
+    category = generator._select_category(get_categories(), "random", rng)
+    structure = generator._build_structure(request, category, 124, rng)
+    mock_client = MockClient(['{"title": Test Game}', json.dumps(structure)])
+
+    monkeypatch.setattr(generator, "TogetherClient", lambda: mock_client)
+    monkeypatch.setattr(generator, "_validate_structure", lambda data, expected: [])
+
+    result = generator.generate_game(request)
+    assert mock_client.calls == 2
+    assert result.meta.generation_path == ["llm", "repair:json"]
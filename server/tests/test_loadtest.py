@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from benchmarks.loadtest import LoadDriver, check_slo, load_config
+
+
+def test_in_process_load_reports_and_checks_slos(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    config = load_config(None)
+    config.update(rate=60, duration=0.5)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await LoadDriver(client, config).run()
+
+    report = asyncio.run(run())
+    assert report["all"]["count"] == sum(report[name]["count"] for name in config["mix"])
+    assert report["all"]["error_rate"] == 0
+    assert report["all"]["p50_ms"] <= report["all"]["p99_ms"]
+
+    assert check_slo(report, {"all": {"p50_ms": 1e9}}) == []
+    failures = check_slo(report, {"all": {"p99_ms": 0, "min_throughput": 1e9}})
+    assert len(failures) == 2
+
+
+def test_generate_calls_are_sent_as_interactive():
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, request.headers.get("x-request-class")))
+        if request.url.path == "/api/generate":
+            return httpx.Response(429)
+        return httpx.Response(200, json={})
+
+    config = load_config(None)
+    config.update(rate=200, duration=0.2, mix={"generate": 1})
+
+    async def run():
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            driver = LoadDriver(client, config)
+            report = await driver.run()
+            return driver, report
+
+    driver, report = asyncio.run(run())
+    assert seen and all(header == "interactive" for _path, header in seen)
+    assert driver.rate_limited == report["generate"]["count"] > 0
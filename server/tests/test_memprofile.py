@@ -0,0 +1,30 @@
+import tracemalloc
+
+from fastapi.testclient import TestClient
+
+from app import memprofile
+from app.generator import generate_game
+from app.main import app
+from app.models import GenerateRequest
+
+
+def test_generate_records_stages_and_debug_endpoint(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    client = TestClient(app)
+    assert client.get("/api/debug/memory").status_code == 404
+
+    profiler = memprofile.MemoryProfiler()
+    monkeypatch.setattr(memprofile, "_profiler", profiler)
+    try:
+        generate_game(GenerateRequest(player_count=8, category_id="random", seed=31))
+        record = profiler.recent[-1]
+        assert record["label"] == "generate:8"
+        stages = [stage["stage"] for stage in record["stages"]]
+        assert stages == ["structure", "procedural", "validate", "finish"]
+        assert record["peak_bytes"] >= max(s["peak_bytes"] for s in record["stages"]) > 0
+
+        data = client.get("/api/debug/memory", params={"top": 5}).json()
+        assert data["requests"]["generate:8"]["count"] == 1
+        assert len(data["top_sites"]) <= 5
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,41 @@
+from app import generator
+from app.models import GamePackage, GenerateRequest
+from app.procedural import PROCEDURAL_MODEL, fill_procedural
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+def _structure(seed, player_count=8):
+    request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    return generator._build_structure(request, category, seed, rng), category
+
+
+def _expected(structure):
+    return {
+        "player_count": len(structure["character_packets"]),
+        "character_ids": [p["character_id"] for p in structure["character_packets"]],
+        "clue_ids": [c["clue_id"] for c in structure["clues"]],
+    }
+
+
+def test_procedural_is_deterministic_varied_and_valid():
+    games = []
+    for seed in (11, 11, 12):
+        structure, category = _structure(seed)
+        games.append(fill_procedural(structure, category))
+        assert generator._validate_structure(games[-1], _expected(structure)) == []
+    assert games[0] == games[1]
+    assert games[0]["title"] != games[2]["title"] or games[0]["clues"] != games[2]["clues"]
+    backstories = {p["backstory"] for p in games[0]["character_packets"]}
+    assert len(backstories) > 1
+
+
+def test_llm_outage_falls_back_to_procedural(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    monkeypatch.setenv("LLM_CASSETTE", "off")
+    monkeypatch.delenv("TOGETHER_API_KEY", raising=False)
+    game = generator.generate_game(GenerateRequest(player_count=6, category_id="random", seed=7))
+    assert isinstance(game, GamePackage)
+    assert game.meta.model == PROCEDURAL_MODEL
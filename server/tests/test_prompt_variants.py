@@ -0,0 +1,73 @@
+import json
+import shutil
+
+from app import generator, storage
+from app.experiments import compare_variants
+from app.models import GenerateRequest
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+class PromptClient:
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+        self.usage = {"prompt_tokens": 900, "completion_tokens": 0}
+
+    def generate_text(self, prompt, **_kwargs):
+        self.prompts.append(prompt)
+        self.usage["completion_tokens"] += 250
+        return self.response
+
+
+def _variant_prompts(monkeypatch, tmp_path, weights):
+    prompts = tmp_path / "prompts"
+    shutil.copytree(storage.PROMPTS_DIR, prompts)
+    (prompts / "variants").mkdir(exist_ok=True)
+    template = (prompts / "game_generation_prompt.md").read_text(encoding="utf-8")
+    (prompts / "variants" / "game_generation_prompt.terse.md").write_text(
+        "TERSE VARIANT\n" + template, encoding="utf-8"
+    )
+    (prompts / "variants.json").write_text(
+        json.dumps({"game_generation_prompt.md": weights}), encoding="utf-8"
+    )
+    monkeypatch.setattr(storage, "PROMPTS_DIR", prompts)
+    storage.prompt_variants.cache_clear()
+
+
+def test_variants_split_by_weight_and_stay_stable(monkeypatch, tmp_path):
+    _variant_prompts(monkeypatch, tmp_path, {"base": 3, "terse": 1})
+    try:
+        picks = [storage.pick_variant("game_generation_prompt.md", s) for s in range(4000)]
+        assert 0.2 < picks.count("terse") / len(picks) < 0.3
+        assert picks == [storage.pick_variant("game_generation_prompt.md", s) for s in range(4000)]
+        assert storage.pick_variant("system_prompt.md", 7) == storage.BASE_VARIANT
+    finally:
+        storage.prompt_variants.cache_clear()
+
+
+def test_generation_records_variant_and_stats(monkeypatch, tmp_path):
+    _variant_prompts(monkeypatch, tmp_path, {"terse": 1})
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    monkeypatch.setenv("CATEGORY_CACHE", "0")
+    request = GenerateRequest(player_count=5, category_id="random", seed=2024)
+    rng = seeded_random(2024)
+    category = generator._select_category(get_categories(), "random", rng)
+    structure = generator._build_structure(request, category, 2024, rng)
+    client = PromptClient(json.dumps(generator._fill_mock(structure, category)))
+    monkeypatch.setattr(generator, "TogetherClient", lambda: client)
+    try:
+        game = generator.generate_game(request)
+    finally:
+        storage.prompt_variants.cache_clear()
+
+    assert client.prompts[0].startswith("TERSE VARIANT")
+    meta = game.meta.model_dump()
+    assert meta["prompt_variants"] == {"game_generation_prompt.md": "terse"}
+    assert meta["stats"]["llm_calls"] == len(client.prompts)
+    assert meta["stats"]["completion_tokens"] == 250 * len(client.prompts)
+    assert meta["stats"]["tokens_estimated"] == 0
+
+    report = compare_variants([meta, {"generation_path": ["llm", "retry"], "stats": None}])
+    assert report["game_generation_prompt.md=terse"]["games"] == 1
+    assert report["base"]["rates"]["retry"] == 1.0
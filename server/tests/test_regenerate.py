@@ -0,0 +1,66 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app import generator
+from app.main import app
+from app.models import GenerateRequest
+
+
+class RecordingClient:
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    def generate_text(self, prompt, **_kwargs):
+        self.prompts.append(prompt)
+        return self.response
+
+
+def test_regenerate_endpoint_rerolls_one_packet(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    client = TestClient(app)
+    response = client.post(
+        "/api/generate", json={"player_count": 6, "category_id": "random", "seed": 8080}
+    )
+    game, token = response.json(), response.headers["X-Host-Token"]
+    share_code = game["meta"]["share_code"]
+    target = game["character_packets"][2]
+
+    url = f"/api/games/{share_code}/regenerate"
+    body = {"section": f"character_packets.{target['character_id']}", "seed": 99}
+    assert client.post(url, json=body).status_code == 403
+    headers = {"X-Host-Token": token}
+    assert client.post(url, json={"section": "meta"}, headers=headers).status_code == 400
+    assert client.post(url, json={"section": "clues.nope"}, headers=headers).status_code == 404
+
+    rerolled = client.post(url, json=body, headers=headers)
+    assert rerolled.status_code == 200
+    result = rerolled.json()
+    packet = result["character_packets"][2]
+    assert packet["name"] == target["name"]
+    assert packet["clue_ids"] == target["clue_ids"]
+    assert packet != target
+    assert result["character_packets"][:2] == game["character_packets"][:2]
+    assert result["clues"] == game["clues"]
+    view = client.get(f"/api/games/{share_code}/characters/{target['character_id']}")
+    assert view.json()["character"] == packet
+
+
+def test_regenerate_sends_only_the_section_to_the_llm(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    game = generator.generate_game(GenerateRequest(player_count=8, category_id="random", seed=31))
+    clue = game.clues[1]
+    answer = {"clues": {clue.clue_id: {"title": "A torn ticket", "description": "Half a stub."}}}
+    llm = RecordingClient(json.dumps(answer))
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    monkeypatch.setattr(generator, "TogetherClient", lambda: llm)
+
+    result = generator.regenerate_section(game, f"clues.{clue.clue_id}", seed=5)
+
+    assert len(llm.prompts) == 1
+    assert game.character_packets[0].backstory not in llm.prompts[0]
+    assert result.clues[1].title == "A torn ticket"
+    assert result.clues[1].type == clue.type
+    assert result.clues[0] == game.clues[0]
+    assert result.meta.generation_path == [f"regenerate:clues.{clue.clue_id}", "llm"]
@@ -0,0 +1,67 @@
+import json
+import os
+
+from fastapi.testclient import TestClient
+
+from app import generator
+from app.main import app
+from app.models import GenerateRequest
+from app.reskin import build_name_index, reskin
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+def _game(seed):
+    request = GenerateRequest(player_count=6, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    return generator._fill_mock(generator._build_structure(request, category, seed, rng), category)
+
+
+def test_reskin_replaces_tracked_name_tokens_everywhere():
+    game = _game(2024)
+    index = build_name_index(game)
+    old_full = [p["name"] for p in game["character_packets"]]
+    new_names = ["Ada Lovelace", "Bo", "Cy Twombly", "Di Prima", "Ed Ruscha", "Flo Jo"]
+    murderer_pos = [p["character_id"] for p in game["character_packets"]].index(
+        game["solution"]["murderer_id"]
+    )
+
+    result = reskin(json.loads(json.dumps(game)), index, new_names)
+
+    text = json.dumps({k: v for k, v in result.items() if k != "meta"})
+    assert not any(name in text for name in old_full)
+    assert [p["name"] for p in result["character_packets"]] == new_names
+    assert result["victim"]["name"] == game["victim"]["name"]
+    assert new_names[murderer_pos] in result["solution"]["reveal_explanation"]
+
+
+def test_first_name_mentions_follow_the_reskin():
+    for seed in range(1, 40):
+        names = [p["name"] for p in _game(seed)["character_packets"]]
+        assert len({name.split()[0] for name in names}) == len(names)
+        assert len({name.split()[-1] for name in names}) == len(names)
+
+    game = _game(2025)
+    firsts = [p["name"].split()[0] for p in game["character_packets"]]
+    game["character_packets"][0]["backstory"] = f"{firsts[1]} owes {firsts[2]} a favour."
+    new_names = ["Ada Lovelace", "Bo Diddley", "Cy Twombly", "Di Prima", "Ed Ruscha", "Flo Jo"]
+
+    result = reskin(json.loads(json.dumps(game)), build_name_index(game), new_names)
+    assert result["character_packets"][0]["backstory"] == "Bo owes Cy a favour."
+
+
+def test_named_requests_share_one_generated_game():
+    os.environ["USE_MOCK_LLM"] = "1"
+    client = TestClient(app)
+    base = {"player_count": 4, "category_id": "random", "seed": 777}
+    first = client.post("/api/generate", json={**base, "player_names": ["Ann", "Ben", "Cal", "Dee"]})
+    second = client.post("/api/generate", json={**base, "player_names": ["Wes", "Xia", "Yul", "Zed"]})
+    assert first.status_code == second.status_code == 200
+    a, b = first.json(), second.json()
+
+    assert a["meta"]["share_code"] != b["meta"]["share_code"]
+    assert b["meta"]["generation_path"] == ["procedural", "cache:game", "reskin"]
+    assert [p["name"] for p in b["character_packets"]] == ["Wes", "Xia", "Yul", "Zed"]
+    assert a["title"] == b["title"]
+    assert "Ann" not in json.dumps(b)
@@ -0,0 +1,62 @@
+from typing import List
+
+from app import generator
+from app.models import Clue, GenerateRequest
+from app.schema import StructureMerger, compile_model
+from app.seed import seeded_random
+from app.storage import get_categories
+
+
+def _structure(seed=404):
+    request = GenerateRequest(player_count=5, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    return generator._build_structure(request, category, seed, rng)
+
+
+def test_merge_keeps_template_fields_and_normalizes_in_one_pass():
+    structure = _structure()
+    clue_type = structure["clues"][0]["type"]
+    packet = structure["character_packets"][1]
+    murderer_id = structure["solution"]["murderer_id"]
+    candidate = {
+        "title": ["Night", "at the Gala"],
+        "solution": {"murderer_id": "char_99", "motive": "Greed"},
+        "character_packets": [
+            {
+                "character_id": packet["character_id"],
+                "name": "Renamed",
+                "clue_ids": ["clue_99"],
+                "secrets": "one; two",
+                "relationships": [
+                    {"character_id": rel["character_id"], "relationship": "rival"}
+                    for rel in reversed(packet["relationships"])
+                ],
+            }
+        ],
+        "clues": [{"clue_id": "clue_01", "title": "Glove", "type": "soft"}],
+    }
+    merged = StructureMerger(structure).merge(candidate)
+
+    assert merged["title"] == "Night at the Gala"
+    assert merged["solution"]["murderer_id"] == murderer_id
+    assert merged["solution"]["motive"] == "Greed"
+    merged_packet = merged["character_packets"][1]
+    assert merged_packet["name"] == packet["name"]
+    assert merged_packet["clue_ids"] != ["clue_99"]
+    assert merged_packet["secrets"] == ["one", "two"]
+    assert {rel["relationship"] for rel in merged_packet["relationships"]} == {"rival"}
+    clue = merged["clues"][0]
+    assert clue["title"] == "Glove"
+    assert clue["type"] == clue_type
+
+
+def test_new_model_fields_are_picked_up_automatically():
+    class RatedClue(Clue):
+        difficulty: str
+        hints: List[str]
+
+    plan = compile_model(RatedClue, keyed=True)
+    base = {"clue_id": "clue_01", "title": "", "difficulty": "", "hints": []}
+    plan.merge(base, {"clue_id": "clue_02", "difficulty": 3, "hints": "look; listen"})
+    assert base == {"clue_id": "clue_01", "title": "", "difficulty": "3", "hints": ["look", "listen"]}
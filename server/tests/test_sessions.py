@@ -0,0 +1,72 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.main import app
+
+
+def _open(client, monkeypatch, seed):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    payload = {"player_count": 5, "category_id": "random", "seed": seed}
+    response = client.post("/api/generate", json=payload)
+    assert response.status_code == 200
+    game, token = response.json(), response.headers["X-Host-Token"]
+    share_code = game["meta"]["share_code"]
+    opened = client.post(f"/api/games/{share_code}/session", headers={"X-Host-Token": token})
+    assert opened.status_code == 200
+    assert opened.json()["round"] == -1
+    return game, token, share_code
+
+
+def test_host_actions_fan_out_to_players(monkeypatch):
+    client = TestClient(app)
+    game, token, share_code = _open(client, monkeypatch, 4242)
+    me, other = game["character_packets"][:2]
+    clue = game["clues"][0]
+
+    with client.websocket_connect(f"/ws/games/{share_code}/host") as host:
+        host.send_json({"token": token})
+        assert host.receive_json()["type"] == "state"
+        with client.websocket_connect(
+            f"/ws/games/{share_code}/players/{me['character_id']}"
+        ) as player:
+            packet = player.receive_json()
+            assert packet["type"] == "packet"
+            assert packet["data"]["character"]["character_id"] == me["character_id"]
+            assert other["secret_goal"] not in str(packet)
+            assert player.receive_json()["type"] == "state"
+
+            host.send_json({"action": "next_round"})
+            round_message = player.receive_json()
+            assert round_message["type"] == "round" and round_message["round"] == 0
+            assert host.receive_json() == round_message
+
+            host.send_json({"action": "reveal", "clue_id": clue["clue_id"]})
+            revealed = player.receive_json()
+            assert revealed["clue"]["clue_id"] == clue["clue_id"]
+            assert "is_misleading" not in revealed["clue"]
+            host.receive_json()
+
+            host.send_json({"action": "explode"})
+            assert host.receive_json()["type"] == "error"
+
+            host.send_text('{"action": "extend", "seconds": NaN}')
+            assert host.receive_json()["type"] == "error"
+            host.send_json({"action": "extend", "seconds": "inf"})
+            assert host.receive_json()["type"] == "error"
+
+
+def test_session_sockets_are_checked(monkeypatch):
+    client = TestClient(app)
+    _game, _token, share_code = _open(client, monkeypatch, 4343)
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/ws/games/{share_code}/host") as ws:
+            ws.send_json({"token": "wrong"})
+            ws.receive_json()
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/ws/games/{share_code}/host?token={_token}") as ws:
+            ws.send_text("hello")
+            ws.receive_json()
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/ws/games/{share_code}/players/nobody") as ws:
+            ws.receive_json()
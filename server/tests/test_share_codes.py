@@ -0,0 +1,67 @@
+import base64
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.seed import ShareCodeData, decode_share_code, encode_share_code, names_hash
+
+CATEGORY_IDS = ["gilded_gala", "jazz_club", "space_outpost"]
+
+
+def test_v2_round_trip_is_short_and_checked():
+    data = ShareCodeData(
+        seed=987654321,
+        player_count=12,
+        category_id="jazz_club",
+        tone="comedy",
+        duration=75,
+        names_hash=names_hash(["Ada", "Bo"]),
+        fingerprint="0a1b2c3d",
+    )
+    code = encode_share_code(data, CATEGORY_IDS)
+    assert decode_share_code(code, CATEGORY_IDS) == data
+    assert len(code) < 32
+
+    corrupted = code[:-3] + ("A" if code[-3] != "A" else "B") + code[-2:]
+    with pytest.raises(ValueError):
+        decode_share_code(corrupted, CATEGORY_IDS)
+
+
+def test_v1_codes_still_decode():
+    payload = {"seed": 42, "player_count": 5, "category_id": "space_outpost",
+               "tone": "suspense", "duration": 60, "v": 1}
+    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    code = base64.urlsafe_b64encode(raw).decode("utf-8").rstrip("=")
+    data = decode_share_code(code, CATEGORY_IDS)
+    assert (data.version, data.seed, data.category_id, data.fingerprint) == (1, 42, "space_outpost", None)
+
+
+def test_share_code_endpoint_decodes_generated_game():
+    os.environ["USE_MOCK_LLM"] = "1"
+    client = TestClient(app)
+    game = client.post("/api/generate", json={"player_count": 4, "category_id": "random", "seed": 5}).json()
+    info = client.get(f"/api/share-codes/{game['meta']['share_code']}").json()
+    assert info["seed"] == 5 and info["stored"] is True
+    assert info["category_id"] == game["meta"]["category_id"]
+    assert client.get("/api/share-codes/not-a-code").status_code == 400
+
+
+def test_custom_durations_round_trip_and_non_positive_ones_are_rejected():
+    os.environ["USE_MOCK_LLM"] = "1"
+    client = TestClient(app)
+    payload = {"player_count": 4, "category_id": "random", "seed": 6262, "duration": 120}
+    game = client.post("/api/generate", json=payload)
+    assert game.status_code == 200
+    info = client.get(f"/api/share-codes/{game.json()['meta']['share_code']}").json()
+    assert info["duration"] == 120
+
+    for duration in (0, -5):
+        payload = {"player_count": 4, "category_id": "random", "seed": 5, "duration": duration}
+        assert client.post("/api/generate", json=payload).status_code == 422
+    data = ShareCodeData(seed=1, player_count=4, category_id="jazz_club", tone="comedy",
+                         duration=-5)
+    with pytest.raises(ValueError):
+        encode_share_code(data, CATEGORY_IDS)
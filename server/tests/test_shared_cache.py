@@ -0,0 +1,40 @@
+from app.generator import generate_game
+from app.models import GenerateRequest
+from app.shared_cache import SQLiteSharedCache
+from app.storage import GameStore
+
+
+def _game(monkeypatch, seed):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    return generate_game(GenerateRequest(player_count=5, category_id="random", seed=seed))
+
+
+def test_workers_see_each_others_games(tmp_path, monkeypatch):
+    path = tmp_path / "shared.sqlite3"
+    worker_a = GameStore(shared=SQLiteSharedCache(path, 1 << 20))
+    worker_b = GameStore(shared=SQLiteSharedCache(path, 1 << 20))
+    game = _game(monkeypatch, 501)
+    saved = worker_a.save(game)
+
+    seen = worker_b.get(game.meta.share_code)
+    assert seen.body == saved.body and seen.host_token == saved.host_token
+    assert seen.game.meta.share_code == game.meta.share_code
+
+    edited = game.model_copy(update={"title": "Edited"})
+    worker_a.save(edited, host_token=saved.host_token, replace=True)
+    assert worker_b.get(game.meta.share_code).game.title == "Edited"
+
+    again = worker_b.save(_game(monkeypatch, 501))
+    assert again.host_token == saved.host_token
+
+
+def test_add_is_first_writer_wins_and_size_bounded(tmp_path):
+    clock = iter(range(100)).__next__
+    cache = SQLiteSharedCache(tmp_path / "c.sqlite3", max_bytes=1000, clock=clock)
+    assert cache.add("a", b"x" * 400, "first").meta == "first"
+    assert cache.add("a", b"y" * 400, "second") == (b"x" * 400, "first")
+    cache.set("b", b"z" * 400)
+    cache.set("c", b"w" * 400)
+    assert cache.get("a") is None
+    assert cache.get("c").value == b"w" * 400
+    assert cache.size_bytes() <= 1000
@@ -0,0 +1,78 @@
+import json
+
+from app import generator
+from app.models import GenerateRequest
+from app.seed import seeded_random
+from app.solvability import check_solvability
+from app.storage import get_categories
+from app.validation import ValidationIssue
+
+
+def _game(player_count, seed):
+    request = GenerateRequest(player_count=player_count, category_id="random", seed=seed)
+    rng = seeded_random(seed)
+    category = generator._select_category(get_categories(), "random", rng)
+    structure = generator._build_structure(request, category, seed, rng)
+    return generator._fill_mock(structure, category)
+
+
+def _codes(game):
+    return {issue.code for issue in check_solvability(game)}
+
+
+def test_procedural_game_is_solvable_until_evidence_moves():
+    game = _game(20, 1)
+    assert check_solvability(game) == []
+
+    murderer_id = game["solution"]["murderer_id"]
+    packets = {p["character_id"]: p for p in game["character_packets"]}
+    murderer_name = packets[murderer_id]["name"]
+    innocent = next(p for cid, p in packets.items() if cid != murderer_id)
+    true_hard = [c for c in game["clues"] if c["type"] == "hard" and not c["is_misleading"]]
+
+    evidence_ids = [c["clue_id"] for c in true_hard]
+    for packet in packets.values():
+        packet["clue_ids"] = [c for c in packet["clue_ids"] if c not in evidence_ids]
+    packets[murderer_id]["clue_ids"] += evidence_ids
+    assert "solvability.evidence_hidden" in _codes(game)
+
+    for clue in true_hard:
+        clue["description"] = clue["description"].replace(murderer_name, innocent["name"])
+    issues = check_solvability(game)
+    assert [issue.code for issue in issues] == ["solvability.no_evidence"]
+    assert issues[0].ids == (murderer_id,)
+
+
+def test_procedural_structure_is_always_solvable():
+    for player_count in (4, 6, 10):
+        for seed in range(1, 80):
+            assert check_solvability(_game(player_count, seed)) == [], (player_count, seed)
+
+
+def test_first_name_only_clues_still_count_as_evidence():
+    for seed in range(1, 60):
+        game = _game(12, seed)
+        names = [p["name"] for p in game["character_packets"]]
+        for clue in game["clues"]:
+            for name in names:
+                clue["description"] = clue["description"].replace(name, name.split()[0])
+        assert "solvability.no_evidence" not in _codes(game), seed
+
+
+def test_structural_issues_skip_the_llm_repair(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "0")
+    game = _game(4, 7)
+    calls = []
+
+    class Client:
+        def generate_text(self, **_kwargs):
+            calls.append(1)
+            return json.dumps(game)
+
+    hidden = ValidationIssue("solvability.evidence_hidden", "character_packets", "hidden")
+    monkeypatch.setattr(generator, "TogetherClient", Client)
+    monkeypatch.setattr(generator, "check_solvability", lambda data: [hidden])
+    request = GenerateRequest(player_count=4, category_id="random", seed=7)
+    result = generator.generate_game(request)
+    assert len(calls) == 1
+    assert result.meta.generation_path == ["llm", "solvability:failed"]
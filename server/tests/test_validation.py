@@ -1,4 +1,9 @@
+import json
+
+from fastapi.testclient import TestClient
+
 from app.generator import validate_only
+from app.main import app
 
 
 def test_validation_catches_missing_fields():
@@ -12,3 +17,38 @@ def test_validation_catches_missing_fields():
     assert any("character_packets" in issue for issue in issues)
     assert any("timeline" in issue for issue in issues)
     assert any("clues" in issue for issue in issues)
+
+
+def test_batch_validate_reports_structured_issues_per_line(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_LLM", "1")
+    client = TestClient(app)
+    game = client.post(
+        "/api/generate",
+        json={"player_count": 5, "category_id": "jazz_club", "seed": 99},
+    ).json()
+    broken = json.loads(json.dumps(game))
+    broken["solution"]["murderer_id"] = "char_99"
+    broken["character_packets"][1]["clue_ids"] = ["clue_404"]
+
+    body = "\n".join([json.dumps(game), json.dumps(broken), "{not json"]) + "\n"
+    response = client.post(
+        "/api/validate/batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["line"] for r in results] == [1, 2, 3]
+    assert results[0]["ok"] is True
+    codes = {issue["code"]: issue for issue in results[1]["issues"]}
+    assert codes["solution.unknown_murderer"]["path"] == "solution.murderer_id"
+    assert codes["character.unknown_clue"]["ids"] == ["char_02", "clue_404"]
+    assert results[2]["ok"] is False
+
+    raw = body.rstrip("\n").encode("utf-8")
+    chunked = client.post(
+        "/api/validate/batch",
+        content=iter([raw[i : i + 7] for i in range(0, len(raw), 7)]),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert chunked.text == response.text